@@ -0,0 +1,79 @@
+import os
+import time
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+import logging
+from models import ProjectRequest, ProjectSchema
+
+logger = logging.getLogger(__name__)
+
+class BatchService:
+    """
+    Génération par lot avec parallélisme borné
+
+    Le débit de tokens n'est pas limité ici : chaque appel OpenAI d'une
+    génération passe par le limiteur de son client (rate_limiter), commun à
+    toutes les routes.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None):
+        if concurrency is None:
+            concurrency = int(os.getenv("BATCH_CONCURRENCY", "4"))
+        self.concurrency = max(1, concurrency)
+
+    async def run(
+        self,
+        items: List[ProjectRequest],
+        generate: Callable[[ProjectRequest], Awaitable[Any]],
+        lookup: Optional[Callable[[ProjectRequest], Awaitable[Optional[ProjectSchema]]]] = None,
+        max_concurrency: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Exécute les générations en parallèle et produit chaque résultat dès qu'il est prêt
+
+        Les erreurs sont isolées par élément. Les résultats trouvés par `lookup`
+        (cache) ne déclenchent aucune génération.
+
+        Args:
+            items: Requêtes à générer
+            generate: Fonction de génération (renvoie schema et is_fallback)
+            lookup: Recherche optionnelle d'un schéma déjà disponible
+            max_concurrency: Limite de parallélisme pour ce lot
+
+        Yields:
+            Dict: Résultat d'un élément (index, success, data ou error)
+        """
+        concurrency = min(self.concurrency, max_concurrency or self.concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+        results: asyncio.Queue = asyncio.Queue()
+
+        async def process(index: int, request: ProjectRequest) -> None:
+            started_at = time.monotonic()
+            try:
+                async with semaphore:
+                    cached = await lookup(request) if lookup is not None else None
+                    if cached is not None:
+                        item = {"index": index, "success": True, "cache": "HIT", "fallback": False,
+                                "data": cached.model_dump(mode="json")}
+                    else:
+                        result = await generate(request)
+                        item = {"index": index, "success": True, "cache": "MISS", "fallback": result.is_fallback,
+                                "data": result.schema.model_dump(mode="json")}
+            except Exception as e:
+                logger.warning(f"Échec de l'élément {index} du lot: {str(e)}")
+                item = {"index": index, "success": False, "error": str(e)}
+            item["duration_ms"] = round((time.monotonic() - started_at) * 1000, 1)
+            await results.put(item)
+
+        tasks = [asyncio.create_task(process(index, request)) for index, request in enumerate(items)]
+        try:
+            for _ in range(len(tasks)):
+                yield await results.get()
+        finally:
+            # Client déconnecté : annuler les générations restantes
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+# Instance globale du service de génération par lot
+batch_service = BatchService()
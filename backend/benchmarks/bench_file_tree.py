@@ -0,0 +1,113 @@
+"""
+Benchmark de la validation de la structure de fichiers sur des arborescences synthétiques
+
+Compare la validation de FileStructure (pydantic, un modèle par nœud), la
+vérification des limites, le parcours itératif vers l'arborescence compacte
+(FileTree) et sa conversion en JSON imbriqué. Mesure aussi la mémoire retenue
+par chaque représentation (tracemalloc).
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_file_tree [--nodes 10000] [--iterations 20]
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_tree import FileTree
+from models import FileStructure, ProjectSchema
+
+FILE_NAMES = ("index.ts", "utils.ts", "types.ts", "README.md", "package.json", "__init__.py", "test_main.py")
+
+def monorepo_tree(nodes: int) -> dict:
+    """Monorepo large : packages → src/tests → fichiers aux noms répétés"""
+    packages = []
+    count = 1
+    while count < nodes:
+        package = {"name": f"package-{len(packages)}", "type": "directory", "children": []}
+        count += 1
+        for folder in ("src", "tests"):
+            if count >= nodes:
+                break
+            directory = {"name": folder, "type": "directory", "children": []}
+            package["children"].append(directory)
+            count += 1
+            for name in FILE_NAMES:
+                if count >= nodes:
+                    break
+                directory["children"].append({"name": name, "type": "file", "content": "// TODO"})
+                count += 1
+        packages.append(package)
+    return {"name": "monorepo", "type": "directory", "children": packages}
+
+def nested_tree(nodes: int, depth: int) -> dict:
+    """Arborescence profonde : chaînes de dossiers de la profondeur donnée, une feuille au bout"""
+    branches = []
+    count = 1
+    while count < nodes:
+        node = {"name": FILE_NAMES[len(branches) % len(FILE_NAMES)], "type": "file"}
+        count += 1
+        for level in range(min(depth, nodes - count)):
+            node = {"name": f"level-{level}", "type": "directory", "children": [node]}
+            count += 1
+        branches.append(node)
+    return {"name": "nested", "type": "directory", "children": branches}
+
+def bench(label: str, func, iterations: int) -> float:
+    for _ in range(min(3, iterations)):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_ms = (time.perf_counter() - started) / iterations * 1e3
+    print(f"{label:<50} {elapsed_ms:10.2f} ms/op")
+    return elapsed_ms
+
+def retained_bytes(build) -> int:
+    """Mémoire retenue par l'objet construit (hors données d'entrée)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    value = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del value
+    return after - before
+
+def run(label: str, data: dict, iterations: int, depth: int) -> None:
+    payload = json.dumps({"file_structure": data})
+    tree = FileTree.parse(data, max_depth=depth, max_nodes=len(payload))
+    structure = FileStructure.model_validate(data)
+    print(f"\n{label} : {len(tree)} nœuds, JSON {len(payload)} octets")
+
+    bench("validation FileStructure.model_validate", lambda: FileStructure.model_validate(data), iterations)
+    bench("vérification des limites (FileTree.within_limits)", lambda: FileTree.within_limits(data, depth, len(payload)), iterations)
+    bench("parcours itératif (FileTree.parse)", lambda: FileTree.parse(data, max_depth=depth, max_nodes=len(payload)), iterations)
+    bench("élagage complet (FileTree.parse + to_dict)", lambda: FileTree.parse(data, max_depth=depth // 2).to_dict(), iterations)
+    bench("ProjectSchema.model_validate_json (chemin réel)", lambda: ProjectSchema.model_validate_json(payload), iterations)
+    bench("sérialisation FileStructure.model_dump_json", structure.model_dump_json, iterations)
+    bench("sérialisation FileTree.to_dict + json.dumps", lambda: json.dumps(tree.to_dict()), iterations)
+
+    recursive = retained_bytes(lambda: FileStructure.model_validate(data))
+    compact = retained_bytes(lambda: FileTree.parse(data, max_depth=depth, max_nodes=len(payload)))
+    print(f"{'mémoire FileStructure (récursive)':<50} {recursive / 1024:10.1f} Kio")
+    print(f"{'mémoire FileTree (compacte)':<50} {compact / 1024:10.1f} Kio")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nodes", type=int, default=10000)
+    parser.add_argument("--depth", type=int, default=24, help="Profondeur des branches de l'arborescence profonde")
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+    # L'élagage volontaire de l'arborescence profonde journaliserait un avertissement à chaque itération
+    logging.getLogger("file_tree").setLevel(logging.ERROR)
+
+    run("Monorepo large", monorepo_tree(args.nodes), args.iterations, depth=args.depth + 1)
+    run("Arborescence profonde", nested_tree(args.nodes, args.depth), args.iterations, depth=args.depth + 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""
+Benchmark du parsing de la réponse du modèle et de la sérialisation de ProjectResponse
+
+Usage (depuis backend/) :
+    python -m benchmarks.bench_parse [--iterations 2000]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.routing import serialize_response
+try:
+    from fastapi.utils import create_model_field
+except ImportError:  # Nom de la fonction dans les versions de FastAPI de requirements.txt
+    from fastapi.utils import create_response_field as create_model_field
+from models import ProjectRequest, ProjectResponse
+from services import SchemaGeneratorService
+
+def sample_ai_response(file_count: int = 40) -> str:
+    """Réponse du modèle représentative (schéma complet, arborescence moyenne)"""
+    def tech(name):
+        return {
+            "name": name,
+            "description": f"Description de {name}",
+            "pros": ["Rapide", "Populaire", "Bien documenté"],
+            "cons": ["Courbe d'apprentissage"],
+            "learning_curve": "Medium",
+            "community_support": "Excellent",
+            "job_market": "High"
+        }
+
+    return json.dumps({
+        "project_name": "ArtisanMarket",
+        "description": "Plateforme e-commerce pour produits artisanaux",
+        "project_type": "ecommerce",
+        "complexity": "medium",
+        "estimated_duration": "3-4 mois",
+        "recommended_stack": {
+            "frontend": tech("React"),
+            "backend": tech("FastAPI"),
+            "database": tech("PostgreSQL"),
+            "deployment": tech("Vercel"),
+            "additional_tools": [tech("Redis"), tech("Stripe")],
+            "justification": "Stack moderne et éprouvée"
+        },
+        "architecture": {
+            "overview": "Architecture en couches",
+            "components": [{"name": f"Composant {i}", "description": "Rôle"} for i in range(8)],
+            "data_flow": ["Client → API → Base"],
+            "security": ["JWT", "HTTPS"],
+            "performance": ["Cache", "CDN"]
+        },
+        "file_structure": {
+            "name": "artisan-market",
+            "type": "directory",
+            "children": [
+                {"name": f"module_{d}", "type": "directory", "children": [
+                    {"name": f"file_{f}.py", "type": "file", "content": "# TODO"} for f in range(file_count // 4)
+                ]} for d in range(4)
+            ]
+        },
+        "roadmap": {
+            "phases": [{"name": f"Phase {i}", "description": "Étape", "duration": "2 semaines"} for i in range(5)],
+            "milestones": [{"name": "MVP", "date": "Semaine 6"}],
+            "estimated_duration": "3-4 mois",
+            "team_recommendations": ["2 développeurs"]
+        },
+        "features": [f"Fonctionnalité {i}" for i in range(15)],
+        "technical_requirements": ["Python 3.11", "Node 18"],
+        "deployment_strategy": {"platform": "Vercel", "ci": "GitHub Actions"},
+        "testing_strategy": {"unit": "pytest", "e2e": "Playwright"},
+        "monitoring_strategy": {"logs": "structurés"},
+        "documentation": ["README", "API"],
+        "potential_challenges": ["Paiements", "Stocks"],
+        "success_metrics": ["Conversion", "Rétention"]
+    }, ensure_ascii=False)
+
+def bench(label: str, func, iterations: int) -> float:
+    for _ in range(min(50, iterations)):
+        func()
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_us = (time.perf_counter() - started) / iterations * 1e6
+    print(f"{label:<45} {elapsed_us:10.1f} µs/op")
+    return elapsed_us
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    service = SchemaGeneratorService()
+    request = ProjectRequest(description="Plateforme e-commerce pour produits artisanaux", project_type="ecommerce")
+    ai_response = sample_ai_response()
+    schema = service._parse_ai_response(ai_response, request)
+    response_model = ProjectResponse(success=True, data=schema, message="Schéma généré avec succès")
+
+    response_field = create_model_field(name="Response_bench", type_=ProjectResponse, mode="serialization")
+
+    def fastapi_serialize():
+        content = asyncio.run(serialize_response(field=response_field, response_content=response_model, is_coroutine=True))
+        return json.dumps(content, ensure_ascii=False)
+
+    print(f"Taille de la réponse du modèle : {len(ai_response)} octets")
+    parse_us = bench("parse (_parse_ai_response)", lambda: service._parse_ai_response(ai_response, request), args.iterations)
+    validate_us = bench("réponse : validation + sérialisation FastAPI", fastapi_serialize, max(1, args.iterations // 4))
+    dump_us = bench("réponse : model_construct + model_dump_json", lambda: ProjectResponse.model_construct(success=True, data=schema, message="ok", error=None).model_dump_json(), args.iterations)
+    print(f"{'total parse + réponse FastAPI':<45} {parse_us + validate_us:10.1f} µs/op")
+    print(f"{'total parse + réponse directe':<45} {parse_us + dump_us:10.1f} µs/op")
+
+if __name__ == "__main__":
+    main()
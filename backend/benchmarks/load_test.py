@@ -0,0 +1,258 @@
+"""
+Banc de charge de l'API de génération
+
+Envoie des requêtes de génération à concurrence donnée et rapporte le débit,
+les latences p50/p95/p99, le retard de la boucle d'événements et la
+proportion de replis (d'après /metrics).
+
+Par défaut, tout s'exécute dans le processus, sans réseau : l'API (main.app)
+et le serveur OpenAI de substitution (benchmarks.mock_openai) sont reliés par
+httpx.ASGITransport ; le retard de boucle mesuré est alors celui de l'API.
+Avec --url, une API déjà lancée est ciblée (par exemple avec
+OPENAI_BASE_URL pointant vers benchmarks.mock_openai servi par uvicorn).
+Le transport ASGI met les réponses en mémoire : le temps jusqu'au premier
+octet en streaming n'est significatif qu'avec --url.
+
+Usage (depuis backend/) :
+    python -m benchmarks.load_test --requests 200 --concurrency 20 --latency lognormal:300:0.3 --error-rate 0.05
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 --requests 500 --concurrency 50 --endpoint stream
+
+Seuils (code de sortie 1 s'ils sont dépassés, pour la CI) : --max-p95-ms,
+--max-fallback-rate, --min-throughput.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from benchmarks.mock_openai import add_mock_arguments, config_from_args, create_app
+
+ENDPOINTS = {
+    "schema": "/api/generate-schema",
+    "stream": "/api/generate-schema/stream",
+}
+
+DESCRIPTIONS = [
+    ("ecommerce", "Boutique en ligne de produits artisanaux avec paiement et suivi des commandes"),
+    ("saas", "Plateforme SaaS de gestion de projets pour petites équipes avec facturation"),
+    ("blog", "Blog technique avec commentaires, recherche et newsletter"),
+    ("portfolio", "Portfolio de photographe avec galeries et formulaire de contact"),
+    ("api", "API de réservation de salles avec authentification et webhooks"),
+    ("mobile_app", "Application mobile de suivi d'entraînement sportif hors ligne"),
+]
+
+_SAMPLE = re.compile(r"^(devplan_[a-z_]+)(?:\{[^}]*\})? ([0-9.e+-]+)$")
+
+@dataclass
+class LoadReport:
+    """Mesures d'un passage du banc de charge"""
+    latencies: List[float] = field(default_factory=list)
+    first_byte: List[float] = field(default_factory=list)
+    loop_lag: List[float] = field(default_factory=list)
+    statuses: Dict[str, int] = field(default_factory=dict)
+    duration: float = 0.0
+    fallbacks: Optional[float] = None
+    generations: Optional[float] = None
+
+    @property
+    def completed(self) -> int:
+        return len(self.latencies)
+
+    @property
+    def fallback_rate(self) -> Optional[float]:
+        if not self.generations:
+            return None
+        return self.fallbacks / self.generations
+
+    def summary(self) -> Dict[str, Any]:
+        def ms(values: List[float], ratio: float) -> Optional[float]:
+            value = percentile(values, ratio)
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "requests": self.completed,
+            "statuses": dict(sorted(self.statuses.items())),
+            "duration_s": round(self.duration, 2),
+            "throughput_rps": round(self.completed / self.duration, 2) if self.duration else 0.0,
+            "latency_ms": {"p50": ms(self.latencies, 0.5), "p95": ms(self.latencies, 0.95), "p99": ms(self.latencies, 0.99)},
+            "first_byte_ms": {"p50": ms(self.first_byte, 0.5), "p95": ms(self.first_byte, 0.95)},
+            "loop_lag_ms": {"p50": ms(self.loop_lag, 0.5), "p99": ms(self.loop_lag, 0.99), "max": ms(self.loop_lag, 1.0)},
+            "fallback_rate": round(self.fallback_rate, 4) if self.fallback_rate is not None else None,
+        }
+
+def percentile(values: List[float], ratio: float) -> Optional[float]:
+    """Percentile par rang le plus proche (None si aucune valeur)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(ratio * len(ordered))) - 1))]
+
+def parse_metrics(text: str) -> Dict[str, float]:
+    """Somme des échantillons de chaque métrique devplan_* d'une exposition Prometheus"""
+    totals: Dict[str, float] = {}
+    for line in text.splitlines():
+        match = _SAMPLE.match(line)
+        if match:
+            totals[match.group(1)] = totals.get(match.group(1), 0.0) + float(match.group(2))
+    return totals
+
+async def read_metrics(client: httpx.AsyncClient) -> Optional[Dict[str, float]]:
+    try:
+        response = await client.get("/metrics")
+    except httpx.HTTPError:
+        return None
+    return parse_metrics(response.text) if response.status_code == 200 else None
+
+async def monitor_loop_lag(report: LoadReport, interval: float, stop: asyncio.Event) -> None:
+    """Mesure le retard de réveil d'une tâche périodique (boucle bloquée ou saturée)"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        report.loop_lag.append(max(0.0, loop.time() - expected))
+
+async def send_request(client: httpx.AsyncClient, endpoint: str, index: int, report: LoadReport) -> None:
+    project_type, description = DESCRIPTIONS[index % len(DESCRIPTIONS)]
+    payload = {"description": f"{description} (variante {index})", "project_type": project_type}
+    started_at = time.perf_counter()
+    status = "error"
+    try:
+        async with client.stream("POST", ENDPOINTS[endpoint], json=payload) as response:
+            first_byte = None
+            async for _ in response.aiter_bytes():
+                if first_byte is None:
+                    first_byte = time.perf_counter() - started_at
+            status = str(response.status_code)
+        if first_byte is not None:
+            report.first_byte.append(first_byte)
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    report.latencies.append(time.perf_counter() - started_at)
+    report.statuses[status] = report.statuses.get(status, 0) + 1
+
+async def run_load(client: httpx.AsyncClient, args: argparse.Namespace, measure_lag: bool) -> LoadReport:
+    report = LoadReport()
+    counter = iter(range(args.requests))
+
+    async def worker():
+        for index in counter:
+            await send_request(client, args.endpoint, index, report)
+
+    before = await read_metrics(client)
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(monitor_loop_lag(report, args.lag_interval, stop)) if measure_lag else None
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    report.duration = time.perf_counter() - started_at
+    stop.set()
+    if lag_task is not None:
+        await lag_task
+    after = await read_metrics(client)
+
+    if before is not None and after is not None:
+        report.fallbacks = after.get("devplan_fallbacks_total", 0.0) - before.get("devplan_fallbacks_total", 0.0)
+        report.generations = after.get("devplan_generations_total", 0.0) - before.get("devplan_generations_total", 0.0)
+    return report
+
+async def run_in_process(args: argparse.Namespace) -> LoadReport:
+    """API et serveur OpenAI de substitution dans le même processus"""
+    os.environ.setdefault("OPENAI_API_KEY", "sk-" + "0" * 40)
+    os.environ.setdefault("OPENAI_BASE_URL", "http://mock-openai/v1")
+    os.environ.setdefault("OPENAI_TIMEOUT", str(args.openai_timeout))
+    if not args.cache:
+        # Mesurer le pipeline complet : chaque requête appelle le modèle
+        os.environ.setdefault("SCHEMA_CACHE_ENABLED", "false")
+        os.environ.setdefault("SEMANTIC_CACHE_ENABLED", "false")
+
+    import main
+    from config_service import config_service, OpenAIConfigRequest
+    # Une ligne de log par appel fausserait la mesure
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    mock_app = create_app(config_from_args(args))
+    config_service.http_transport = httpx.ASGITransport(app=mock_app)
+    validation = await config_service.validate_openai_config(
+        OpenAIConfigRequest(api_key=os.environ["OPENAI_API_KEY"], model=args.model)
+    )
+    if not validation.is_valid:
+        raise SystemExit(f"Configuration du serveur de substitution invalide : {validation.message}")
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=main.app), base_url="http://devplan", timeout=None
+        ) as client:
+            report = await run_load(client, args, measure_lag=True)
+    finally:
+        await config_service.aclose()
+    stats = mock_app.state.stats
+    print(f"Serveur de substitution : {stats['requests']} appels, {stats['rate_limited']} 429, {stats['timeouts']} délais dépassés")
+    return report
+
+async def run_remote(args: argparse.Namespace) -> LoadReport:
+    """API déjà lancée (le retard de boucle mesuré est celui du générateur de charge)"""
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.request_timeout, limits=limits) as client:
+        return await run_load(client, args, measure_lag=True)
+
+def check_thresholds(summary: Dict[str, Any], args: argparse.Namespace) -> List[str]:
+    """Seuils dépassés (vide si le passage est conforme)"""
+    failures = []
+    p95 = summary["latency_ms"]["p95"]
+    if args.max_p95_ms is not None and (p95 is None or p95 > args.max_p95_ms):
+        failures.append(f"latence p95 {p95} ms > {args.max_p95_ms} ms")
+    rate = summary["fallback_rate"]
+    if args.max_fallback_rate is not None and rate is not None and rate > args.max_fallback_rate:
+        failures.append(f"taux de repli {rate} > {args.max_fallback_rate}")
+    if args.min_throughput is not None and summary["throughput_rps"] < args.min_throughput:
+        failures.append(f"débit {summary['throughput_rps']} req/s < {args.min_throughput} req/s")
+    return failures
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=None, help="API déjà lancée (sinon dans le processus)")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="schema")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--model", default="gpt-4")
+    parser.add_argument("--cache", action="store_true", help="Laisser les caches de schémas actifs")
+    parser.add_argument("--openai-timeout", type=float, default=10.0, help="Timeout du client OpenAI (dans le processus)")
+    parser.add_argument("--request-timeout", type=float, default=300.0, help="Timeout des requêtes vers l'API (--url)")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Période de mesure du retard de boucle (s)")
+    parser.add_argument("--json", action="store_true", help="Afficher le rapport en JSON")
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--max-fallback-rate", type=float, default=None)
+    parser.add_argument("--min-throughput", type=float, default=None)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    report = asyncio.run(run_remote(args) if args.url else run_in_process(args))
+    summary = report.summary()
+
+    if args.json:
+        import json_backend
+        print(json_backend.dumps(summary))
+    else:
+        print(f"Requêtes        : {summary['requests']} {summary['statuses']} en {summary['duration_s']} s")
+        print(f"Débit           : {summary['throughput_rps']} req/s")
+        print(f"Latence (ms)    : p50 {summary['latency_ms']['p50']}  p95 {summary['latency_ms']['p95']}  p99 {summary['latency_ms']['p99']}")
+        print(f"1er octet (ms)  : p50 {summary['first_byte_ms']['p50']}  p95 {summary['first_byte_ms']['p95']}")
+        print(f"Retard boucle   : p50 {summary['loop_lag_ms']['p50']}  p99 {summary['loop_lag_ms']['p99']}  max {summary['loop_lag_ms']['max']} ms")
+        print(f"Taux de repli   : {summary['fallback_rate']}")
+
+    failures = check_thresholds(summary, args)
+    for failure in failures:
+        print(f"SEUIL DÉPASSÉ : {failure}")
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Serveur OpenAI de substitution pour les bancs d'essai hors réseau
+
+Sert POST /v1/chat/completions (réponse complète ou streaming SSE) avec une
+latence tirée d'une distribution configurable, des en-têtes x-ratelimit-*
+cohérents avec un budget par minute, et l'injection d'erreurs 429 et de
+délais dépassant le timeout du client.
+
+Usage (depuis backend/) :
+    python -m benchmarks.mock_openai --port 8001 --latency lognormal:800:0.4 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:8001/v1 uvicorn main:app
+
+Distributions de latence (millisecondes) : fixed:MS, uniform:MIN:MAX,
+normal:MOYENNE:ECART, lognormal:MEDIANE:SIGMA.
+"""
+import argparse
+import asyncio
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+import json_backend
+from benchmarks.bench_parse import sample_ai_response
+
+class LatencyDistribution:
+    """Distribution de latence décrite par une spécification "nom:paramètres" (ms)"""
+
+    def __init__(self, spec: str, rng: Optional[random.Random] = None):
+        name, *params = spec.split(":")
+        values = [float(value) for value in params]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if name not in expected or len(values) != expected[name]:
+            raise ValueError(f"Distribution de latence invalide : {spec}")
+        self.spec = spec
+        self.name = name
+        self.params = values
+        self.rng = rng or random.Random()
+
+    def sample(self) -> float:
+        """Latence tirée, en secondes"""
+        if self.name == "fixed":
+            ms = self.params[0]
+        elif self.name == "uniform":
+            ms = self.rng.uniform(*self.params)
+        elif self.name == "normal":
+            ms = self.rng.gauss(*self.params)
+        else:
+            median, sigma = self.params
+            ms = self.rng.lognormvariate(math.log(median), sigma)
+        return max(0.0, ms) / 1000
+
+@dataclass
+class MockConfig:
+    """Comportement du serveur de substitution"""
+    latency: str = "lognormal:800:0.4"
+    # Délai entre deux morceaux en streaming (ms)
+    chunk_delay_ms: float = 20.0
+    chunk_size: int = 64
+    # Probabilités d'injection d'une erreur 429 et d'un délai dépassant le timeout
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_seconds: float = 150.0
+    # Budgets annoncés par les en-têtes x-ratelimit-* (fenêtre glissante d'une minute)
+    requests_per_minute: int = 10000
+    tokens_per_minute: int = 2000000
+    seed: Optional[int] = None
+
+class _RateWindow:
+    """Consommation sur la dernière minute (requêtes et tokens)"""
+
+    def __init__(self):
+        self.events: List[tuple] = []
+
+    def add(self, tokens: int) -> None:
+        self.events.append((time.monotonic(), tokens))
+
+    def usage(self) -> tuple:
+        cutoff = time.monotonic() - 60
+        self.events = [event for event in self.events if event[0] >= cutoff]
+        return len(self.events), sum(tokens for _, tokens in self.events)
+
+def _requested_sections(prompt: str) -> Optional[List[str]]:
+    """Sections demandées par un prompt de sections (services._build_followup_prompt)"""
+    marker = "déjà définis : "
+    if marker not in prompt:
+        return None
+    return prompt.split(marker, 1)[1].split(".\n", 1)[0].split(", ")
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    """
+    Construit l'application de substitution
+
+    Args:
+        config: Comportement du serveur
+
+    Returns:
+        FastAPI: Application ASGI (servie par uvicorn ou montée via httpx.ASGITransport)
+    """
+    config = config or MockConfig()
+    rng = random.Random(config.seed)
+    latency = LatencyDistribution(config.latency, rng)
+    window = _RateWindow()
+    document = json_backend.loads(sample_ai_response())
+    app = FastAPI(title="Mock OpenAI")
+    app.state.config = config
+    app.state.stats = {"requests": 0, "rate_limited": 0, "timeouts": 0}
+
+    def rate_headers() -> Dict[str, str]:
+        requests_used, tokens_used = window.usage()
+        return {
+            "x-ratelimit-limit-requests": str(config.requests_per_minute),
+            "x-ratelimit-remaining-requests": str(max(0, config.requests_per_minute - requests_used)),
+            "x-ratelimit-limit-tokens": str(config.tokens_per_minute),
+            "x-ratelimit-remaining-tokens": str(max(0, config.tokens_per_minute - tokens_used)),
+            "x-ratelimit-reset-requests": "60s",
+            "x-ratelimit-reset-tokens": "60s",
+        }
+
+    def content_for(messages: List[Dict[str, Any]], max_tokens: int) -> str:
+        prompt = messages[-1].get("content", "") if messages else ""
+        if max_tokens <= 16:
+            return "OK"
+        sections = _requested_sections(prompt)
+        if sections is None:
+            return json_backend.dumps(document)
+        return json_backend.dumps({name: document[name] for name in sections if name in document})
+
+    def completion(model: str, content: str, prompt_tokens: int) -> Dict[str, Any]:
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(content) // 4,
+                "total_tokens": prompt_tokens + len(content) // 4
+            }
+        }
+
+    async def stream_chunks(model: str, content: str) -> AsyncIterator[str]:
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        for start in range(0, len(content), config.chunk_size):
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": content[start:start + config.chunk_size]}, "finish_reason": None}]
+            }
+            yield f"data: {json_backend.dumps(chunk)}\n\n"
+            await asyncio.sleep(config.chunk_delay_ms / 1000)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.stats["requests"] += 1
+        messages = body.get("messages", [])
+        model = body.get("model", "gpt-4")
+        prompt_tokens = sum(len(str(message.get("content", ""))) for message in messages) // 4
+
+        requests_used, tokens_used = window.usage()
+        draw = rng.random()
+        if (draw < config.error_rate or requests_used >= config.requests_per_minute
+                or tokens_used >= config.tokens_per_minute):
+            app.state.stats["rate_limited"] += 1
+            return JSONResponse(
+                status_code=429,
+                headers={**rate_headers(), "retry-after": "1"},
+                content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}}
+            )
+        if draw < config.error_rate + config.timeout_rate:
+            app.state.stats["timeouts"] += 1
+            await asyncio.sleep(config.timeout_seconds)
+
+        content = content_for(messages, int(body.get("max_tokens") or 4000))
+        window.add(prompt_tokens + len(content) // 4)
+        await asyncio.sleep(latency.sample())
+
+        if body.get("stream"):
+            return StreamingResponse(stream_chunks(model, content), media_type="text/event-stream", headers=rate_headers())
+        return JSONResponse(content=completion(model, content, prompt_tokens), headers=rate_headers())
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "gpt-4", "object": "model"}, {"id": "gpt-3.5-turbo", "object": "model"}]}
+
+    return app
+
+def add_mock_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options de comportement du serveur (partagées avec le banc de charge)"""
+    parser.add_argument("--latency", default=MockConfig.latency, help="Distribution de latence (ms)")
+    parser.add_argument("--chunk-delay-ms", type=float, default=MockConfig.chunk_delay_ms)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proportion de réponses 429")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Proportion de réponses trop lentes")
+    parser.add_argument("--timeout-seconds", type=float, default=MockConfig.timeout_seconds)
+    parser.add_argument("--rpm", type=int, default=MockConfig.requests_per_minute)
+    parser.add_argument("--tpm", type=int, default=MockConfig.tokens_per_minute)
+    parser.add_argument("--seed", type=int, default=None)
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    return MockConfig(
+        latency=args.latency,
+        chunk_delay_ms=args.chunk_delay_ms,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        timeout_seconds=args.timeout_seconds,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        seed=args.seed
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    add_mock_arguments(parser)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,250 @@
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+import logging
+from models import ProjectRequest, ProjectSchema
+
+logger = logging.getLogger(__name__)
+
+def _normalize(value: Any) -> Any:
+    """
+    Normalise récursivement une valeur pour le calcul de l'empreinte
+
+    Les chaînes sont mises en minuscules avec les espaces compactés, les valeurs
+    vides sont supprimées et les listes de scalaires sont triées.
+    """
+    if isinstance(value, str):
+        return " ".join(value.split()).lower()
+    if isinstance(value, dict):
+        normalized = {}
+        for key, item in value.items():
+            item = _normalize(item)
+            if item is None or item == [] or item == {} or item == "":
+                continue
+            normalized[key] = item
+        return normalized
+    if isinstance(value, list):
+        items = [_normalize(item) for item in value]
+        items = [item for item in items if item not in (None, "", [], {})]
+        if all(isinstance(item, (str, int, float, bool)) for item in items):
+            return sorted(items, key=str)
+        return items
+    return value
+
+def compute_request_hash(request: ProjectRequest, model: str, prompt_version: str, tenant: str = "") -> str:
+    """
+    Calcule l'empreinte canonique d'une requête de génération
+
+    Args:
+        request: Requête de projet
+        model: Modèle OpenAI utilisé
+        prompt_version: Version des prompts
+        tenant: Empreinte du tenant ("" hors session, empreinte inchangée)
+
+    Returns:
+        str: Empreinte SHA-256 hexadécimale
+    """
+    payload = {
+        "request": _normalize(request.model_dump(mode="json")),
+        "model": model,
+        "prompt_version": prompt_version
+    }
+    if tenant:
+        payload["tenant"] = tenant
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+class LRUCache:
+    """Cache mémoire LRU avec expiration (TTL) et limite de taille"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024, ttl: float = 86400):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.total_bytes = 0
+        # clé -> (valeur, taille, date d'expiration)
+        self._entries: "OrderedDict[str, tuple[Any, int, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (value, size, time.monotonic() + self.ttl)
+        self.total_bytes += size
+        # Éviction des entrées les moins récemment utilisées
+        while len(self._entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.total_bytes = 0
+
+    def _remove(self, key: str) -> None:
+        _, size, _ = self._entries.pop(key)
+        self.total_bytes -= size
+
+class SQLiteCache:
+    """Cache persistant sur disque (SQLite) survivant aux redémarrages"""
+
+    def __init__(self, path: str, ttl: float = 86400, max_entries: int = 10000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS schema_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_schema_cache_expires ON schema_cache(expires_at)")
+            conn.execute("DELETE FROM schema_cache WHERE expires_at <= ?", (time.time(),))
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM schema_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str) -> None:
+        now = time.time()
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO schema_cache (key, value, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, now, now + self.ttl)
+            )
+            conn.execute(
+                "DELETE FROM schema_cache WHERE key IN ("
+                "SELECT key FROM schema_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+
+    def clear(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM schema_cache")
+
+class SchemaCacheService:
+    """Cache à deux niveaux (mémoire + disque optionnel) des schémas générés"""
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        ttl: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        db_path: Optional[str] = None
+    ):
+        if enabled is None:
+            enabled = os.getenv("SCHEMA_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        if ttl is None:
+            ttl = float(os.getenv("SCHEMA_CACHE_TTL", "86400"))
+        if max_entries is None:
+            max_entries = int(os.getenv("SCHEMA_CACHE_MAX_ENTRIES", "256"))
+        if max_bytes is None:
+            max_bytes = int(os.getenv("SCHEMA_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+        if db_path is None:
+            db_path = os.getenv("SCHEMA_CACHE_DB_PATH")
+
+        self.enabled = enabled
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes, ttl=ttl)
+        self.disk: Optional[SQLiteCache] = None
+        if enabled and db_path:
+            try:
+                self.disk = SQLiteCache(db_path, ttl=ttl)
+            except sqlite3.Error as e:
+                logger.error(f"Impossible d'ouvrir le cache disque {db_path}: {str(e)}")
+
+        self.stats: Dict[str, int] = {"hits": 0, "disk_hits": 0, "misses": 0}
+
+    async def get(self, key: str) -> Optional[ProjectSchema]:
+        """
+        Recherche un schéma dans le cache (mémoire puis disque)
+
+        Args:
+            key: Empreinte de la requête
+
+        Returns:
+            Optional[ProjectSchema]: Schéma en cache ou None
+        """
+        if not self.enabled:
+            return None
+
+        schema = self.memory.get(key)
+        if schema is not None:
+            self.stats["hits"] += 1
+            return schema
+
+        if self.disk is not None:
+            try:
+                raw = await asyncio.to_thread(self.disk.get, key)
+            except sqlite3.Error as e:
+                logger.warning(f"Lecture du cache disque impossible: {str(e)}")
+                raw = None
+            if raw is not None:
+                schema = ProjectSchema.model_validate_json(raw)
+                # Promotion dans le cache mémoire
+                self.memory.set(key, schema, len(raw))
+                self.stats["hits"] += 1
+                self.stats["disk_hits"] += 1
+                return schema
+
+        self.stats["misses"] += 1
+        return None
+
+    async def set(self, key: str, schema: ProjectSchema) -> None:
+        """
+        Enregistre un schéma dans le cache
+
+        Args:
+            key: Empreinte de la requête
+            schema: Schéma généré
+        """
+        if not self.enabled:
+            return
+
+        raw = schema.model_dump_json()
+        self.memory.set(key, schema, len(raw))
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, raw)
+            except sqlite3.Error as e:
+                logger.warning(f"Écriture du cache disque impossible: {str(e)}")
+
+    async def clear(self) -> None:
+        """Vide les deux niveaux du cache"""
+        self.memory.clear()
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.clear)
+
+# Instance globale du cache de schémas
+schema_cache = SchemaCacheService()
@@ -0,0 +1,106 @@
+"""
+Catalogues statiques de l'API (stacks technologiques et templates de projets)
+
+Ces données ne changent qu'au déploiement : incrémenter CATALOG_VERSION à chaque
+modification pour invalider les caches HTTP des clients.
+"""
+
+CATALOG_VERSION = "2024.1"
+
+STACKS = {
+    "frontend": [
+        {
+            "name": "React",
+            "description": "Bibliothèque JavaScript populaire",
+            "pros": ["Écosystème riche", "Communauté active", "Flexibilité"],
+            "cons": ["Courbe d'apprentissage", "Configurations complexes"]
+        },
+        {
+            "name": "Vue.js",
+            "description": "Framework JavaScript progressif",
+            "pros": ["Facilité d'apprentissage", "Documentation excellente", "Performance"],
+            "cons": ["Écosystème plus petit", "Moins d'emplois"]
+        },
+        {
+            "name": "Vanilla JS",
+            "description": "JavaScript pur sans framework",
+            "pros": ["Performance maximale", "Pas de dépendances", "Contrôle total"],
+            "cons": ["Développement plus long", "Pas de structure imposée"]
+        }
+    ],
+    "backend": [
+        {
+            "name": "FastAPI",
+            "description": "Framework Python moderne et rapide",
+            "pros": ["Performance élevée", "Documentation automatique", "Type hints"],
+            "cons": ["Écosystème plus récent", "Moins de ressources"]
+        },
+        {
+            "name": "Node.js",
+            "description": "Runtime JavaScript côté serveur",
+            "pros": ["JavaScript partout", "NPM ecosystem", "Performance"],
+            "cons": ["Single-threaded", "Callback hell potentiel"]
+        },
+        {
+            "name": "Django",
+            "description": "Framework Python batteries included",
+            "pros": ["Fonctionnalités complètes", "Sécurité intégrée", "Admin interface"],
+            "cons": ["Peut être lourd", "Moins flexible"]
+        }
+    ],
+    "database": [
+        {
+            "name": "PostgreSQL",
+            "description": "Base de données relationnelle avancée",
+            "pros": ["ACID compliance", "Extensibilité", "Performance"],
+            "cons": ["Complexité", "Ressources nécessaires"]
+        },
+        {
+            "name": "MongoDB",
+            "description": "Base de données NoSQL documentaire",
+            "pros": ["Flexibilité du schéma", "Scalabilité", "JSON natif"],
+            "cons": ["Moins de consistance", "Requêtes complexes"]
+        },
+        {
+            "name": "SQLite",
+            "description": "Base de données légère embarquée",
+            "pros": ["Simplicité", "Pas de serveur", "Portable"],
+            "cons": ["Pas de concurrence", "Fonctionnalités limitées"]
+        }
+    ]
+}
+
+TEMPLATES = [
+    {
+        "id": "ecommerce",
+        "name": "E-commerce",
+        "description": "Plateforme de vente en ligne complète",
+        "features": ["Catalogue produits", "Panier", "Paiement", "Gestion commandes"],
+        "complexity": "high",
+        "duration": "3-6 mois"
+    },
+    {
+        "id": "blog",
+        "name": "Blog/CMS",
+        "description": "Système de gestion de contenu",
+        "features": ["Articles", "Commentaires", "SEO", "Admin panel"],
+        "complexity": "medium",
+        "duration": "1-2 mois"
+    },
+    {
+        "id": "saas",
+        "name": "SaaS Platform",
+        "description": "Application Software-as-a-Service",
+        "features": ["Authentification", "Abonnements", "Dashboard", "API"],
+        "complexity": "high",
+        "duration": "4-8 mois"
+    },
+    {
+        "id": "portfolio",
+        "name": "Portfolio",
+        "description": "Site vitrine personnel ou professionnel",
+        "features": ["Présentation", "Projets", "Contact", "CV"],
+        "complexity": "low",
+        "duration": "2-4 semaines"
+    }
+]
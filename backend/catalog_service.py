@@ -0,0 +1,120 @@
+import os
+import gzip
+import json
+import hashlib
+from typing import Any, Dict, Optional, Tuple
+from fastapi import Request, Response
+from catalog_data import CATALOG_VERSION, STACKS, TEMPLATES
+
+try:
+    import brotli
+except ImportError:  # Dépendance optionnelle : sans elle, seul gzip est proposé
+    brotli = None
+
+def _accepted_encodings(accept_encoding: str) -> Tuple[str, ...]:
+    """
+    Liste des encodages acceptés par le client (q > 0)
+
+    Args:
+        accept_encoding: Valeur de l'en-tête Accept-Encoding
+
+    Returns:
+        Tuple des encodages acceptés, en minuscules
+    """
+    accepted = []
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        if not name:
+            continue
+        params = params.replace(" ", "")
+        if params.startswith("q="):
+            try:
+                if float(params[2:]) <= 0:
+                    continue
+            except ValueError:
+                continue
+        accepted.append(name)
+    return tuple(accepted)
+
+class PrecomputedJSON:
+    """
+    Réponse JSON sérialisée une seule fois au démarrage
+
+    Le corps est stocké en octets avec ses variantes compressées (gzip, brotli si
+    disponible), chacune avec un ETag fort et des en-têtes préconstruits. Les
+    requêtes conditionnelles (If-None-Match) reçoivent un 304 sans corps.
+    """
+
+    def __init__(self, payload: Any, version: str, max_age: Optional[int] = None):
+        if max_age is None:
+            max_age = int(os.getenv("CATALOG_MAX_AGE", "3600"))
+
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        digest = hashlib.sha256(version.encode("utf-8") + b"\0" + body).hexdigest()[:32]
+
+        variants: Dict[str, bytes] = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants["br"] = brotli.compress(body, quality=11)
+
+        cache_control = f"public, max-age={max_age}"
+        self.variants: Dict[str, Tuple[bytes, Dict[str, str]]] = {}
+        for encoding, content in variants.items():
+            etag = f'"{digest}"' if encoding == "identity" else f'"{digest}-{encoding}"'
+            headers = {
+                "ETag": etag,
+                "Cache-Control": cache_control,
+                "Vary": "Accept-Encoding",
+                "X-Catalog-Version": version
+            }
+            if encoding != "identity":
+                headers["Content-Encoding"] = encoding
+            self.variants[encoding] = (content, headers)
+
+        self.etags = frozenset(headers["ETag"] for _, headers in self.variants.values())
+        self._not_modified_headers = {
+            encoding: {key: value for key, value in headers.items() if key != "Content-Encoding"}
+            for encoding, (_, headers) in self.variants.items()
+        }
+
+    def _select_encoding(self, accept_encoding: str) -> str:
+        if not accept_encoding:
+            return "identity"
+        accepted = _accepted_encodings(accept_encoding)
+        if "br" in self.variants and ("br" in accepted or "*" in accepted):
+            return "br"
+        if "gzip" in accepted or "*" in accepted:
+            return "gzip"
+        return "identity"
+
+    def _is_not_modified(self, if_none_match: str) -> bool:
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            if tag.startswith("W/"):
+                tag = tag[2:]
+            if tag in self.etags:
+                return True
+        return False
+
+    def respond(self, request: Request) -> Response:
+        """
+        Construit la réponse adaptée à la requête (variante compressée ou 304)
+
+        Args:
+            request: Requête HTTP entrante
+
+        Returns:
+            Response: Réponse préconstruite
+        """
+        encoding = self._select_encoding(request.headers.get("accept-encoding", ""))
+        if self._is_not_modified(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=self._not_modified_headers[encoding])
+        content, headers = self.variants[encoding]
+        return Response(content=content, media_type="application/json", headers=headers)
+
+# Réponses précalculées des catalogues
+stacks_response = PrecomputedJSON({"success": True, "data": STACKS}, CATALOG_VERSION)
+templates_response = PrecomputedJSON({"success": True, "data": TEMPLATES}, CATALOG_VERSION)
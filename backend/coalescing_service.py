@@ -0,0 +1,87 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+import logging
+from metrics_service import Counter, metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Issues du regroupement, exposées sur /metrics
+COALESCING_EVENTS = Counter(
+    "devplan_coalescing_events_total",
+    "Requêtes regroupées : appels lancés (leader), requêtes rattachées (coalesced), appels annulés (cancelled)",
+    ["event"]
+)
+metrics_service.register(COALESCING_EVENTS)
+
+class _Flight:
+    """Appel partagé en cours pour une clé donnée"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+class RequestCoalescer:
+    """
+    Regroupement des requêtes concurrentes identiques (single-flight)
+
+    La première requête pour une clé (le « leader ») lance l'appel ; les requêtes
+    identiques qui arrivent pendant son exécution attendent le même résultat au
+    lieu de relancer un appel OpenAI.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.stats: Dict[str, int] = {"leaders": 0, "coalesced": 0, "cancelled": 0}
+
+    @property
+    def in_flight(self) -> int:
+        """Nombre d'appels partagés en cours"""
+        return len(self._flights)
+
+    async def run(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Exécute factory() une seule fois pour toutes les requêtes concurrentes de même clé
+
+        L'appel partagé n'est annulé que si toutes les requêtes qui l'attendent
+        ont été annulées (client déconnecté) ; sinon il se poursuit pour les autres.
+
+        Args:
+            key: Empreinte canonique de la requête
+            factory: Fonction créant la coroutine à exécuter
+
+        Returns:
+            Any: Résultat de l'appel partagé
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+            self.stats["leaders"] += 1
+            COALESCING_EVENTS.inc(event="leader")
+        else:
+            self.stats["coalesced"] += 1
+            COALESCING_EVENTS.inc(event="coalesced")
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1 and not flight.task.done():
+                # Plus personne n'attend le résultat : annuler l'appel amont
+                self._forget(key, flight)
+                flight.task.cancel()
+                self.stats["cancelled"] += 1
+                COALESCING_EVENTS.inc(event="cancelled")
+                logger.info(f"Appel partagé annulé, plus aucune requête en attente ({key[:12]})")
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Retire l'appel partagé de la table s'il y figure encore"""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+# Instance globale du regroupement des générations
+request_coalescer = RequestCoalescer()
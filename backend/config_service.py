@@ -1,11 +1,19 @@
 import os
 import asyncio
-from typing import Dict, Any, Optional, Tuple
+import functools
+import inspect
+import importlib.util
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, Tuple, Union, Callable, AsyncIterator
+import httpx
 import openai
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
 from fastapi import HTTPException
 from pydantic import BaseModel
 import logging
+from rate_limiter import OpenAIRateLimiter, LimitedStream, openai_rate_limiters, client_key, estimate_call_tokens
+from tenant_service import TenantRegistry, TenantConfig, current_tenant
 
 # Configuration du logging
 logging.basicConfig(level=logging.INFO)
@@ -27,20 +35,284 @@ class OpenAIConfigResponse(BaseModel):
     rate_limit_info: Optional[Dict[str, Any]] = None
     error_details: Optional[str] = None
 
+OpenAIClient = Union[AsyncOpenAI, OpenAI]
+
 class ConfigService:
     """Service de gestion de la configuration OpenAI"""
     
-    def __init__(self):
-        self.current_client: Optional[OpenAI] = None
+    def __init__(
+        self,
+        use_async_client: Optional[bool] = None,
+        sync_workers: Optional[int] = None,
+        max_cached_clients: Optional[int] = None
+    ):
+        self.current_client: Optional[OpenAIClient] = None
+        self.current_model: Optional[str] = None
         self.is_configured = False
         self.last_validation = None
         
-    async def validate_openai_config(self, config: OpenAIConfigRequest) -> OpenAIConfigResponse:
+        # Client asynchrone par défaut ; le client synchrone n'est qu'un repli
+        if use_async_client is None:
+            use_async_client = os.getenv("OPENAI_ASYNC_CLIENT", "true").lower() not in ("0", "false", "no")
+        self.use_async_client = use_async_client
+        
+        # Pool de threads borné pour les appels du client synchrone
+        if sync_workers is None:
+            sync_workers = int(os.getenv("OPENAI_SYNC_WORKERS", "8"))
+        self._sync_executor = ThreadPoolExecutor(
+            max_workers=max(1, sync_workers),
+            thread_name_prefix="openai-sync"
+        )
+        
+        # Transport HTTP partagé par tous les clients (créé à la demande) ; un
+        # transport de substitution peut être fourni (bancs d'essai hors réseau)
+        self.http_transport: Optional[httpx.AsyncBaseTransport] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._sync_http_client: Optional[httpx.Client] = None
+        
+        # Clients déjà validés, par (empreinte de la clé API, organisation)
+        if max_cached_clients is None:
+            max_cached_clients = int(os.getenv("OPENAI_CLIENT_CACHE_SIZE", "32"))
+        self.max_cached_clients = max(1, max_cached_clients)
+        self._clients: "OrderedDict[Tuple[str, Optional[str]], OpenAIClient]" = OrderedDict()
+        
+        # Clients par tenant (jeton de session), indépendants du client global
+        self.tenants = TenantRegistry(client_factory=self._client_for_tenant)
+    
+    def _client_for_tenant(self, tenant_config: TenantConfig) -> OpenAIClient:
+        """Crée (ou réutilise) le client d'une configuration de tenant déjà validée"""
+        config = OpenAIConfigRequest(
+            api_key=tenant_config.api_key,
+            organization_id=tenant_config.organization_id,
+            model=tenant_config.model
+        )
+        client = self._get_cached_client(config)
+        if client is None:
+            client = self._create_client(config)
+            self._remember_client(config, client)
+        return client
+    
+    def _http_settings(self) -> Dict[str, Any]:
+        """
+        Paramètres du transport HTTP partagé (keep-alive, HTTP/2, pool, timeouts)
+        
+        Returns:
+            Dict des arguments communs à httpx.Client et httpx.AsyncClient
+        """
+        http2_setting = os.getenv("OPENAI_HTTP2", "auto").lower()
+        h2_available = importlib.util.find_spec("h2") is not None
+        if http2_setting == "auto":
+            http2 = h2_available
+        else:
+            http2 = http2_setting not in ("0", "false", "no")
+            if http2 and not h2_available:
+                logger.warning("HTTP/2 demandé mais le paquet 'h2' n'est pas installé, utilisation de HTTP/1.1")
+                http2 = False
+        
+        return {
+            "http2": http2,
+            "timeout": httpx.Timeout(
+                float(os.getenv("OPENAI_TIMEOUT", "120")),
+                connect=float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+            ),
+            "limits": httpx.Limits(
+                max_connections=int(os.getenv("OPENAI_HTTP_MAX_CONNECTIONS", "100")),
+                max_keepalive_connections=int(os.getenv("OPENAI_HTTP_MAX_KEEPALIVE", "20")),
+                keepalive_expiry=float(os.getenv("OPENAI_HTTP_KEEPALIVE_EXPIRY", "30"))
+            )
+        }
+    
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Retourne le transport asynchrone partagé, en le créant si besoin"""
+        if self._http_client is None or self._http_client.is_closed:
+            async def on_response(response: httpx.Response) -> None:
+                self._update_limiter(response)
+            
+            settings = self._http_settings()
+            if self.http_transport is not None:
+                settings["transport"] = self.http_transport
+            self._http_client = httpx.AsyncClient(
+                event_hooks={"response": [on_response]},
+                **settings
+            )
+        return self._http_client
+    
+    def _get_sync_http_client(self) -> httpx.Client:
+        """Retourne le transport synchrone partagé, en le créant si besoin"""
+        if self._sync_http_client is None or self._sync_http_client.is_closed:
+            def on_response(response: httpx.Response) -> None:
+                self._update_limiter(response)
+            
+            self._sync_http_client = httpx.Client(
+                event_hooks={"response": [on_response]},
+                **self._http_settings()
+            )
+        return self._sync_http_client
+    
+    def _client_key(self, config: "OpenAIConfigRequest") -> Tuple[str, Optional[str]]:
+        """Clé de cache d'un client : empreinte de la clé API et organisation"""
+        return client_key(config.api_key, config.organization_id)
+    
+    def _limiter_for(self, func: Callable[..., Any]) -> OpenAIRateLimiter:
+        """Limiteur du client OpenAI auquel appartient la méthode func"""
+        client = getattr(getattr(func, "__self__", None), "_client", None)
+        api_key = getattr(client, "api_key", None)
+        organization = getattr(client, "organization", None)
+        if not isinstance(api_key, str):
+            api_key = ""
+        return openai_rate_limiters.get(client_key(api_key, organization if isinstance(organization, str) else None))
+    
+    def _update_limiter(self, response: httpx.Response) -> None:
+        """Recale le limiteur du client émetteur sur les en-têtes x-ratelimit-* de la réponse"""
+        if "x-ratelimit-remaining-requests" not in response.headers and "x-ratelimit-remaining-tokens" not in response.headers:
+            return
+        headers = response.request.headers
+        api_key = headers.get("authorization", "").removeprefix("Bearer ")
+        limiter = openai_rate_limiters.get(client_key(api_key, headers.get("openai-organization")))
+        limiter.update_from_headers(response.headers)
+    
+    def _get_cached_client(self, config: "OpenAIConfigRequest") -> Optional[OpenAIClient]:
+        """Retourne le client déjà créé pour cette configuration, s'il existe"""
+        key = self._client_key(config)
+        client = self._clients.get(key)
+        if client is not None:
+            self._clients.move_to_end(key)
+        return client
+    
+    def _remember_client(self, config: "OpenAIConfigRequest", client: OpenAIClient) -> None:
+        """
+        Conserve un client validé (éviction LRU)
+        
+        Les clients évincés ne sont pas fermés : ils partagent le transport HTTP,
+        qui n'est fermé qu'à l'arrêt de l'application.
+        """
+        key = self._client_key(config)
+        self._clients[key] = client
+        self._clients.move_to_end(key)
+        while len(self._clients) > self.max_cached_clients:
+            self._clients.popitem(last=False)
+    
+    async def aclose(self) -> None:
+        """Ferme le transport HTTP partagé et le pool de threads (arrêt de l'application)"""
+        self._clients.clear()
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._sync_http_client is not None:
+            self._sync_http_client.close()
+            self._sync_http_client = None
+        # Les threads ne sont créés qu'à la demande : le nouveau pool ne coûte rien
+        self._sync_executor.shutdown(wait=False)
+        self._sync_executor = ThreadPoolExecutor(
+            max_workers=self._sync_executor._max_workers,
+            thread_name_prefix="openai-sync"
+        )
+    
+    def _create_client(self, config: "OpenAIConfigRequest") -> OpenAIClient:
+        """
+        Crée le client OpenAI (asynchrone par défaut, synchrone en repli)
+        
+        Args:
+            config: Configuration OpenAI
+            
+        Returns:
+            OpenAIClient: Client OpenAI
+        """
+        # Les nouvelles tentatives sont gérées par le limiteur du client, pas par le SDK ;
+        # le transport HTTP (et son pool de connexions) est commun à tous les clients
+        if self.use_async_client:
+            return AsyncOpenAI(
+                api_key=config.api_key,
+                organization=config.organization_id,
+                max_retries=0,
+                http_client=self._get_http_client()
+            )
+        
+        return OpenAI(
+            api_key=config.api_key,
+            organization=config.organization_id,
+            max_retries=0,
+            http_client=self._get_sync_http_client()
+        )
+    
+    async def call_openai(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Exécute un appel OpenAI sans bloquer la boucle d'événements
+        
+        L'appel passe par le limiteur de son client (budgets de requêtes et de tokens,
+        concurrence adaptative, nouvelles tentatives). Les méthodes du client
+        asynchrone sont attendues directement ; celles du client synchrone sont
+        exécutées dans le pool de threads borné.
+        
+        Args:
+            func: Méthode du client OpenAI à appeler
+            
+        Returns:
+            Any: Résultat de l'appel
+        """
+        return await self._limiter_for(func).execute(
+            lambda: self._invoke(func, *args, **kwargs),
+            estimated_tokens=estimate_call_tokens(kwargs)
+        )
+    
+    async def _invoke(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Appelle func de façon asynchrone ou dans le pool de threads"""
+        if inspect.iscoroutinefunction(func):
+            return await func(*args, **kwargs)
+        
+        loop = asyncio.get_running_loop()
+        result = await loop.run_in_executor(
+            self._sync_executor,
+            functools.partial(func, *args, **kwargs)
+        )
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    async def iterate_stream(self, stream: Any) -> AsyncIterator[Any]:
+        """
+        Itère sur un flux OpenAI sans bloquer la boucle d'événements
+        
+        Un flux obtenu par call_openai libère son créneau du limiteur à la fin
+        de la lecture, ou dès que l'itération est interrompue.
+        
+        Args:
+            stream: Flux asynchrone (AsyncOpenAI) ou synchrone (OpenAI)
+            
+        Yields:
+            Any: Morceaux du flux
+        """
+        if isinstance(stream, LimitedStream):
+            try:
+                async for chunk in self.iterate_stream(stream.stream):
+                    stream.observe(chunk)
+                    yield chunk
+            finally:
+                await stream.release()
+            return
+        
+        if hasattr(stream, "__aiter__"):
+            async for chunk in stream:
+                yield chunk
+            return
+        
+        # Flux synchrone : chaque lecture est exécutée dans le pool de threads
+        iterator = iter(stream)
+        sentinel = object()
+        loop = asyncio.get_running_loop()
+        while True:
+            chunk = await loop.run_in_executor(self._sync_executor, next, iterator, sentinel)
+            if chunk is sentinel:
+                break
+            yield chunk
+        
+    async def validate_openai_config(self, config: OpenAIConfigRequest, tenant_id: Optional[str] = None) -> OpenAIConfigResponse:
         """
         Valide la configuration OpenAI et teste la connexion
         
         Args:
             config: Configuration OpenAI à valider
+            tenant_id: Jeton de session ; sans jeton, le client global est remplacé
             
         Returns:
             OpenAIConfigResponse: Résultat de la validation
@@ -56,19 +328,30 @@ class ConfigService:
                     error_details="La clé API doit commencer par 'sk-' et contenir au moins 20 caractères"
                 )
             
-            # Créer le client OpenAI temporaire pour les tests
-            test_client = OpenAI(
-                api_key=config.api_key,
-                organization=config.organization_id
-            )
+            # Réutiliser le client existant pour cette clé, sinon en créer un
+            test_client = self._get_cached_client(config) or self._create_client(config)
             
             # Test de connexion et validation
             connection_result = await self._test_openai_connection(test_client, config.model)
             
             if connection_result["success"]:
-                # Mettre à jour le client actuel si la validation réussit
-                self.current_client = test_client
-                self.is_configured = True
+                self._remember_client(config, test_client)
+                if tenant_id:
+                    # Client propre au tenant, partagé avec les autres workers
+                    await self.tenants.register(
+                        tenant_id,
+                        TenantConfig(
+                            api_key=config.api_key,
+                            organization_id=config.organization_id,
+                            model=config.model
+                        ),
+                        test_client
+                    )
+                else:
+                    # Mettre à jour le client actuel si la validation réussit
+                    self.current_client = test_client
+                    self.current_model = config.model
+                    self.is_configured = True
                 
                 return OpenAIConfigResponse(
                     is_valid=True,
@@ -104,7 +387,11 @@ class ConfigService:
         Returns:
             OpenAIConfigResponse: État de la configuration actuelle
         """
-        if not self.current_client:
+        tenant_id = current_tenant.get()
+        tenant_client = self.tenants.get_client(tenant_id) if tenant_id else None
+        if tenant_client is not None:
+            client = tenant_client
+        elif not self.current_client:
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 return OpenAIConfigResponse(
@@ -117,10 +404,12 @@ class ConfigService:
             # Initialiser avec la clé d'environnement
             config = OpenAIConfigRequest(api_key=api_key)
             return await self.validate_openai_config(config)
+        else:
+            client = self.current_client
         
         # Tester la configuration actuelle
         try:
-            test_result = await self._test_openai_connection(self.current_client, "gpt-4")
+            test_result = await self._test_openai_connection(client, "gpt-4")
             
             return OpenAIConfigResponse(
                 is_valid=test_result["success"],
@@ -141,16 +430,25 @@ class ConfigService:
                 error_details=str(e)
             )
     
-    def get_client(self) -> OpenAI:
+    def get_client(self) -> OpenAIClient:
         """
         Retourne le client OpenAI configuré
         
+        Le client du tenant de la requête en cours est prioritaire (lecture sans
+        verrou) ; à défaut, le client global est utilisé.
+        
         Returns:
-            OpenAI: Client configuré
+            OpenAIClient: Client configuré
             
         Raises:
             HTTPException: Si aucun client n'est configuré
         """
+        tenant_id = current_tenant.get()
+        if tenant_id:
+            tenant_client = self.tenants.get_client(tenant_id)
+            if tenant_client is not None:
+                return tenant_client
+        
         if not self.current_client or not self.is_configured:
             raise HTTPException(
                 status_code=500,
@@ -158,6 +456,20 @@ class ConfigService:
             )
         return self.current_client
     
+    def get_model(self) -> Optional[str]:
+        """
+        Retourne le modèle choisi lors de la configuration (tenant en cours, sinon global)
+        
+        Returns:
+            Optional[str]: Modèle configuré ou None
+        """
+        tenant_id = current_tenant.get()
+        if tenant_id:
+            tenant_config = self.tenants.get_config(tenant_id)
+            if tenant_config is not None:
+                return tenant_config.model
+        return self.current_model if self.is_configured else None
+    
     def _is_valid_api_key_format(self, api_key: str) -> bool:
         """
         Valide le format de base d'une clé API OpenAI
@@ -175,7 +487,7 @@ class ConfigService:
             len(api_key) <= 200
         )
     
-    async def _test_openai_connection(self, client: OpenAI, model: str = "gpt-4") -> Dict[str, Any]:
+    async def _test_openai_connection(self, client: OpenAIClient, model: str = "gpt-4") -> Dict[str, Any]:
         """
         Teste la connexion à OpenAI avec un appel simple
         
@@ -188,7 +500,8 @@ class ConfigService:
         """
         try:
             # Test simple avec un prompt minimal
-            response = client.chat.completions.create(
+            response = await self.call_openai(
+                client.chat.completions.create,
                 model=model,
                 messages=[
                     {"role": "system", "content": "Tu es un assistant utile."},
@@ -202,7 +515,7 @@ class ConfigService:
             organization = None
             try:
                 # Tentative de récupération des informations d'organisation
-                org_response = client.organizations.list()
+                org_response = await self.call_openai(client.organizations.list)
                 if org_response.data:
                     organization = org_response.data[0].name
             except:
@@ -215,7 +528,7 @@ class ConfigService:
                 "rate_limit_info": {
                     "requests_remaining": response.headers.get("x-ratelimit-remaining-requests"),
                     "tokens_remaining": response.headers.get("x-ratelimit-remaining-tokens")
-                } if hasattr(response, 'headers') else None
+                } if hasattr(response, 'headers') else (self._limiter_for(client.chat.completions.create).last_headers or None)
             }
             
         except openai.AuthenticationError as e:
@@ -0,0 +1,169 @@
+import os
+import json
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+from models import FileStructure
+from cache_service import LRUCache
+from history_service import SchemaRecord
+from metrics_service import metrics_service
+
+DEFAULT_TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "export_templates")
+
+# Version de la mise en page du document JSON (incluse dans la version des exports)
+JSON_FORMAT_VERSION = "1"
+
+# Formats d'export : extension -> (type MIME, gabarit Jinja ; None pour le JSON)
+EXPORT_FORMATS: Dict[str, Tuple[str, Optional[str]]] = {
+    "md": ("text/markdown; charset=utf-8", "plan.md"),
+    "html": ("text/html; charset=utf-8", "plan.html"),
+    "json": ("application/json", None),
+}
+
+STACK_LABELS = (
+    ("frontend", "Frontend"),
+    ("backend", "Backend"),
+    ("database", "Base de données"),
+    ("deployment", "Déploiement"),
+)
+
+def _as_text(value: Any) -> str:
+    """Valeur libre du modèle (liste, objet) en texte sur une ligne"""
+    if isinstance(value, dict):
+        return "; ".join(f"{key}: {_as_text(item)}" for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return ", ".join(_as_text(item) for item in value)
+    return "" if value is None else str(value)
+
+def _tree_lines(root: FileStructure) -> List[str]:
+    """Arborescence indentée, une ligne par nœud (parcours itératif)"""
+    lines: List[str] = []
+    stack: List[Tuple[FileStructure, int]] = [(root, 0)]
+    while stack:
+        node, depth = stack.pop()
+        is_dir = node.type == "directory" or bool(node.children)
+        lines.append(f"{'  ' * depth}{node.name}{'/' if is_dir else ''}")
+        stack.extend((child, depth + 1) for child in reversed(node.children or []))
+    return lines
+
+class ExportService:
+    """
+    Export des schémas de l'historique en Markdown, HTML imprimable et JSON
+
+    Les gabarits sont compilés une seule fois, à la création du service. Un
+    export rendu est conservé en cache par (identifiant, révision du schéma,
+    format, version des gabarits) : les téléchargements suivants ne refont
+    pas le rendu, et modifier un gabarit ou régénérer une section produit
+    une nouvelle clé.
+    """
+
+    def __init__(self, templates_dir: Optional[str] = None, cache: Optional[LRUCache] = None):
+        if templates_dir is None:
+            templates_dir = os.getenv("EXPORT_TEMPLATES_DIR", DEFAULT_TEMPLATES_DIR)
+        if cache is None:
+            cache = LRUCache(
+                max_entries=int(os.getenv("EXPORT_CACHE_MAX_ENTRIES", "256")),
+                max_bytes=int(os.getenv("EXPORT_CACHE_MAX_BYTES", str(16 * 1024 * 1024))),
+                ttl=float(os.getenv("EXPORT_CACHE_TTL", "86400"))
+            )
+        self.cache = cache
+
+        self.environment = Environment(
+            loader=FileSystemLoader(templates_dir),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            auto_reload=False
+        )
+        self.environment.filters["text"] = _as_text
+
+        digest = hashlib.sha256(JSON_FORMAT_VERSION.encode("utf-8"))
+        self.templates = {}
+        for export_format, (_, template_name) in EXPORT_FORMATS.items():
+            if template_name is None:
+                continue
+            source, _, _ = self.environment.loader.get_source(self.environment, template_name)
+            digest.update(source.encode("utf-8"))
+            self.templates[export_format] = self.environment.get_template(template_name)
+        self.version = digest.hexdigest()[:12]
+
+    def cache_key(self, record: SchemaRecord, export_format: str) -> str:
+        return f"{record.id}:{record.revision}:{export_format}:{self.version}"
+
+    def render(self, record: SchemaRecord, export_format: str) -> bytes:
+        """
+        Rend un schéma de l'historique dans le format demandé (sans cache)
+
+        Args:
+            record: Entrée de l'historique
+            export_format: "md", "html" ou "json"
+
+        Returns:
+            bytes: Document encodé en UTF-8
+        """
+        schema = record.schema_data
+        if export_format == "json":
+            document = {
+                "format": f"devplan.export/{JSON_FORMAT_VERSION}",
+                "id": record.id,
+                "revision": record.revision,
+                "created_at": datetime.fromtimestamp(record.created_at, timezone.utc).isoformat(),
+                "request": record.request.model_dump(mode="json"),
+                "schema": schema.model_dump(mode="json")
+            }
+            return json.dumps(document, ensure_ascii=False, indent=2).encode("utf-8")
+
+        stack = schema.recommended_stack
+        context = {
+            "schema": schema,
+            "stack": [(label, getattr(stack, slot)) for slot, label in STACK_LABELS]
+                     + [("Outil complémentaire", tool) for tool in stack.additional_tools],
+            "tree": _tree_lines(schema.file_structure),
+            "lists": [
+                ("Fonctionnalités", schema.features),
+                ("Exigences techniques", schema.technical_requirements),
+                ("Documentation", schema.documentation),
+                ("Défis potentiels", schema.potential_challenges),
+                ("Indicateurs de succès", schema.success_metrics),
+            ],
+            "strategies": [
+                ("Stratégie de déploiement", schema.deployment_strategy),
+                ("Stratégie de tests", schema.testing_strategy),
+                ("Monitoring", schema.monitoring_strategy),
+            ],
+        }
+        return self.templates[export_format].render(context).encode("utf-8")
+
+    async def export(self, record: SchemaRecord, export_format: str) -> Tuple[bytes, bool]:
+        """
+        Export d'un schéma, servi depuis le cache s'il a déjà été rendu
+
+        Le rendu s'exécute hors de la boucle d'événements.
+
+        Args:
+            record: Entrée de l'historique
+            export_format: "md", "html" ou "json"
+
+        Returns:
+            Tuple[bytes, bool]: Document et indicateur de lecture en cache
+
+        Raises:
+            ValueError: Si le format est inconnu
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Format d'export inconnu : {export_format}")
+        key = self.cache_key(record, export_format)
+        content = self.cache.get(key)
+        if content is not None:
+            return content, True
+        with metrics_service.stage("export_render"):
+            content = await asyncio.to_thread(self.render, record, export_format)
+        self.cache.set(key, content, len(content))
+        return content, False
+
+# Instance globale de l'export (gabarits compilés au démarrage)
+export_service = ExportService()
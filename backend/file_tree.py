@@ -0,0 +1,158 @@
+import os
+import sys
+from array import array
+from collections import deque
+from itertools import repeat
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Limites de l'arborescence produite par le modèle (profondeur de la racine, nombre de nœuds)
+MAX_DEPTH = int(os.getenv("FILE_TREE_MAX_DEPTH", "32"))
+MAX_NODES = int(os.getenv("FILE_TREE_MAX_NODES", "10000"))
+
+# Indicateurs de type d'un nœud : dossier, liste "children" présente (même vide)
+DIRECTORY, LISTED = 1, 2
+DIRECTORY_TYPES = ("directory", "dir", "folder")
+
+class FileTree:
+    """
+    Arborescence compacte à plat
+
+    Un nœud est un indice dans des tableaux parallèles : indice du parent
+    (-1 pour la racine), nom interné (les "index.ts" ou "__init__.py"
+    répétés partagent la même chaîne), indicateurs sur un octet ; le contenu
+    des fichiers est stocké à part, seulement quand il existe. Les nœuds sont
+    rangés en largeur : un parent précède toujours ses enfants et les frères
+    restent dans leur ordre d'origine, ce qui permet de reconstruire la
+    forme imbriquée en un seul passage.
+    """
+
+    __slots__ = ("parents", "names", "kinds", "contents", "pruned")
+
+    def __init__(self):
+        self.parents = array("i")
+        self.names: List[str] = []
+        self.kinds = bytearray()
+        self.contents: Dict[int, str] = {}
+        # Nœuds écartés par les limites (chacun avec son éventuel sous-arbre)
+        self.pruned = 0
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def add(self, parent: int, name: str, is_dir: bool, listed: bool = False, content: Optional[str] = None) -> int:
+        """Ajoute un nœud et renvoie son indice"""
+        index = len(self.names)
+        self.parents.append(parent)
+        self.names.append(sys.intern(name))
+        self.kinds.append((DIRECTORY if is_dir else 0) | (LISTED if listed else 0))
+        if content is not None:
+            self.contents[index] = content
+        return index
+
+    @staticmethod
+    def within_limits(data: Dict[str, Any], max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> bool:
+        """
+        Vérifie sans rien construire que l'arborescence respecte les limites
+
+        Parcours itératif interrompu dès la première limite dépassée.
+        """
+        max_depth = MAX_DEPTH if max_depth is None else max_depth
+        max_nodes = MAX_NODES if max_nodes is None else max_nodes
+        count = 0
+        stack: List[Tuple[Any, int]] = [(data, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if not isinstance(node, dict):
+                continue
+            count += 1
+            if count > max_nodes:
+                return False
+            children = node.get("children")
+            if isinstance(children, list) and children:
+                if depth >= max_depth:
+                    return False
+                stack.extend(zip(children, repeat(depth + 1)))
+        return True
+
+    @classmethod
+    def parse(cls, data: Dict[str, Any], max_depth: Optional[int] = None, max_nodes: Optional[int] = None) -> "FileTree":
+        """
+        Construit l'arborescence à partir du JSON imbriqué du modèle
+
+        Parcours itératif en largeur (aucune récursion) : au-delà de
+        max_depth les dossiers sont conservés vides, au-delà de max_nodes
+        les niveaux les plus profonds sont abandonnés en premier. Les
+        enfants qui ne sont pas des objets sont ignorés.
+
+        Args:
+            data: Nœud racine ({"name", "type", "children", "content"})
+            max_depth: Profondeur maximale (FILE_TREE_MAX_DEPTH par défaut)
+            max_nodes: Nombre maximal de nœuds (FILE_TREE_MAX_NODES par défaut)
+
+        Returns:
+            FileTree: Arborescence compacte
+
+        Raises:
+            ValueError: Si la racine n'est pas un objet
+        """
+        if not isinstance(data, dict):
+            raise ValueError("La racine de l'arborescence doit être un objet")
+        max_depth = MAX_DEPTH if max_depth is None else max_depth
+        max_nodes = max(1, MAX_NODES if max_nodes is None else max_nodes)
+
+        tree = cls()
+        queue: Deque[Tuple[Dict[str, Any], int, int]] = deque([(data, -1, 0)])
+        while queue:
+            if len(tree) >= max_nodes:
+                tree.pruned += len(queue)
+                break
+            node, parent, depth = queue.popleft()
+            name = node.get("name")
+            content = node.get("content")
+            children = node.get("children")
+            listed = isinstance(children, list)
+            children = children if listed else []
+            is_dir = node.get("type") in DIRECTORY_TYPES or bool(children)
+            index = tree.add(
+                parent,
+                name if isinstance(name, str) else ("" if name is None else str(name)),
+                is_dir,
+                listed,
+                content if isinstance(content, str) else None
+            )
+            if depth >= max_depth:
+                tree.pruned += len(children)
+                continue
+            queue.extend((child, index, depth + 1) for child in children if isinstance(child, dict))
+
+        if tree.pruned:
+            logger.warning(
+                f"Arborescence tronquée : {tree.pruned} nœud(s) écarté(s) "
+                f"(limites : profondeur {max_depth}, {max_nodes} nœuds)"
+            )
+        return tree
+
+    def nodes(self) -> Iterator[Tuple[int, str, bool, bool, Optional[str]]]:
+        """Nœuds dans l'ordre de stockage : (parent, nom, dossier ?, liste d'enfants ?, contenu)"""
+        contents = self.contents
+        for index, parent in enumerate(self.parents):
+            kind = self.kinds[index]
+            yield parent, self.names[index], bool(kind & DIRECTORY), bool(kind & LISTED), contents.get(index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme imbriquée (JSON de FileStructure), reconstruite sans récursion"""
+        built: List[Dict[str, Any]] = []
+        for parent, name, is_dir, listed, content in self.nodes():
+            node = {
+                "name": name,
+                "type": "directory" if is_dir else "file",
+                "children": [] if listed else None,
+                "content": content
+            }
+            built.append(node)
+            if parent >= 0:
+                built[parent]["children"].append(node)
+        return built[0]
@@ -0,0 +1,150 @@
+import os
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+import logging
+from config_service import config_service, OpenAIConfigResponse
+
+logger = logging.getLogger(__name__)
+
+class HealthService:
+    """
+    Service de santé de l'API
+
+    Conserve le dernier résultat de validation OpenAI et le rafraîchit en
+    arrière-plan, afin que les sondes de santé ne déclenchent jamais d'appel
+    payant à l'API OpenAI.
+    """
+
+    def __init__(self, freshness: Optional[float] = None, refresh_interval: Optional[float] = None):
+        if freshness is None:
+            freshness = float(os.getenv("HEALTH_FRESHNESS_SECONDS", "300"))
+        if refresh_interval is None:
+            refresh_interval = float(os.getenv("HEALTH_REFRESH_INTERVAL", str(freshness)))
+        self.freshness = freshness
+        self.refresh_interval = refresh_interval
+        self.last_result: Optional[OpenAIConfigResponse] = None
+        self.last_checked_at: Optional[float] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def record(self, result: OpenAIConfigResponse) -> None:
+        """
+        Enregistre un résultat de validation OpenAI
+
+        Args:
+            result: Résultat de la validation
+        """
+        self.last_result = result
+        self.last_checked_at = time.time()
+
+    def is_fresh(self) -> bool:
+        """Indique si le dernier résultat est encore dans la fenêtre de fraîcheur"""
+        return (
+            self.last_checked_at is not None and
+            time.time() - self.last_checked_at < self.freshness
+        )
+
+    async def refresh(self) -> OpenAIConfigResponse:
+        """
+        Revalide la configuration OpenAI et met à jour le cache
+
+        Returns:
+            OpenAIConfigResponse: Nouveau résultat
+        """
+        try:
+            result = await config_service.test_current_config()
+        except Exception as e:
+            logger.error(f"Erreur lors du rafraîchissement de l'état OpenAI: {str(e)}")
+            result = OpenAIConfigResponse(
+                is_valid=False,
+                status="error",
+                message="Erreur lors du test de configuration",
+                model_available=False,
+                error_details=str(e)
+            )
+        self.record(result)
+        return result
+
+    def schedule_refresh(self) -> None:
+        """Lance un rafraîchissement en arrière-plan s'il n'y en a pas déjà un"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self.refresh())
+
+    def get_openai_status(self) -> Optional[OpenAIConfigResponse]:
+        """
+        Retourne l'état OpenAI en cache, sans aucune E/S
+
+        Un rafraîchissement en arrière-plan est planifié si le résultat est périmé.
+
+        Returns:
+            Optional[OpenAIConfigResponse]: Dernier résultat connu ou None
+        """
+        if not self.is_fresh():
+            self.schedule_refresh()
+        return self.last_result
+
+    def last_checked_iso(self) -> Optional[str]:
+        """Date du dernier contrôle au format ISO 8601"""
+        if self.last_checked_at is None:
+            return None
+        return datetime.fromtimestamp(self.last_checked_at, tz=timezone.utc).isoformat()
+
+    def readiness(self) -> Dict[str, Any]:
+        """
+        Construit l'état de disponibilité à partir du résultat en cache
+
+        Returns:
+            Dict contenant l'état de disponibilité
+        """
+        openai_status = self.get_openai_status()
+        if openai_status is None:
+            return {
+                "ready": False,
+                "status": "starting",
+                "checked_at": None,
+                "services": {"openai": {"status": "unknown", "configured": False}, "api": "running"}
+            }
+
+        return {
+            "ready": openai_status.is_valid,
+            "status": "ready" if openai_status.is_valid else "not_ready",
+            "checked_at": self.last_checked_iso(),
+            "stale": not self.is_fresh(),
+            "services": {
+                "openai": {
+                    "status": openai_status.status,
+                    "configured": openai_status.is_valid,
+                    "model_available": openai_status.model_available,
+                    "message": openai_status.message
+                },
+                "api": "running"
+            }
+        }
+
+    async def _refresh_loop(self) -> None:
+        """Boucle de rafraîchissement périodique"""
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def start(self) -> None:
+        """Démarre le rafraîchissement périodique en arrière-plan"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self) -> None:
+        """Arrête les tâches de rafraîchissement"""
+        for task in (self._loop_task, self._refresh_task):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._refresh_task = None
+
+# Instance globale du service de santé
+health_service = HealthService()
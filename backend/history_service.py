@@ -0,0 +1,407 @@
+import os
+import time
+import uuid
+import zlib
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from pydantic import BaseModel
+import logging
+from models import ProjectRequest, ProjectSchema
+from tenant_service import current_tenant, tenant_hash
+
+logger = logging.getLogger(__name__)
+
+class SchemaSummary(BaseModel):
+    """Entrée de l'historique sans le schéma (listes paginées)"""
+    id: str
+    request_hash: str
+    project_name: str
+    project_type: str
+    complexity: str
+    created_at: float
+
+class SchemaRecord(SchemaSummary):
+    """Schéma généré conservé dans l'historique avec la requête qui l'a produit"""
+    request: ProjectRequest
+    schema_data: ProjectSchema
+    # Empreinte du tenant propriétaire ("" hors session)
+    tenant: str = ""
+    # Incrémentée à chaque mise à jour du schéma (invalide les exports en cache)
+    revision: int = 0
+
+    def summary(self) -> SchemaSummary:
+        return SchemaSummary(**self.model_dump(include=set(SchemaSummary.model_fields)))
+
+class RevisionConflictError(Exception):
+    """Le schéma a été modifié depuis sa lecture (mise à jour concurrente)"""
+
+class SchemaPage(BaseModel):
+    """Page de l'historique (curseur opaque vers la page suivante)"""
+    items: List[SchemaSummary]
+    next_cursor: Optional[str] = None
+
+def encode_cursor(created_at: float, schema_id: str) -> str:
+    return f"{created_at!r}_{schema_id}"
+
+def decode_cursor(cursor: str) -> Tuple[float, str]:
+    """
+    Raises:
+        ValueError: Si le curseur est invalide
+    """
+    created_at, _, schema_id = cursor.partition("_")
+    if not schema_id:
+        raise ValueError("Curseur invalide")
+    return float(created_at), schema_id
+
+class HistoryStore(ABC):
+    """Interface des stockages de l'historique des générations"""
+
+    @abstractmethod
+    async def save(self, record: SchemaRecord) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, record: SchemaRecord, expected_revision: int) -> bool:
+        """Remplace une entrée si sa révision est toujours expected_revision"""
+        ...
+
+    @abstractmethod
+    async def get(self, schema_id: str, tenant: str = "") -> Optional[SchemaRecord]:
+        ...
+
+    @abstractmethod
+    async def find_id(self, request_hash: str, tenant: str = "") -> Optional[str]:
+        ...
+
+    @abstractmethod
+    async def list(
+        self,
+        limit: int,
+        cursor: Optional[Tuple[float, str]] = None,
+        project_type: Optional[str] = None,
+        complexity: Optional[str] = None,
+        tenant: str = ""
+    ) -> List[SchemaSummary]:
+        ...
+
+class InMemoryHistoryStore(HistoryStore):
+    """Historique en mémoire (un seul processus, perdu au redémarrage)"""
+
+    def __init__(self, max_entries: int = 1000):
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, SchemaRecord]" = OrderedDict()
+
+    async def save(self, record: SchemaRecord) -> None:
+        self._records[record.id] = record
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    async def update(self, record: SchemaRecord, expected_revision: int) -> bool:
+        current = self._records.get(record.id)
+        if current is None or current.tenant != record.tenant or current.revision != expected_revision:
+            return False
+        self._records[record.id] = record
+        return True
+
+    async def get(self, schema_id: str, tenant: str = "") -> Optional[SchemaRecord]:
+        record = self._records.get(schema_id)
+        if record is None or record.tenant != tenant:
+            return None
+        return record
+
+    async def find_id(self, request_hash: str, tenant: str = "") -> Optional[str]:
+        for record in reversed(self._records.values()):
+            if record.request_hash == request_hash and record.tenant == tenant:
+                return record.id
+        return None
+
+    async def list(self, limit, cursor=None, project_type=None, complexity=None, tenant="") -> List[SchemaSummary]:
+        records = sorted(self._records.values(), key=lambda record: (record.created_at, record.id), reverse=True)
+        items = []
+        for record in records:
+            if record.tenant != tenant:
+                continue
+            if cursor is not None and (record.created_at, record.id) >= cursor:
+                continue
+            if project_type and record.project_type != project_type:
+                continue
+            if complexity and record.complexity != complexity:
+                continue
+            items.append(record.summary())
+            if len(items) == limit:
+                break
+        return items
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Historique persistant dans SQLite (mode WAL)
+
+    Le WAL permet les lectures concurrentes pendant une écriture et partage la
+    base entre plusieurs workers. Les colonnes filtrables sont indexées ; le
+    schéma et la requête sont stockés en JSON compressé (zlib).
+    """
+
+    def __init__(self, path: str, compression_level: int = 6):
+        self.path = path
+        self.compression_level = compression_level
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion partagée, ouverte et initialisée à la première utilisation"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_history ("
+                    "id TEXT PRIMARY KEY, request_hash TEXT NOT NULL, project_name TEXT NOT NULL, "
+                    "project_type TEXT NOT NULL, complexity TEXT NOT NULL, "
+                    "created_at REAL NOT NULL, payload BLOB NOT NULL, tenant TEXT NOT NULL DEFAULT '', "
+                    "revision INTEGER NOT NULL DEFAULT 0)"
+                )
+                # Bases créées avant le cloisonnement par tenant et les révisions
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(schema_history)")}
+                if "tenant" not in columns:
+                    conn.execute("ALTER TABLE schema_history ADD COLUMN tenant TEXT NOT NULL DEFAULT ''")
+                if "revision" not in columns:
+                    conn.execute("ALTER TABLE schema_history ADD COLUMN revision INTEGER NOT NULL DEFAULT 0")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_hash ON schema_history(request_hash, created_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_type ON schema_history(project_type, created_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_complexity ON schema_history(complexity, created_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_created ON schema_history(created_at)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_history_tenant ON schema_history(tenant, created_at)")
+            self._conn = conn
+        return self._conn
+
+    def _save(self, record: SchemaRecord) -> None:
+        payload = zlib.compress(record.model_dump_json().encode("utf-8"), self.compression_level)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO schema_history "
+                    "(id, request_hash, project_name, project_type, complexity, created_at, payload, tenant, revision) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (record.id, record.request_hash, record.project_name, record.project_type,
+                     record.complexity, record.created_at, payload, record.tenant, record.revision)
+                )
+
+    def _update(self, record: SchemaRecord, expected_revision: int) -> bool:
+        payload = zlib.compress(record.model_dump_json().encode("utf-8"), self.compression_level)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                cursor = conn.execute(
+                    "UPDATE schema_history SET project_name = ?, project_type = ?, complexity = ?, "
+                    "payload = ?, revision = ? WHERE id = ? AND tenant = ? AND revision = ?",
+                    (record.project_name, record.project_type, record.complexity, payload,
+                     record.revision, record.id, record.tenant, expected_revision)
+                )
+        return cursor.rowcount == 1
+
+    def _get(self, schema_id: str, tenant: str) -> Optional[SchemaRecord]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT payload FROM schema_history WHERE id = ? AND tenant = ?", (schema_id, tenant)
+            ).fetchone()
+        if row is None:
+            return None
+        return SchemaRecord.model_validate_json(zlib.decompress(row[0]))
+
+    def _find_id(self, request_hash: str, tenant: str) -> Optional[str]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id FROM schema_history WHERE request_hash = ? AND tenant = ? ORDER BY created_at DESC LIMIT 1",
+                (request_hash, tenant)
+            ).fetchone()
+        return row[0] if row else None
+
+    def _list(self, limit, cursor, project_type, complexity, tenant) -> List[SchemaSummary]:
+        clauses, params = ["tenant = ?"], [tenant]
+        if cursor is not None:
+            clauses.append("(created_at, id) < (?, ?)")
+            params.extend(cursor)
+        if project_type:
+            clauses.append("project_type = ?")
+            params.append(project_type)
+        if complexity:
+            clauses.append("complexity = ?")
+            params.append(complexity)
+        where = f"WHERE {' AND '.join(clauses)} "
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, request_hash, project_name, project_type, complexity, created_at "
+                f"FROM schema_history {where}ORDER BY created_at DESC, id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [
+            SchemaSummary(
+                id=row[0], request_hash=row[1], project_name=row[2],
+                project_type=row[3], complexity=row[4], created_at=row[5]
+            )
+            for row in rows
+        ]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    async def save(self, record: SchemaRecord) -> None:
+        await asyncio.to_thread(self._save, record)
+
+    async def update(self, record: SchemaRecord, expected_revision: int) -> bool:
+        return await asyncio.to_thread(self._update, record, expected_revision)
+
+    async def get(self, schema_id: str, tenant: str = "") -> Optional[SchemaRecord]:
+        return await asyncio.to_thread(self._get, schema_id, tenant)
+
+    async def find_id(self, request_hash: str, tenant: str = "") -> Optional[str]:
+        return await asyncio.to_thread(self._find_id, request_hash, tenant)
+
+    async def list(self, limit, cursor=None, project_type=None, complexity=None, tenant="") -> List[SchemaSummary]:
+        return await asyncio.to_thread(self._list, limit, cursor, project_type, complexity, tenant)
+
+def create_history_store() -> Optional[HistoryStore]:
+    """
+    Crée le stockage de l'historique selon la configuration
+
+    HISTORY_STORE=sqlite (défaut, chemin dans HISTORY_DB_PATH), memory ou off.
+    """
+    backend = os.getenv("HISTORY_STORE", "sqlite").lower()
+    if backend in ("off", "none", "false", "0"):
+        return None
+    if backend == "memory":
+        return InMemoryHistoryStore(max_entries=int(os.getenv("HISTORY_MAX_ENTRIES", "1000")))
+    return SQLiteHistoryStore(os.getenv("HISTORY_DB_PATH", "history.db"))
+
+class HistoryService:
+    """
+    Historique des schémas générés
+
+    Chaque schéma produit reçoit un identifiant : le retrouver coûte une
+    lecture indexée au lieu d'une nouvelle génération. L'historique est
+    cloisonné par tenant (jeton de session de la requête en cours) : un
+    tenant ne voit ni ne retrouve les schémas d'un autre.
+    """
+
+    def __init__(self, store: Optional[HistoryStore] = None, enabled: Optional[bool] = None):
+        if store is None and enabled is not False:
+            store = create_history_store()
+        self.store = store
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    async def record(self, request: ProjectRequest, schema: ProjectSchema, request_hash: str) -> Optional[str]:
+        """
+        Enregistre un schéma généré
+
+        Args:
+            request: Requête qui l'a produit
+            schema: Schéma généré
+            request_hash: Empreinte de la requête (clé de cache)
+
+        Returns:
+            Optional[str]: Identifiant du schéma (None si l'historique est désactivé ou indisponible)
+        """
+        if self.store is None:
+            return None
+        record = SchemaRecord(
+            id=uuid.uuid4().hex,
+            request_hash=request_hash,
+            project_name=schema.project_name,
+            project_type=schema.project_type,
+            complexity=schema.complexity,
+            created_at=time.time(),
+            request=request,
+            schema_data=schema,
+            tenant=tenant_hash(current_tenant.get())
+        )
+        try:
+            await self.store.save(record)
+        except Exception as e:
+            # L'historique ne doit jamais faire échouer une génération
+            logger.error(f"Erreur lors de l'enregistrement dans l'historique: {str(e)}")
+            return None
+        return record.id
+
+    async def update(self, record: SchemaRecord, schema: ProjectSchema) -> SchemaRecord:
+        """
+        Remplace le schéma d'une entrée existante (même identifiant)
+
+        La mise à jour n'aboutit que si l'entrée est toujours à la révision
+        lue dans record : deux régénérations concurrentes ne s'écrasent pas.
+
+        Args:
+            record: Entrée à mettre à jour (telle que lue)
+            schema: Nouveau schéma
+
+        Returns:
+            SchemaRecord: Entrée mise à jour
+
+        Raises:
+            RevisionConflictError: Si l'entrée a été modifiée depuis sa lecture
+        """
+        updated = record.model_copy(update={
+            "schema_data": schema,
+            "revision": record.revision + 1,
+            "project_name": schema.project_name,
+            "project_type": schema.project_type,
+            "complexity": schema.complexity
+        })
+        if self.store is not None and not await self.store.update(updated, record.revision):
+            raise RevisionConflictError(f"Le schéma {record.id} a été modifié entre-temps")
+        return updated
+
+    async def get(self, schema_id: str) -> Optional[SchemaRecord]:
+        """Schéma de l'historique par identifiant (tenant courant)"""
+        if self.store is None:
+            return None
+        return await self.store.get(schema_id, tenant_hash(current_tenant.get()))
+
+    async def find_id(self, request_hash: str) -> Optional[str]:
+        """Identifiant du schéma le plus récent produit pour une requête (tenant courant)"""
+        if self.store is None:
+            return None
+        return await self.store.find_id(request_hash, tenant_hash(current_tenant.get()))
+
+    async def list(
+        self,
+        limit: int = 20,
+        cursor: Optional[str] = None,
+        project_type: Optional[str] = None,
+        complexity: Optional[str] = None
+    ) -> SchemaPage:
+        """
+        Liste l'historique du plus récent au plus ancien (pagination par curseur)
+
+        Raises:
+            ValueError: Si le curseur est invalide
+        """
+        if self.store is None:
+            return SchemaPage(items=[])
+        position = decode_cursor(cursor) if cursor else None
+        items = await self.store.list(limit + 1, position, project_type, complexity, tenant_hash(current_tenant.get()))
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            next_cursor = encode_cursor(items[-1].created_at, items[-1].id)
+        return SchemaPage(items=items, next_cursor=next_cursor)
+
+    def close(self) -> None:
+        """Ferme la connexion du stockage (arrêt de l'application)"""
+        close = getattr(self.store, "close", None)
+        if close is not None:
+            close()
+
+# Instance globale de l'historique
+history_service = HistoryService()
@@ -0,0 +1,314 @@
+import os
+import time
+import uuid
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from pydantic import BaseModel
+import logging
+from models import ProjectRequest, ProjectSchema
+from tenant_service import current_tenant
+
+logger = logging.getLogger(__name__)
+
+class JobStatus(str, Enum):
+    """États d'une tâche de génération"""
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+TERMINAL_STATUSES = (JobStatus.SUCCEEDED, JobStatus.FAILED)
+
+class JobInfo(BaseModel):
+    """État et résultat d'une tâche de génération"""
+    id: str
+    status: JobStatus
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    request: ProjectRequest
+    result: Optional[ProjectSchema] = None
+    fallback: bool = False
+    error: Optional[str] = None
+
+class QueueFullError(Exception):
+    """La file d'attente des tâches est pleine"""
+
+class JobStore(ABC):
+    """Interface des stockages de tâches"""
+
+    @abstractmethod
+    async def save(self, job: JobInfo) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        ...
+
+class InMemoryJobStore(JobStore):
+    """Stockage des tâches en mémoire (un seul processus)"""
+
+    def __init__(self, max_jobs: int = 1000, ttl: float = 3600):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs: "OrderedDict[str, JobInfo]" = OrderedDict()
+
+    async def save(self, job: JobInfo) -> None:
+        self._jobs[job.id] = job
+        self._jobs.move_to_end(job.id)
+        self._evict()
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        job = self._jobs.get(job_id)
+        if job is not None and time.time() - job.created_at > self.ttl:
+            del self._jobs[job_id]
+            return None
+        return job
+
+    def _evict(self) -> None:
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+class SQLiteJobStore(JobStore):
+    """Stockage des tâches dans SQLite, partageable entre plusieurs workers"""
+
+    def __init__(self, path: str, ttl: float = 3600):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, "
+                "created_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs(created_at)")
+
+    def _save(self, job: JobInfo) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, payload) VALUES (?, ?, ?, ?)",
+                (job.id, job.status.value, job.created_at, job.model_dump_json())
+            )
+            conn.execute("DELETE FROM jobs WHERE created_at < ?", (time.time() - self.ttl,))
+
+    def _get(self, job_id: str) -> Optional[JobInfo]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT payload FROM jobs WHERE id = ? AND created_at >= ?",
+                (job_id, time.time() - self.ttl)
+            ).fetchone()
+        return JobInfo.model_validate_json(row[0]) if row else None
+
+    async def save(self, job: JobInfo) -> None:
+        await asyncio.to_thread(self._save, job)
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        return await asyncio.to_thread(self._get, job_id)
+
+def create_job_store() -> JobStore:
+    """
+    Crée le stockage des tâches selon la configuration
+
+    JOB_STORE=memory (défaut) ou sqlite (chemin dans JOB_STORE_PATH).
+    """
+    ttl = float(os.getenv("JOB_TTL_SECONDS", "3600"))
+    backend = os.getenv("JOB_STORE", "memory").lower()
+    if backend == "sqlite":
+        return SQLiteJobStore(os.getenv("JOB_STORE_PATH", "jobs.db"), ttl=ttl)
+    return InMemoryJobStore(max_jobs=int(os.getenv("JOB_STORE_MAX_JOBS", "1000")), ttl=ttl)
+
+# Fonction exécutant une génération : renvoie un objet exposant schema et is_fallback
+JobRunner = Callable[[ProjectRequest], Awaitable[Any]]
+
+class JobService:
+    """
+    File d'attente asynchrone des générations
+
+    Les requêtes HTTP enregistrent une tâche et rendent la main immédiatement ;
+    un pool de workers asyncio à concurrence bornée exécute les générations.
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        concurrency: Optional[int] = None,
+        max_queue_size: Optional[int] = None
+    ):
+        if concurrency is None:
+            concurrency = int(os.getenv("JOB_WORKERS", "4"))
+        if max_queue_size is None:
+            max_queue_size = int(os.getenv("JOB_QUEUE_MAX_SIZE", "100"))
+        self.store = store if store is not None else create_job_store()
+        self.concurrency = max(1, concurrency)
+        self.max_queue_size = max_queue_size
+        self.runner: Optional[JobRunner] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._events: Dict[str, asyncio.Event] = {}
+
+    @property
+    def queue_size(self) -> int:
+        """Nombre de tâches en attente"""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def start(self, runner: JobRunner) -> None:
+        """
+        Démarre les workers
+
+        Args:
+            runner: Fonction exécutant une génération
+        """
+        self.runner = runner
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        while len(self._workers) < self.concurrency:
+            self._workers.append(asyncio.create_task(self._worker()))
+
+    async def stop(self) -> None:
+        """Arrête les workers"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    async def submit(self, request: ProjectRequest) -> JobInfo:
+        """
+        Enregistre une nouvelle tâche de génération
+
+        Args:
+            request: Requête de projet
+
+        Returns:
+            JobInfo: Tâche créée (en attente)
+
+        Raises:
+            QueueFullError: Si la file d'attente est pleine
+        """
+        if self._queue is None or not self._workers:
+            raise RuntimeError("Le service de tâches n'est pas démarré")
+        if self._queue.full():
+            raise QueueFullError("File d'attente des générations pleine")
+
+        job = JobInfo(
+            id=uuid.uuid4().hex,
+            status=JobStatus.QUEUED,
+            created_at=time.time(),
+            request=request
+        )
+        await self.store.save(job)
+        self._events[job.id] = asyncio.Event()
+        # Le tenant de la requête est conservé pour que le worker utilise son client
+        self._queue.put_nowait((job.id, current_tenant.get()))
+        return job
+
+    async def complete(self, request: ProjectRequest, schema: ProjectSchema) -> JobInfo:
+        """
+        Enregistre une tâche déjà terminée (résultat disponible en cache)
+
+        Args:
+            request: Requête de projet
+            schema: Schéma déjà disponible
+
+        Returns:
+            JobInfo: Tâche terminée
+        """
+        now = time.time()
+        job = JobInfo(
+            id=uuid.uuid4().hex,
+            status=JobStatus.SUCCEEDED,
+            created_at=now,
+            started_at=now,
+            finished_at=now,
+            request=request,
+            result=schema
+        )
+        await self.store.save(job)
+        return job
+
+    async def get(self, job_id: str) -> Optional[JobInfo]:
+        """Retourne l'état d'une tâche"""
+        return await self.store.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float, poll_interval: float = 0.5) -> Optional[JobInfo]:
+        """
+        Attend la fin d'une tâche (long-polling)
+
+        La notification est immédiate pour les tâches de ce processus ; le stockage
+        est interrogé périodiquement pour celles exécutées par un autre worker.
+
+        Args:
+            job_id: Identifiant de la tâche
+            timeout: Durée maximale d'attente en secondes
+
+        Returns:
+            Optional[JobInfo]: État de la tâche à la fin de l'attente
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = await self.store.get(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or job.status in TERMINAL_STATUSES or remaining <= 0:
+                return job
+
+            event = self._events.get(job_id)
+            try:
+                if event is not None:
+                    await asyncio.wait_for(event.wait(), timeout=remaining)
+                else:
+                    await asyncio.sleep(min(poll_interval, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+    async def _worker(self) -> None:
+        """Boucle d'un worker : exécute les tâches de la file une à une"""
+        while True:
+            job_id, tenant_id = await self._queue.get()
+            token = current_tenant.set(tenant_id)
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Erreur inattendue du worker pour la tâche {job_id}: {str(e)}")
+            finally:
+                current_tenant.reset(token)
+                self._queue.task_done()
+                event = self._events.pop(job_id, None)
+                if event is not None:
+                    event.set()
+
+    async def _run_job(self, job_id: str) -> None:
+        """Exécute une tâche et enregistre son résultat"""
+        job = await self.store.get(job_id)
+        if job is None:
+            return
+
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        await self.store.save(job)
+
+        try:
+            result = await self.runner(job.request)
+            job.result = result.schema
+            job.fallback = result.is_fallback
+            job.status = JobStatus.SUCCEEDED
+        except Exception as e:
+            logger.error(f"Échec de la tâche de génération {job_id}: {str(e)}")
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        job.finished_at = time.time()
+        await self.store.save(job)
+
+# Instance globale du service de tâches
+job_service = JobService()
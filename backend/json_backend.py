@@ -0,0 +1,33 @@
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:  # Dépendance optionnelle : repli sur le module json standard
+    orjson = None
+
+JSONDecodeError = orjson.JSONDecodeError if orjson is not None else json.JSONDecodeError
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    Décode un document JSON (orjson si disponible)
+
+    Raises:
+        json.JSONDecodeError: Si le document n'est pas un JSON valide
+            (orjson.JSONDecodeError en hérite)
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def dumps_bytes(value: Any) -> bytes:
+    """Encode une valeur en JSON compact UTF-8 (non-ASCII conservé)"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dumps(value: Any) -> str:
+    """Encode une valeur en chaîne JSON compacte (non-ASCII conservé)"""
+    if orjson is not None:
+        return orjson.dumps(value).decode("utf-8")
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
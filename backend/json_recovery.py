@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+import json_backend
+from stream_service import IncrementalSectionParser
+
+_OPENING_FENCE = re.compile(r"^\s*```[a-zA-Z0-9_-]*[ \t]*\n?")
+_CLOSING_FENCE = re.compile(r"\n?[ \t]*```\s*$")
+
+def strip_code_fences(text: str) -> str:
+    """
+    Retire le bloc de code markdown (```json ... ```) entourant la réponse
+
+    Seuls les délimiteurs en tête et en fin de texte sont retirés : un bloc
+    de code cité dans une valeur (documentation, contenu de fichier) est
+    conservé.
+
+    Args:
+        text: Réponse brute du modèle
+
+    Returns:
+        str: Texte sans les délimiteurs du bloc englobant
+    """
+    return _CLOSING_FENCE.sub("", _OPENING_FENCE.sub("", text, count=1), count=1)
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Extrait l'objet JSON le plus externe d'un texte
+
+    Le préambule et le texte suivant l'accolade fermante sont ignorés. Si
+    l'objet n'est pas refermé (réponse tronquée), tout le reste du texte est
+    renvoyé.
+
+    Args:
+        text: Texte contenant un objet JSON
+
+    Returns:
+        Optional[str]: Objet JSON (éventuellement incomplet) ou None
+    """
+    start = text.find("{")
+    if start < 0:
+        return None
+
+    depth = 0
+    in_string = False
+    escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return text[start:]
+
+def repair_truncated_json(text: str) -> str:
+    """
+    Referme un document JSON tronqué
+
+    Le texte est coupé après la dernière valeur complète (les clés sans valeur,
+    chaînes et scalaires inachevés sont abandonnés), puis les tableaux et
+    objets encore ouverts sont refermés.
+
+    Args:
+        text: Document JSON commençant par une accolade
+
+    Returns:
+        str: Document JSON refermé
+    """
+    stack: List[str] = []
+    # Pour chaque objet ouvert : la prochaine chaîne est-elle une clé ?
+    expecting_key: List[bool] = []
+    in_string = False
+    string_is_key = False
+    escape = False
+    in_scalar = False
+    safe_end = 0
+    safe_stack: List[str] = []
+
+    def mark_safe(position: int) -> None:
+        nonlocal safe_end, safe_stack
+        safe_end = position
+        safe_stack = list(stack)
+
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+                if not string_is_key:
+                    mark_safe(i + 1)
+            continue
+
+        if in_scalar:
+            if char.isspace() or char in ",}]":
+                in_scalar = False
+                mark_safe(i)
+            else:
+                continue
+
+        if char == '"':
+            in_string = True
+            string_is_key = bool(stack) and stack[-1] == "{" and expecting_key[-1]
+        elif char in "{[":
+            stack.append(char)
+            expecting_key.append(char == "{")
+            mark_safe(i + 1)
+        elif char in "}]":
+            if stack:
+                stack.pop()
+                expecting_key.pop()
+            mark_safe(i + 1)
+        elif char == ":":
+            if expecting_key:
+                expecting_key[-1] = False
+        elif char == ",":
+            if stack and stack[-1] == "{":
+                expecting_key[-1] = True
+        elif not char.isspace():
+            in_scalar = True
+
+    if not stack and not in_string and not in_scalar:
+        return text
+    closers = "".join("}" if opener == "{" else "]" for opener in reversed(safe_stack))
+    return text[:safe_end] + closers
+
+@dataclass
+class RecoveredSections:
+    """Sections de premier niveau récupérées d'une réponse imparfaite"""
+    # Sections entièrement reçues et décodées
+    complete: Dict[str, Any] = field(default_factory=dict)
+    # Sections tronquées reconstituées par réparation (incomplètes, dernier recours)
+    truncated: Dict[str, Any] = field(default_factory=dict)
+    # La réponse a-t-elle été coupée avant la fin de l'objet racine ?
+    is_truncated: bool = False
+
+def recover_sections(text: str) -> RecoveredSections:
+    """
+    Récupère les sections de premier niveau d'une réponse imparfaite
+
+    Args:
+        text: Réponse brute du modèle (blocs markdown, préambule, troncature)
+
+    Returns:
+        RecoveredSections: Sections complètes et sections tronquées réparées
+    """
+    candidate = extract_json_object(strip_code_fences(text))
+    if candidate is None:
+        return RecoveredSections()
+
+    try:
+        data = json_backend.loads(candidate)
+        if isinstance(data, dict):
+            return RecoveredSections(complete=data)
+    except json_backend.JSONDecodeError:
+        pass
+
+    parser = IncrementalSectionParser()
+    complete = dict(parser.feed(candidate))
+    if parser.done:
+        # Objet refermé mais certaines sections illisibles
+        return RecoveredSections(complete=complete)
+
+    truncated: Dict[str, Any] = {}
+    try:
+        repaired = json_backend.loads(repair_truncated_json(candidate))
+    except json_backend.JSONDecodeError:
+        repaired = None
+    if isinstance(repaired, dict):
+        truncated = {key: value for key, value in repaired.items() if key not in complete}
+    return RecoveredSections(complete=complete, truncated=truncated, is_truncated=True)
@@ -0,0 +1,152 @@
+import os
+import sys
+import time
+import asyncio
+import threading
+import traceback
+from collections import Counter as Tally, deque
+from typing import Any, Deque, Dict, List, Optional
+import logging
+from metrics_service import Counter, Histogram, metrics_service
+
+logger = logging.getLogger(__name__)
+
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _blocking_site(stack: traceback.StackSummary) -> str:
+    """
+    Appel bloquant le plus probable d'une pile : la frame de l'application la
+    plus profonde (hors bibliothèques), à défaut la frame la plus profonde
+    """
+    for frame in reversed(stack):
+        if frame.filename.startswith(_APP_DIR) and frame.filename != __file__:
+            return f"{os.path.relpath(frame.filename, _APP_DIR)}:{frame.lineno} {frame.name}"
+    if stack:
+        frame = stack[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+    return "unknown"
+
+class LoopMonitor:
+    """
+    Détecteur de blocages de la boucle d'événements (diagnostic, désactivé par défaut)
+
+    Une tâche de battement mesure le retard de réveil de la boucle ; un thread
+    de surveillance échantillonne la pile du thread de la boucle tant que le
+    battement est en retard. Chaque blocage dépassant le seuil est compté par
+    site d'appel (métriques /metrics) et journalisé avec la pile la plus
+    fréquente parmi les échantillons.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        interval: Optional[float] = None,
+        threshold: Optional[float] = None,
+        max_recent: int = 50
+    ):
+        if enabled is None:
+            enabled = os.getenv("LOOP_MONITOR_ENABLED", "false").lower() in ("1", "true", "yes")
+        if interval is None:
+            interval = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.05"))
+        if threshold is None:
+            threshold = float(os.getenv("LOOP_BLOCK_THRESHOLD", "0.1"))
+        self.enabled = enabled
+        self.interval = interval
+        self.threshold = threshold
+
+        self.lag = Histogram("devplan_event_loop_lag_seconds", "Retard de réveil de la boucle d'événements")
+        self.blocks = Counter(
+            "devplan_event_loop_blocks_total", "Blocages de la boucle au-delà du seuil, par site d'appel", ["site"]
+        )
+        self.block_duration = Histogram("devplan_event_loop_block_seconds", "Durée des blocages de la boucle")
+        # Derniers blocages (site, durée, pile) pour le diagnostic
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=max_recent)
+
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._samples: List[traceback.StackSummary] = []
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+
+    async def start(self) -> None:
+        """Démarre le battement et le thread de surveillance (si activé)"""
+        if not self.enabled or self._task is not None:
+            return
+        metrics_service.register(self.lag, self.blocks, self.block_duration)
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-monitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Surveillance de la boucle d'événements active (seuil {self.threshold * 1000:.0f} ms)")
+
+    async def stop(self) -> None:
+        """Arrête la surveillance"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - expected)
+            self.lag.observe(lag)
+            if lag >= self.threshold:
+                self._report_block(lag)
+            else:
+                with self._lock:
+                    self._samples.clear()
+
+    def _watch(self) -> None:
+        """Thread de surveillance : échantillonne la pile de la boucle quand elle ne bat plus"""
+        period = max(0.005, min(self.interval, self.threshold) / 2)
+        while not self._stop.wait(period):
+            if time.monotonic() - self._last_beat < self.interval + self.threshold / 2:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            stack = traceback.extract_stack(frame)
+            with self._lock:
+                if len(self._samples) < 100:
+                    self._samples.append(stack)
+
+    def _report_block(self, duration: float) -> None:
+        """Enregistre un blocage terminé (appelé depuis la boucle)"""
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if samples:
+            # Pile la plus fréquente parmi les échantillons : l'appel qui a duré
+            counts = Tally(_blocking_site(stack) for stack in samples)
+            site = counts.most_common(1)[0][0]
+            stack = next(stack for stack in reversed(samples) if _blocking_site(stack) == site)
+            formatted = "".join(traceback.format_list(stack[-12:]))
+        else:
+            site, formatted = "unknown", ""
+
+        self.blocks.inc(site=site)
+        self.block_duration.observe(duration)
+        block = {"site": site, "duration_ms": round(duration * 1000, 1), "samples": len(samples), "stack": formatted}
+        self.recent.append(block)
+        logger.warning(
+            f"Boucle d'événements bloquée {block['duration_ms']} ms ({site})\n{formatted}",
+            extra={"event": "event_loop_blocked", "site": site, "duration_ms": block["duration_ms"], "samples": len(samples)}
+        )
+
+# Instance globale du détecteur de blocages
+loop_monitor = LoopMonitor()
@@ -1,25 +1,62 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Response, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse, PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 import os
+import time
+import json_backend
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
-import openai
-from services import SchemaGeneratorService
-from models import ProjectRequest, ProjectResponse
-from config_service import config_service, OpenAIConfigRequest, OpenAIConfigResponse
 
 # Load environment variables
+# Avant l'import des services : leurs instances globales lisent la configuration à l'import
 load_dotenv()
 
+import openai
+from services import SchemaGeneratorService, GenerationResult
+from models import ProjectRequest, ProjectResponse, ProjectSchema, BatchProjectRequest, RegenerateRequest
+from config_service import config_service, OpenAIConfigRequest, OpenAIConfigResponse
+from cache_service import schema_cache, compute_request_hash
+from semantic_cache_service import semantic_cache
+from health_service import health_service
+from stream_service import format_sse
+from coalescing_service import request_coalescer
+from job_service import job_service, JobInfo, QueueFullError
+from batch_service import batch_service
+from tenant_service import current_tenant, tenant_hash, TENANT_HEADER
+from catalog_service import stacks_response, templates_response
+from routing_service import model_router
+from metrics_service import metrics_service
+from loop_monitor_service import loop_monitor
+from history_service import history_service, RevisionConflictError
+from scaffold_service import ARCHIVE_FORMATS, archive_filename
+from export_service import export_service, EXPORT_FORMATS
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Démarre et arrête les tâches d'arrière-plan et les connexions partagées"""
+    # Démarrage : détecteur de blocages (si activé), état OpenAI en arrière-plan, workers de génération
+    await loop_monitor.start()
+    await health_service.start()
+    await job_service.start(generate_with_cache)
+    yield
+    # Arrêt : workers, rafraîchissement, transport HTTP partagé
+    await job_service.stop()
+    await health_service.stop()
+    await config_service.aclose()
+    history_service.close()
+    await loop_monitor.stop()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="DevPlan AI Generator API",
     description="API pour générer des schémas de projets full-stack avec l'IA",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -31,12 +68,131 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def tenant_context(request: Request, call_next):
+    """Associe la requête au tenant de son jeton de session (client OpenAI propre)"""
+    tenant_id = request.headers.get(TENANT_HEADER)
+    if tenant_id and len(tenant_id) > 256:
+        tenant_id = None
+    token = current_tenant.set(tenant_id)
+    try:
+        if tenant_id:
+            # Recharge la configuration validée par un autre worker, sans nouvelle validation
+            await config_service.tenants.load(tenant_id)
+        return await call_next(request)
+    finally:
+        current_tenant.reset(token)
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    """Mesure la durée des requêtes HTTP par route (chemin déclaré, pas le chemin brut)"""
+    started_at = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        path = getattr(route, "path", None) or "unmatched"
+        metrics_service.http_duration.observe(
+            time.perf_counter() - started_at, method=request.method, path=path, status=str(status)
+        )
+
 # Mount static files
 app.mount("/static", StaticFiles(directory="../frontend"), name="static")
 
 # Initialize services
 schema_service = SchemaGeneratorService()
 
+def request_cache_key(request: ProjectRequest) -> str:
+    """
+    Clé de cache d'une requête (tenant, modèle retenu par le routage et version des prompts)
+    
+    Elle sert aussi de clé de regroupement des générations concurrentes : un
+    tenant ne reçoit jamais un schéma généré avec la clé API d'un autre.
+    """
+    return compute_request_hash(
+        request,
+        schema_service.route(request).model,
+        schema_service.prompt_version,
+        tenant_hash(current_tenant.get())
+    )
+
+def request_scope(request: ProjectRequest) -> str:
+    """Portée du cache sémantique : empreinte de la requête hors description (par tenant)"""
+    return compute_request_hash(
+        request.model_copy(update={"description": ""}),
+        schema_service.route(request).model,
+        schema_service.prompt_version,
+        tenant_hash(current_tenant.get())
+    )
+
+async def find_cached_schema(request: ProjectRequest, cache_key: str) -> Tuple[Optional[ProjectSchema], str]:
+    """
+    Recherche un schéma déjà généré : requête identique, puis description similaire
+    
+    Returns:
+        Tuple: Schéma (ou None) et statut de cache ("HIT", "SEMANTIC" ou "MISS")
+    """
+    schema = await schema_cache.get(cache_key)
+    if schema is not None:
+        metrics_service.cache_lookups.inc(status="HIT")
+        return schema, "HIT"
+    match = semantic_cache.lookup(request, request_scope(request))
+    if match is not None:
+        metrics_service.cache_lookups.inc(status="SEMANTIC")
+        return match[0], "SEMANTIC"
+    metrics_service.cache_lookups.inc(status="MISS")
+    return None, "MISS"
+
+async def remember_schema(request: ProjectRequest, cache_key: str, schema: ProjectSchema) -> None:
+    """Enregistre un schéma généré dans le cache exact et le cache sémantique"""
+    await schema_cache.set(cache_key, schema)
+    semantic_cache.store(request, request_scope(request), schema)
+
+async def record_history(request: ProjectRequest, cache_key: str, result: GenerationResult) -> None:
+    """Conserve un schéma généré dans l'historique (sauf schéma de repli)"""
+    if not result.is_fallback:
+        result.schema_id = await history_service.record(request, result.schema, cache_key)
+
+async def generate_with_cache(request: ProjectRequest, cache_key: Optional[str] = None) -> GenerationResult:
+    """
+    Génère un schéma, un seul appel étant partagé par les requêtes identiques concurrentes
+    
+    Le résultat est mis en cache sauf s'il s'agit du schéma de repli.
+    """
+    if cache_key is None:
+        cache_key = request_cache_key(request)
+    
+    async def generate_and_cache():
+        result = await schema_service.generate(request)
+        # Ne pas mettre en cache les schémas de repli ou incomplets
+        if result.cacheable:
+            await remember_schema(request, cache_key, result.schema)
+        await record_history(request, cache_key, result)
+        return result
+    
+    return await request_coalescer.run(cache_key, generate_and_cache)
+
+def schema_response(schema: ProjectSchema, headers: Dict[str, str]) -> Response:
+    """
+    Sérialise directement un ProjectResponse réussi
+    
+    Le schéma est déjà validé : la réponse est construite sans nouvelle
+    validation (model_construct) puis sérialisée par pydantic-core, au lieu de
+    laisser FastAPI revalider et réencoder le response_model.
+    """
+    with metrics_service.stage("serialization"):
+        payload = ProjectResponse.model_construct(
+            success=True,
+            data=schema,
+            message="Schéma généré avec succès",
+            error=None
+        )
+        content = payload.model_dump_json()
+    return Response(content=content, media_type="application/json", headers=headers)
+
 @app.get("/")
 async def root():
     """Endpoint racine"""
@@ -46,7 +202,15 @@ async def root():
         "status": "active",
         "endpoints": {
             "generate_schema": "/api/generate-schema",
+            "generate_schema_stream": "/api/generate-schema/stream",
+            "generate_schema_batch": "/api/generate-schema/batch",
+            "jobs": "/api/jobs",
+            "schemas": "/api/schemas",
+            "routing": "/api/routing",
+            "metrics": "/metrics",
             "health": "/health",
+            "liveness": "/health/live",
+            "readiness": "/health/ready",
             "docs": "/docs"
         }
     }
@@ -63,7 +227,10 @@ async def configure_openai(config: OpenAIConfigRequest):
         OpenAIConfigResponse: Résultat de la validation
     """
     try:
-        result = await config_service.validate_openai_config(config)
+        tenant_id = current_tenant.get()
+        result = await config_service.validate_openai_config(config, tenant_id=tenant_id)
+        if result.is_valid and not tenant_id:
+            health_service.record(result)
         return result
     except Exception as e:
         raise HTTPException(
@@ -81,6 +248,8 @@ async def test_openai_config():
     """
     try:
         result = await config_service.test_current_config()
+        if not current_tenant.get():
+            health_service.record(result)
         return result
     except Exception as e:
         raise HTTPException(
@@ -90,37 +259,50 @@ async def test_openai_config():
 
 @app.get("/health")
 async def health_check():
-    """Vérification de l'état de l'API avec test OpenAI amélioré"""
-    try:
-        # Tester la configuration OpenAI
-        openai_status = await config_service.test_current_config()
-        
-        return {
-            "status": "healthy",
-            "timestamp": "2024-01-15T10:00:00Z",
-            "services": {
-                "openai": {
-                    "status": openai_status.status,
-                    "configured": openai_status.is_valid,
-                    "model_available": openai_status.model_available,
-                    "message": openai_status.message
-                },
-                "api": "running"
-            }
-        }
-    except Exception as e:
+    """Vérification de l'état de l'API à partir du dernier test OpenAI en cache"""
+    openai_status = health_service.get_openai_status()
+    
+    if openai_status is None:
         return {
-            "status": "degraded",
-            "timestamp": "2024-01-15T10:00:00Z",
+            "status": "starting",
+            "timestamp": health_service.last_checked_iso(),
             "services": {
                 "openai": {
-                    "status": "error",
+                    "status": "unknown",
                     "configured": False,
-                    "message": f"Erreur: {str(e)}"
+                    "message": "Vérification OpenAI en cours"
                 },
                 "api": "running"
             }
         }
+    
+    return {
+        "status": "healthy",
+        "timestamp": health_service.last_checked_iso(),
+        "services": {
+            "openai": {
+                "status": openai_status.status,
+                "configured": openai_status.is_valid,
+                "model_available": openai_status.model_available,
+                "message": openai_status.message
+            },
+            "api": "running"
+        }
+    }
+
+@app.get("/health/live")
+async def liveness_check():
+    """Sonde de vivacité : aucune E/S"""
+    return {"status": "alive"}
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Sonde de disponibilité servie depuis l'état OpenAI en cache"""
+    readiness = health_service.readiness()
+    return JSONResponse(
+        status_code=200 if readiness["ready"] else 503,
+        content=readiness
+    )
 
 @app.post("/api/generate-schema", response_model=ProjectResponse)
 async def generate_project_schema(request: ProjectRequest):
@@ -141,14 +323,23 @@ async def generate_project_schema(request: ProjectRequest):
                 detail="OpenAI API key not configured"
             )
         
-        # Generate schema using AI service
-        schema = await schema_service.generate_schema(request)
+        # Rechercher une génération identique ou similaire dans le cache
+        cache_key = request_cache_key(request)
         
-        return ProjectResponse(
-            success=True,
-            data=schema,
-            message="Schéma généré avec succès"
-        )
+        schema, cache_status = await find_cached_schema(request, cache_key)
+        if schema is not None:
+            headers = {"X-Cache-Key": cache_key, "X-Cache": cache_status}
+            schema_id = await history_service.find_id(cache_key) if cache_status == "HIT" else None
+            if schema_id:
+                headers["X-Schema-Id"] = schema_id
+            return schema_response(schema, headers)
+        
+        # Generate schema using AI service
+        result = await generate_with_cache(request, cache_key)
+        headers = {"X-Cache-Key": cache_key, "X-Cache": "MISS"}
+        if result.schema_id:
+            headers["X-Schema-Id"] = result.schema_id
+        return schema_response(result.schema, headers)
         
     except Exception as e:
         raise HTTPException(
@@ -156,115 +347,332 @@ async def generate_project_schema(request: ProjectRequest):
             detail=f"Erreur lors de la génération du schéma: {str(e)}"
         )
 
-@app.get("/api/stacks")
-async def get_available_stacks():
-    """Retourne les stacks technologiques disponibles"""
-    return {
-        "success": True,
-        "data": {
-            "frontend": [
-                {
-                    "name": "React",
-                    "description": "Bibliothèque JavaScript populaire",
-                    "pros": ["Écosystème riche", "Communauté active", "Flexibilité"],
-                    "cons": ["Courbe d'apprentissage", "Configurations complexes"]
-                },
-                {
-                    "name": "Vue.js",
-                    "description": "Framework JavaScript progressif",
-                    "pros": ["Facilité d'apprentissage", "Documentation excellente", "Performance"],
-                    "cons": ["Écosystème plus petit", "Moins d'emplois"]
-                },
-                {
-                    "name": "Vanilla JS",
-                    "description": "JavaScript pur sans framework",
-                    "pros": ["Performance maximale", "Pas de dépendances", "Contrôle total"],
-                    "cons": ["Développement plus long", "Pas de structure imposée"]
-                }
-            ],
-            "backend": [
-                {
-                    "name": "FastAPI",
-                    "description": "Framework Python moderne et rapide",
-                    "pros": ["Performance élevée", "Documentation automatique", "Type hints"],
-                    "cons": ["Écosystème plus récent", "Moins de ressources"]
-                },
-                {
-                    "name": "Node.js",
-                    "description": "Runtime JavaScript côté serveur",
-                    "pros": ["JavaScript partout", "NPM ecosystem", "Performance"],
-                    "cons": ["Single-threaded", "Callback hell potentiel"]
-                },
-                {
-                    "name": "Django",
-                    "description": "Framework Python batteries included",
-                    "pros": ["Fonctionnalités complètes", "Sécurité intégrée", "Admin interface"],
-                    "cons": ["Peut être lourd", "Moins flexible"]
-                }
-            ],
-            "database": [
-                {
-                    "name": "PostgreSQL",
-                    "description": "Base de données relationnelle avancée",
-                    "pros": ["ACID compliance", "Extensibilité", "Performance"],
-                    "cons": ["Complexité", "Ressources nécessaires"]
-                },
-                {
-                    "name": "MongoDB",
-                    "description": "Base de données NoSQL documentaire",
-                    "pros": ["Flexibilité du schéma", "Scalabilité", "JSON natif"],
-                    "cons": ["Moins de consistance", "Requêtes complexes"]
-                },
-                {
-                    "name": "SQLite",
-                    "description": "Base de données légère embarquée",
-                    "pros": ["Simplicité", "Pas de serveur", "Portable"],
-                    "cons": ["Pas de concurrence", "Fonctionnalités limitées"]
-                }
-            ]
+@app.post("/api/generate-schema/stream")
+async def generate_project_schema_stream(request: ProjectRequest):
+    """
+    Génère un schéma de projet en streaming (Server-Sent Events)
+    
+    Événements émis : "start", "token" (texte brut du modèle), "section"
+    (section de premier niveau complète), puis "complete" (ProjectResponse).
+    
+    Args:
+        request: Données du projet (description, préférences, etc.)
+    
+    Returns:
+        StreamingResponse: Flux text/event-stream
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise HTTPException(
+            status_code=500,
+            detail="OpenAI API key not configured"
+        )
+    
+    cache_key = request_cache_key(request)
+    
+    async def event_stream():
+        yield format_sse("start", {"cache_key": cache_key})
+        
+        # Schéma déjà en cache : toutes les sections sont envoyées immédiatement
+        cached, cache_status = await find_cached_schema(request, cache_key)
+        if cached is not None:
+            for name, value in cached.model_dump(mode="json").items():
+                yield format_sse("section", {"name": name, "value": value})
+            yield format_sse("complete", {
+                "cache": cache_status,
+                "fallback": False,
+                "response": ProjectResponse(
+                    success=True,
+                    data=cached,
+                    message="Schéma généré avec succès"
+                ).model_dump(mode="json")
+            })
+            return
+        
+        async for event, payload in schema_service.stream_schema(request):
+            if event != "complete":
+                yield format_sse(event, payload)
+                continue
+            
+            if payload.cacheable:
+                await remember_schema(request, cache_key, payload.schema)
+            await record_history(request, cache_key, payload)
+            yield format_sse("complete", {
+                "cache": "MISS",
+                "fallback": payload.is_fallback,
+                "schema_id": payload.schema_id,
+                "response": ProjectResponse(
+                    success=True,
+                    data=payload.schema,
+                    message="Schéma généré avec succès"
+                ).model_dump(mode="json")
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "X-Cache-Key": cache_key
         }
-    }
+    )
+
+@app.post("/api/generate-schema/batch")
+async def generate_project_schema_batch(batch: BatchProjectRequest):
+    """
+    Génère plusieurs schémas en parallèle (parallélisme et budget de tokens bornés)
+    
+    Les résultats sont renvoyés en NDJSON, une ligne par projet dès qu'il est
+    terminé (ordre de fin, champ "index" pour l'ordre d'origine).
+    
+    Args:
+        batch: Liste des projets à générer
+    
+    Returns:
+        StreamingResponse: Flux application/x-ndjson
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise HTTPException(
+            status_code=500,
+            detail="OpenAI API key not configured"
+        )
+    
+    async def lookup(request: ProjectRequest):
+        schema, _ = await find_cached_schema(request, request_cache_key(request))
+        return schema
+    
+    async def ndjson_stream():
+        async for item in batch_service.run(
+            batch.items,
+            generate=generate_with_cache,
+            lookup=lookup,
+            max_concurrency=batch.max_concurrency
+        ):
+            yield json_backend.dumps(item) + "\n"
+    
+    return StreamingResponse(
+        ndjson_stream(),
+        media_type="application/x-ndjson",
+        headers={"X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/jobs", response_model=JobInfo, status_code=202)
+async def create_generation_job(request: ProjectRequest):
+    """
+    Crée une tâche de génération asynchrone et rend la main immédiatement
+    
+    Args:
+        request: Données du projet (description, préférences, etc.)
+    
+    Returns:
+        JobInfo: Tâche créée (à suivre via /api/jobs/{job_id})
+    """
+    if not os.getenv("OPENAI_API_KEY"):
+        raise HTTPException(
+            status_code=500,
+            detail="OpenAI API key not configured"
+        )
+    
+    cache_key = request_cache_key(request)
+    cached, _ = await find_cached_schema(request, cache_key)
+    if cached is not None:
+        return await job_service.complete(request, cached)
+    
+    try:
+        return await job_service.submit(request)
+    except QueueFullError as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": "5"}
+        )
+
+@app.get("/api/jobs/{job_id}", response_model=JobInfo)
+async def get_generation_job(job_id: str):
+    """
+    Retourne l'état d'une tâche de génération
+    
+    Args:
+        job_id: Identifiant de la tâche
+    
+    Returns:
+        JobInfo: État et résultat éventuel de la tâche
+    """
+    job = await job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche introuvable")
+    return job
+
+@app.get("/api/jobs/{job_id}/wait", response_model=JobInfo)
+async def wait_generation_job(job_id: str, timeout: float = Query(20, ge=0, le=25)):
+    """
+    Attend la fin d'une tâche de génération (long-polling)
+    
+    Args:
+        job_id: Identifiant de la tâche
+        timeout: Durée maximale d'attente en secondes
+    
+    Returns:
+        JobInfo: État de la tâche à la fin de l'attente
+    """
+    job = await job_service.wait(job_id, timeout)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Tâche introuvable")
+    return job
+
+@app.get("/api/stacks")
+async def get_available_stacks(request: Request):
+    """Retourne les stacks technologiques disponibles (réponse précalculée, ETag)"""
+    return stacks_response.respond(request)
 
 @app.get("/api/templates")
-async def get_project_templates():
-    """Retourne les templates de projets disponibles"""
-    return {
-        "success": True,
-        "data": [
-            {
-                "id": "ecommerce",
-                "name": "E-commerce",
-                "description": "Plateforme de vente en ligne complète",
-                "features": ["Catalogue produits", "Panier", "Paiement", "Gestion commandes"],
-                "complexity": "high",
-                "duration": "3-6 mois"
-            },
-            {
-                "id": "blog",
-                "name": "Blog/CMS",
-                "description": "Système de gestion de contenu",
-                "features": ["Articles", "Commentaires", "SEO", "Admin panel"],
-                "complexity": "medium",
-                "duration": "1-2 mois"
-            },
-            {
-                "id": "saas",
-                "name": "SaaS Platform",
-                "description": "Application Software-as-a-Service",
-                "features": ["Authentification", "Abonnements", "Dashboard", "API"],
-                "complexity": "high",
-                "duration": "4-8 mois"
-            },
-            {
-                "id": "portfolio",
-                "name": "Portfolio",
-                "description": "Site vitrine personnel ou professionnel",
-                "features": ["Présentation", "Projets", "Contact", "CV"],
-                "complexity": "low",
-                "duration": "2-4 semaines"
-            }
-        ]
-    }
+async def get_project_templates(request: Request):
+    """Retourne les templates de projets disponibles (réponse précalculée, ETag)"""
+    return templates_response.respond(request)
+
+@app.get("/api/schemas")
+async def list_schemas(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    project_type: Optional[str] = None,
+    complexity: Optional[str] = None
+):
+    """
+    Liste l'historique des schémas générés, du plus récent au plus ancien
+    
+    La page suivante s'obtient en repassant next_cursor dans cursor.
+    """
+    try:
+        page = await history_service.list(limit, cursor, project_type, complexity)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"success": True, "data": page.model_dump(mode="json")}
+
+@app.get("/api/schemas/{schema_id}", response_model=ProjectResponse)
+async def get_schema(schema_id: str):
+    """
+    Retourne un schéma de l'historique (lecture indexée, sans nouvelle génération)
+    
+    Args:
+        schema_id: Identifiant renvoyé par la génération (X-Schema-Id)
+    """
+    record = await history_service.get(schema_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Schéma introuvable")
+    return schema_response(record.schema_data, {"X-Schema-Id": schema_id})
+
+@app.post("/api/schemas/{schema_id}/regenerate", response_model=ProjectResponse)
+async def regenerate_schema_sections(schema_id: str, body: RegenerateRequest):
+    """
+    Régénère uniquement certaines sections d'un schéma de l'historique
+    
+    Seules les sections choisies sont demandées au modèle (contexte du projet
+    et valeurs actuelles), puis fusionnées dans le schéma enregistré.
+    
+    Args:
+        schema_id: Identifiant du schéma (X-Schema-Id)
+        body: Sections à régénérer (ex: "roadmap", "recommended_stack.database") et consignes
+    
+    Returns:
+        ProjectResponse: Schéma mis à jour
+    """
+    record = await history_service.get(schema_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Schéma introuvable")
+    
+    try:
+        result = await schema_service.regenerate_sections(record.request, record.schema_data, body.sections, body.instructions)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result.is_fallback:
+        raise HTTPException(status_code=502, detail="La régénération des sections a échoué, le schéma est inchangé")
+    
+    try:
+        await history_service.update(record, result.schema)
+    except RevisionConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    # Les caches servent l'entrée la plus récente de cette requête : s'il
+    # s'agit de celle-ci, ils doivent renvoyer le schéma régénéré
+    if await history_service.find_id(record.request_hash) == schema_id:
+        await remember_schema(record.request, record.request_hash, result.schema)
+    regenerated = [selector for selector in body.sections if selector not in result.incomplete_sections]
+    return schema_response(result.schema, {
+        "X-Schema-Id": schema_id,
+        "X-Regenerated-Sections": ",".join(dict.fromkeys(regenerated))
+    })
+
+@app.get("/api/schemas/{schema_id}/scaffold.{archive_format}")
+async def export_scaffold(schema_id: str, archive_format: str):
+    """
+    Exporte la structure de fichiers d'un schéma en archive (zip ou tar.gz)
+    
+    L'arborescence est parcourue à la demande et l'archive envoyée par
+    morceaux, sans être construite en mémoire. Le générateur étant
+    synchrone, la compression s'exécute hors de la boucle d'événements.
+    
+    Args:
+        schema_id: Identifiant du schéma (X-Schema-Id)
+        archive_format: "zip" ou "tar.gz"
+    
+    Returns:
+        StreamingResponse: Archive du squelette de projet
+    """
+    if archive_format not in ARCHIVE_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Format d'archive inconnu : {archive_format}")
+    record = await history_service.get(schema_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Schéma introuvable")
+    
+    media_type, stream = ARCHIVE_FORMATS[archive_format]
+    filename = archive_filename(record.project_name, archive_format)
+    return StreamingResponse(
+        stream(record.schema_data.file_structure, mtime=record.created_at),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{filename}"',
+            "X-Schema-Id": schema_id
+        }
+    )
+
+@app.get("/api/schemas/{schema_id}/export.{export_format}")
+async def export_schema(schema_id: str, export_format: str):
+    """
+    Exporte un schéma de l'historique en Markdown, HTML imprimable ou JSON
+    
+    Le rendu est mis en cache par schéma, révision, format et version des
+    gabarits : les téléchargements répétés sont servis sans nouveau rendu.
+    
+    Args:
+        schema_id: Identifiant du schéma (X-Schema-Id)
+        export_format: "md", "html" ou "json"
+    
+    Returns:
+        Response: Document exporté (X-Cache: HIT ou MISS)
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=404, detail=f"Format d'export inconnu : {export_format}")
+    record = await history_service.get(schema_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Schéma introuvable")
+    
+    content, cached = await export_service.export(record, export_format)
+    media_type, _ = EXPORT_FORMATS[export_format]
+    filename = archive_filename(record.project_name, export_format)
+    return Response(content=content, media_type=media_type, headers={
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "X-Schema-Id": schema_id,
+        "X-Cache": "HIT" if cached else "MISS"
+    })
+
+@app.get("/api/routing")
+async def get_model_routing():
+    """Politique de routage des modèles, avec latence et coût mesurés par niveau"""
+    return {"success": True, "data": model_router.describe()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Métriques du pipeline de génération au format Prometheus"""
+    return PlainTextResponse(metrics_service.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,198 @@
+import os
+import time
+import bisect
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import logging
+
+try:
+    from opentelemetry import trace
+except ImportError:  # Dépendance optionnelle : pas d'export OpenTelemetry sans elle
+    trace = None
+
+logger = logging.getLogger(__name__)
+
+# Bornes des histogrammes de durée (secondes), des étapes locales aux appels OpenAI
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Compteur monotone par combinaison d'étiquettes"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels.get(name, "")) for name in self.labelnames), 0.0)
+
+    def samples(self) -> Iterator[str]:
+        for key, value in sorted(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram:
+    """Histogramme cumulatif (format Prometheus) par combinaison d'étiquettes"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Par combinaison : effectifs par borne (+Inf en dernier), somme
+        self._counts: Dict[LabelValues, List[int]] = {}
+        self._sums: Dict[LabelValues, float] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        counts = self._counts.get(key)
+        if counts is None:
+            counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            self._sums[key] = 0.0
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        self._sums[key] += value
+
+    def count(self, **labels: str) -> int:
+        return sum(self._counts.get(tuple(str(labels.get(name, "")) for name in self.labelnames), []))
+
+    def samples(self) -> Iterator[str]:
+        for key in sorted(self._counts):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), self._counts[key]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(self._sums[key])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+class MetricsService:
+    """
+    Instrumentation du pipeline de génération
+
+    Durées par étape (construction du prompt, attente OpenAI, validation,
+    récupération, sérialisation), tokens consommés (response.usage), issues
+    des générations et replis par motif, durées des requêtes HTTP. Exposé au
+    format texte Prometheus (/metrics). Chaque étape ouvre aussi un span
+    OpenTelemetry si l'API est installée : l'export est assuré par le SDK
+    configuré au lancement (opentelemetry-instrument), sans effet sinon.
+    """
+
+    def __init__(self, tracing: Optional[bool] = None):
+        if tracing is None:
+            tracing = os.getenv("OTEL_TRACING_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.tracer = trace.get_tracer("devplan") if trace is not None and tracing else None
+
+        self.stage_duration = Histogram(
+            "devplan_stage_duration_seconds", "Durée de chaque étape du pipeline de génération", ["stage"]
+        )
+        self.generation_duration = Histogram(
+            "devplan_generation_duration_seconds", "Durée totale d'une génération", ["route", "outcome"]
+        )
+        self.http_duration = Histogram(
+            "devplan_http_request_duration_seconds", "Durée des requêtes HTTP", ["method", "path", "status"]
+        )
+        self.tokens = Counter("devplan_openai_tokens_total", "Tokens consommés par les appels OpenAI", ["route", "kind"])
+        self.generations = Counter("devplan_generations_total", "Générations par niveau et issue", ["route", "outcome"])
+        self.fallbacks = Counter("devplan_fallbacks_total", "Générations ayant utilisé le schéma de repli, par motif", ["reason"])
+        self.cache_lookups = Counter("devplan_cache_lookups_total", "Recherches dans le cache de schémas par statut", ["status"])
+        self._metrics = [
+            self.stage_duration, self.generation_duration, self.http_duration,
+            self.tokens, self.generations, self.fallbacks, self.cache_lookups
+        ]
+
+    def register(self, *metrics) -> None:
+        """Ajoute des métriques définies par un autre service à l'exposition (remplace celles de même nom)"""
+        for metric in metrics:
+            self._metrics = [existing for existing in self._metrics if existing.name != metric.name]
+            self._metrics.append(metric)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Mesure une étape du pipeline (histogramme et span OpenTelemetry)
+
+        Args:
+            name: Nom de l'étape
+        """
+        started_at = time.perf_counter()
+        if self.tracer is None:
+            try:
+                yield
+            finally:
+                self.stage_duration.observe(time.perf_counter() - started_at, stage=name)
+            return
+        with self.tracer.start_as_current_span(f"devplan.{name}"):
+            try:
+                yield
+            finally:
+                self.stage_duration.observe(time.perf_counter() - started_at, stage=name)
+
+    def record_usage(self, route_name: str, response: object) -> None:
+        """
+        Enregistre les tokens d'un appel OpenAI (response.usage)
+
+        Args:
+            route_name: Niveau de modèle utilisé
+            response: Réponse de l'API OpenAI
+        """
+        usage = getattr(response, "usage", None)
+        for kind in ("prompt", "completion"):
+            tokens = getattr(usage, f"{kind}_tokens", None)
+            if isinstance(tokens, int):
+                self.tokens.inc(tokens, route=route_name, kind=kind)
+
+    def record_generation(self, route_name: str, duration: float, fallback_reason: Optional[str] = None, incomplete: bool = False) -> None:
+        """
+        Enregistre l'issue d'une génération
+
+        Args:
+            route_name: Niveau de modèle utilisé
+            duration: Durée totale (secondes)
+            fallback_reason: Motif du repli, None si le modèle a répondu
+            incomplete: Des sections sont-elles restées incomplètes ?
+        """
+        if fallback_reason is not None:
+            outcome = "fallback"
+            self.fallbacks.inc(reason=fallback_reason)
+            logger.warning(f"Génération terminée par un repli (motif: {fallback_reason}, niveau: {route_name})")
+        else:
+            outcome = "partial" if incomplete else "success"
+        self.generations.inc(route=route_name, outcome=outcome)
+        self.generation_duration.observe(duration, route=route_name, outcome=outcome)
+
+    def render(self) -> str:
+        """Métriques au format texte Prometheus (version 0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+# Instance globale de l'instrumentation
+metrics_service = MetricsService()
@@ -1,6 +1,7 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
 from typing import Optional, Dict, Any, List
 from enum import Enum
+from file_tree import FileTree
 
 class ProjectType(str, Enum):
     """Types de projets disponibles"""
@@ -62,37 +63,55 @@ class ProjectRequest(BaseModel):
             }
         }
 
+class BatchProjectRequest(BaseModel):
+    """Requête de génération par lot"""
+    items: List[ProjectRequest] = Field(..., min_length=1, max_length=100, description="Projets à générer")
+    max_concurrency: Optional[int] = Field(None, ge=1, le=16, description="Nombre maximal de générations simultanées")
+
+class RegenerateRequest(BaseModel):
+    """Requête de régénération de sections d'un schéma enregistré"""
+    sections: List[str] = Field(..., min_length=1, max_length=10, description="Sections à régénérer (ex: roadmap, recommended_stack.database)")
+    instructions: Optional[str] = Field(None, max_length=1000, description="Consignes pour la nouvelle version")
+
 class FileStructure(BaseModel):
     """Structure de fichiers du projet"""
-    name: str
-    type: str  # "file" ou "directory"
+    name: str = ""
+    type: str = "file"  # "file" ou "directory"
     children: Optional[List['FileStructure']] = None
     content: Optional[str] = None  # Pour les fichiers
 
 class Architecture(BaseModel):
     """Architecture du projet"""
-    overview: str
-    components: List[Dict[str, Any]]
-    data_flow: List[str]
-    security: List[str]
-    performance: List[str]
+    overview: str = ""
+    components: List[Dict[str, Any]] = []
+    data_flow: List[str] = []
+    security: List[str] = []
+    performance: List[str] = []
 
 class Roadmap(BaseModel):
     """Roadmap de développement"""
-    phases: List[Dict[str, Any]]
-    milestones: List[Dict[str, Any]]
-    estimated_duration: str
-    team_recommendations: List[str]
+    phases: List[Dict[str, Any]] = []
+    milestones: List[Dict[str, Any]] = []
+    estimated_duration: str = ""
+    team_recommendations: List[str] = []
 
 class TechnologyRecommendation(BaseModel):
     """Recommandation technologique"""
-    name: str
-    description: str
-    pros: List[str]
-    cons: List[str]
-    learning_curve: str
-    community_support: str
-    job_market: str
+    name: str = ""
+    description: str = ""
+    pros: List[str] = []
+    cons: List[str] = []
+    learning_curve: str = "Medium"
+    community_support: str = "Good"
+    job_market: str = "High"
+
+# Valeurs par défaut de chaque technologie lorsque le modèle omet un champ
+STACK_SLOT_DEFAULTS: Dict[str, Dict[str, str]] = {
+    "frontend": {"name": "React", "learning_curve": "Medium", "community_support": "Excellent", "job_market": "High"},
+    "backend": {"name": "FastAPI", "learning_curve": "Medium", "community_support": "Good", "job_market": "High"},
+    "database": {"name": "PostgreSQL", "learning_curve": "Medium", "community_support": "Excellent", "job_market": "High"},
+    "deployment": {"name": "Vercel", "learning_curve": "Easy", "community_support": "Good", "job_market": "Medium"},
+}
 
 class RecommendedStack(BaseModel):
     """Stack recommandée"""
@@ -100,28 +119,86 @@ class RecommendedStack(BaseModel):
     backend: TechnologyRecommendation
     database: TechnologyRecommendation
     deployment: TechnologyRecommendation
-    additional_tools: List[TechnologyRecommendation]
-    justification: str
+    additional_tools: List[TechnologyRecommendation] = []
+    justification: str = ""
+
+    @model_validator(mode="before")
+    @classmethod
+    def _apply_slot_defaults(cls, data: Any) -> Any:
+        """
+        Complète chaque technologie avec les valeurs par défaut de son emplacement
+
+        Le modèle renvoie souvent de simples noms ("frontend": "Next.js",
+        "additional_tools": ["Docker", "Redis"]) : ils deviennent des
+        technologies nommées. Les outils complémentaires qui restent
+        invalides sont ignorés plutôt que de faire échouer toute la stack.
+        """
+        if not isinstance(data, dict):
+            return data
+        data = dict(data)
+        for slot, defaults in STACK_SLOT_DEFAULTS.items():
+            value = data.get(slot)
+            if value is None:
+                data[slot] = defaults
+            elif isinstance(value, str):
+                data[slot] = {**defaults, "name": value}
+            elif isinstance(value, dict):
+                data[slot] = {**defaults, **value}
+
+        tools = data.get("additional_tools")
+        if tools is not None:
+            valid = []
+            for tool in tools if isinstance(tools, list) else []:
+                if isinstance(tool, str):
+                    tool = {"name": tool}
+                try:
+                    valid.append(TechnologyRecommendation.model_validate(tool))
+                except ValidationError:
+                    continue
+            data["additional_tools"] = valid
+        return data
+
+def _default_file_structure() -> FileStructure:
+    return FileStructure(name="project-root", type="directory", children=[])
 
 class ProjectSchema(BaseModel):
-    """Schéma complet du projet"""
-    project_name: str
-    description: str
-    project_type: str
-    complexity: str
-    estimated_duration: str
-    recommended_stack: RecommendedStack
-    architecture: Architecture
-    file_structure: FileStructure
-    roadmap: Roadmap
-    features: List[str]
-    technical_requirements: List[str]
-    deployment_strategy: Dict[str, Any]
-    testing_strategy: Dict[str, Any]
-    monitoring_strategy: Dict[str, Any]
-    documentation: List[str]
-    potential_challenges: List[str]
-    success_metrics: List[str]
+    """
+    Schéma complet du projet
+
+    Les valeurs par défaut permettent de valider directement la réponse du
+    modèle (model_validate_json) même lorsqu'elle omet des sections.
+    """
+    project_name: str = "Mon Projet"
+    description: str = ""
+    project_type: str = "custom"
+    complexity: str = "medium"
+    estimated_duration: str = "2-3 mois"
+    recommended_stack: RecommendedStack = Field(default_factory=RecommendedStack)
+    architecture: Architecture = Field(default_factory=Architecture)
+    file_structure: FileStructure = Field(default_factory=_default_file_structure)
+    roadmap: Roadmap = Field(default_factory=Roadmap)
+    features: List[str] = []
+    technical_requirements: List[str] = []
+    deployment_strategy: Dict[str, Any] = {}
+    testing_strategy: Dict[str, Any] = {}
+    monitoring_strategy: Dict[str, Any] = {}
+    documentation: List[str] = []
+    potential_challenges: List[str] = []
+    success_metrics: List[str] = []
+
+    @field_validator("file_structure", mode="before")
+    @classmethod
+    def _bound_file_structure(cls, value: Any) -> Any:
+        """
+        Limite la profondeur et le nombre de nœuds de l'arborescence
+
+        Une arborescence dans les limites (FILE_TREE_MAX_DEPTH,
+        FILE_TREE_MAX_NODES) est validée telle quelle ; au-delà, elle est
+        élaguée par un parcours itératif (FileTree) avant la validation.
+        """
+        if not isinstance(value, dict) or FileTree.within_limits(value):
+            return value
+        return FileTree.parse(value).to_dict()
 
 class ProjectResponse(BaseModel):
     """Réponse de génération de projet"""
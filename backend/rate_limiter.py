@@ -0,0 +1,361 @@
+import os
+import re
+import time
+import random
+import asyncio
+import hashlib
+import inspect
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple
+import openai
+import logging
+from metrics_service import Counter, metrics_service
+
+logger = logging.getLogger(__name__)
+
+# Événements des limiteurs (tous clients confondus), exposés sur /metrics
+LIMITER_EVENTS = Counter(
+    "devplan_openai_limiter_events_total",
+    "Appels OpenAI passés par les limiteurs : appels, nouveaux essais, erreurs 429, abandons",
+    ["event"]
+)
+metrics_service.register(LIMITER_EVENTS)
+
+# Erreurs transitoires pour lesquelles un nouvel essai est pertinent
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """
+    Convertit une durée d'en-tête OpenAI ("20ms", "1s", "6m0s") en secondes
+
+    Args:
+        value: Valeur de l'en-tête
+
+    Returns:
+        Optional[float]: Durée en secondes ou None si illisible
+    """
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+def estimate_call_tokens(kwargs: Mapping[str, Any]) -> int:
+    """
+    Estime les tokens d'un appel de complétion à partir de ses arguments
+
+    Environ 4 caractères par token pour les messages, plus max_tokens.
+    """
+    messages = kwargs.get("messages") or []
+    chars = sum(len(str(message.get("content", ""))) for message in messages if isinstance(message, dict))
+    return chars // 4 + int(kwargs.get("max_tokens") or 0)
+
+def client_key(api_key: str, organization: Optional[str]) -> Tuple[str, Optional[str]]:
+    """Clé d'un client OpenAI : empreinte de la clé API et organisation"""
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest(), organization
+
+class _Bucket:
+    """Seau à jetons à remplissage continu"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self.updated_at = time.monotonic()
+
+    def refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, remaining: Optional[float], limit: Optional[float] = None) -> None:
+        """Aligne le seau sur les valeurs renvoyées par l'API"""
+        if limit:
+            self.capacity = limit
+            self.rate = limit / 60.0
+        if remaining is not None:
+            self.level = min(self.level, remaining, self.capacity)
+
+class AdaptiveConcurrency:
+    """
+    Limite de concurrence adaptative (AIMD)
+
+    Augmentation additive de la limite après chaque succès, division par deux
+    lorsque l'API signale une surcharge.
+    """
+
+    def __init__(self, initial: int, minimum: int = 1, maximum: int = 64):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Primitive recréée si la boucle d'événements change (tests, rechargement)
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    async def acquire(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            await condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+
+    async def release(self) -> None:
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            condition.notify_all()
+
+    def on_success(self) -> None:
+        self.limit = min(float(self.maximum), self.limit + 1.0 / self.limit)
+
+    def on_overload(self) -> None:
+        self.limit = max(float(self.minimum), self.limit / 2.0)
+
+class OpenAIRateLimiter:
+    """
+    Limiteur placé devant les appels OpenAI d'un client
+
+    Combine un budget de requêtes et un budget de tokens par minute (recalés sur
+    les en-têtes x-ratelimit-* des réponses), une concurrence adaptative AIMD et
+    des nouvelles tentatives avec backoff exponentiel et gigue.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_retries: Optional[int] = None,
+        base_delay: Optional[float] = None,
+        max_delay: Optional[float] = None
+    ):
+        if requests_per_minute is None:
+            requests_per_minute = int(os.getenv("OPENAI_RPM", "500"))
+        if tokens_per_minute is None:
+            tokens_per_minute = int(os.getenv("OPENAI_TPM", "40000"))
+        if max_concurrency is None:
+            max_concurrency = int(os.getenv("OPENAI_MAX_CONCURRENCY", "16"))
+        if max_retries is None:
+            max_retries = int(os.getenv("OPENAI_MAX_RETRIES", "3"))
+        if base_delay is None:
+            base_delay = float(os.getenv("OPENAI_RETRY_BASE_DELAY", "0.5"))
+        if max_delay is None:
+            max_delay = float(os.getenv("OPENAI_RETRY_MAX_DELAY", "20"))
+
+        self.requests = _Bucket(requests_per_minute)
+        self.tokens = _Bucket(tokens_per_minute)
+        self.concurrency = AdaptiveConcurrency(initial=max(1, max_concurrency // 2), maximum=max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.last_headers: Dict[str, Optional[str]] = {}
+        self.stats: Dict[str, int] = {"calls": 0, "retries": 0, "rate_limited": 0, "failures": 0}
+
+    def _count(self, event: str) -> None:
+        self.stats[event] += 1
+        LIMITER_EVENTS.inc(event=event)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """
+        Recale les budgets sur les en-têtes x-ratelimit-* d'une réponse OpenAI
+
+        Args:
+            headers: En-têtes HTTP de la réponse
+        """
+        def number(name: str) -> Optional[float]:
+            try:
+                return float(headers.get(name))
+            except (TypeError, ValueError):
+                return None
+
+        remaining_requests = number("x-ratelimit-remaining-requests")
+        remaining_tokens = number("x-ratelimit-remaining-tokens")
+        if remaining_requests is None and remaining_tokens is None:
+            return
+
+        self.requests.refill()
+        self.tokens.refill()
+        self.requests.sync(remaining_requests, number("x-ratelimit-limit-requests"))
+        self.tokens.sync(remaining_tokens, number("x-ratelimit-limit-tokens"))
+        self.last_headers = {
+            "requests_remaining": headers.get("x-ratelimit-remaining-requests"),
+            "tokens_remaining": headers.get("x-ratelimit-remaining-tokens"),
+            "requests_reset": headers.get("x-ratelimit-reset-requests"),
+            "tokens_reset": headers.get("x-ratelimit-reset-tokens"),
+        }
+
+    async def acquire(self, tokens: int) -> None:
+        """Attend que les budgets de requêtes et de tokens le permettent"""
+        while True:
+            self.requests.refill()
+            self.tokens.refill()
+            wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+            if wait <= 0:
+                self.requests.consume(1)
+                self.tokens.consume(tokens)
+                return
+            await asyncio.sleep(wait)
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        """Délai avant le prochain essai : backoff exponentiel avec gigue complète"""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        if headers is not None:
+            hint = parse_reset_duration(headers.get("retry-after")) or parse_reset_duration(
+                headers.get("x-ratelimit-reset-requests")
+            )
+            if hint is not None:
+                delay = max(delay, min(hint, self.max_delay))
+        return delay
+
+    async def execute(self, call: Callable[[], Awaitable[Any]], estimated_tokens: int = 0) -> Any:
+        """
+        Exécute un appel OpenAI sous contrôle du limiteur
+
+        Args:
+            call: Fonction sans argument renvoyant la coroutine de l'appel
+            estimated_tokens: Estimation des tokens consommés
+
+        Returns:
+            Any: Résultat de l'appel (LimitedStream pour un flux)
+        """
+        attempt = 0
+        while True:
+            await self.acquire(estimated_tokens)
+            await self.concurrency.acquire()
+            streaming = False
+            try:
+                self._count("calls")
+                result = await call()
+            except RETRYABLE_ERRORS as e:
+                if isinstance(e, openai.RateLimitError):
+                    self._count("rate_limited")
+                    self.concurrency.on_overload()
+                if attempt >= self.max_retries:
+                    self._count("failures")
+                    raise
+                delay = self._retry_delay(attempt, e)
+                attempt += 1
+                self._count("retries")
+                logger.warning(f"Appel OpenAI en échec ({type(e).__name__}), nouvel essai {attempt}/{self.max_retries} dans {delay:.2f}s")
+            else:
+                self.concurrency.on_success()
+                if isinstance(result, (openai.Stream, openai.AsyncStream)):
+                    # Le créneau reste occupé jusqu'à la fin de la lecture du flux
+                    streaming = True
+                    return LimitedStream(self, result, estimated_tokens)
+                self.refund(estimated_tokens, getattr(result, "usage", None))
+                return result
+            finally:
+                if not streaming:
+                    await self.concurrency.release()
+            await asyncio.sleep(delay)
+
+    def refund(self, estimated_tokens: int, usage: Any) -> None:
+        """Restitue les tokens réservés mais non consommés (usage renvoyé par l'API)"""
+        total_tokens = getattr(usage, "total_tokens", None)
+        if isinstance(total_tokens, int) and total_tokens < estimated_tokens:
+            self.tokens.level = min(self.tokens.capacity, self.tokens.level + estimated_tokens - total_tokens)
+
+class LimitedStream:
+    """
+    Flux OpenAI (stream=True) qui occupe un créneau de concurrence du limiteur
+
+    La connexion reste ouverte pendant toute la lecture : le créneau n'est
+    libéré, et les tokens non consommés restitués (usage du dernier
+    fragment), qu'à l'épuisement ou à la fermeture du flux.
+    """
+
+    def __init__(self, limiter: OpenAIRateLimiter, stream: Any, estimated_tokens: int):
+        self.limiter = limiter
+        self.stream = stream
+        self.estimated_tokens = estimated_tokens
+        self.usage: Any = None
+        self._released = False
+
+    def observe(self, chunk: Any) -> None:
+        """Relève l'usage porté par un fragment (dernier fragment avec include_usage)"""
+        usage = getattr(chunk, "usage", None)
+        if usage is not None:
+            self.usage = usage
+
+    async def release(self) -> None:
+        """Ferme le flux, restitue les tokens non consommés et libère le créneau (idempotent)"""
+        if self._released:
+            return
+        self._released = True
+        try:
+            closed = self.stream.close()
+            if inspect.isawaitable(closed):
+                await closed
+        finally:
+            self.limiter.refund(self.estimated_tokens, self.usage)
+            await self.limiter.concurrency.release()
+
+class RateLimiterRegistry:
+    """
+    Limiteurs par client OpenAI (empreinte de la clé API, organisation)
+
+    Les quotas OpenAI s'appliquent à chaque clé et organisation : un client
+    n'entame pas les budgets ni la concurrence d'un autre. Les limiteurs des
+    clients les moins récemment utilisés sont évincés (LRU).
+    """
+
+    def __init__(self, max_entries: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv("OPENAI_CLIENT_CACHE_SIZE", "32"))
+        self.max_entries = max(1, max_entries)
+        self._limiters: "OrderedDict[Tuple[str, Optional[str]], OpenAIRateLimiter]" = OrderedDict()
+
+    def get(self, key: Tuple[str, Optional[str]]) -> OpenAIRateLimiter:
+        """
+        Limiteur d'un client, créé à sa première utilisation
+
+        Args:
+            key: Clé du client (voir client_key)
+
+        Returns:
+            OpenAIRateLimiter: Limiteur du client
+        """
+        limiter = self._limiters.get(key)
+        if limiter is None:
+            limiter = self._limiters[key] = OpenAIRateLimiter()
+            while len(self._limiters) > self.max_entries:
+                self._limiters.popitem(last=False)
+        else:
+            self._limiters.move_to_end(key)
+        return limiter
+
+# Instance globale : un limiteur par client OpenAI
+openai_rate_limiters = RateLimiterRegistry()
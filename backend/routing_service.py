@@ -0,0 +1,200 @@
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+import logging
+from models import ProjectRequest, ProjectType, ComplexityLevel
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """Niveau de modèle choisi pour une génération"""
+    name: str
+    model: str
+    max_tokens: int
+    # Coût en dollars pour 1000 tokens d'entrée et de sortie
+    prompt_cost_per_1k: float = 0.0
+    completion_cost_per_1k: float = 0.0
+
+@dataclass
+class RouteStats:
+    """Latence et consommation mesurées pour un niveau de modèle"""
+    generations: int = 0
+    fallbacks: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=1000))
+
+    def percentile(self, ratio: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(ratio * len(ordered)))]
+
+# Poids des types de projets (les projets simples restent sur le niveau léger)
+PROJECT_TYPE_WEIGHTS: Dict[Optional[ProjectType], float] = {
+    ProjectType.PORTFOLIO: 0.0,
+    ProjectType.BLOG: 0.5,
+    ProjectType.API: 1.0,
+    ProjectType.ECOMMERCE: 2.0,
+    ProjectType.MOBILE_APP: 2.0,
+    ProjectType.DESKTOP_APP: 2.0,
+    ProjectType.SAAS: 2.5,
+    ProjectType.CUSTOM: 1.5,
+    None: 1.5,
+}
+
+COMPLEXITY_WEIGHTS: Dict[Optional[ComplexityLevel], float] = {
+    ComplexityLevel.LOW: 0.0,
+    ComplexityLevel.MEDIUM: 1.0,
+    ComplexityLevel.HIGH: 3.0,
+    None: 1.0,
+}
+
+def _env_route(prefix: str, name: str, model: str, max_tokens: int, prompt_cost: float, completion_cost: float) -> ModelRoute:
+    """Construit un niveau de modèle surchargeable par variables d'environnement"""
+    return ModelRoute(
+        name=name,
+        model=os.getenv(f"{prefix}_MODEL", model),
+        max_tokens=int(os.getenv(f"{prefix}_MAX_TOKENS", str(max_tokens))),
+        prompt_cost_per_1k=float(os.getenv(f"{prefix}_PROMPT_COST_PER_1K", str(prompt_cost))),
+        completion_cost_per_1k=float(os.getenv(f"{prefix}_COMPLETION_COST_PER_1K", str(completion_cost)))
+    )
+
+class ModelRouter:
+    """
+    Politique de routage des générations vers un niveau de modèle
+
+    Chaque requête reçoit un score (type de projet, complexité, longueur de la
+    description, nombre d'exigences) : sous le seuil, le niveau léger (modèle
+    rapide et économique, moins de tokens de sortie) est utilisé, sinon le
+    niveau standard. Le modèle configuré par l'utilisateur remplace celui du
+    niveau standard. Latence et coût sont mesurés par niveau.
+    """
+
+    def __init__(
+        self,
+        light: Optional[ModelRoute] = None,
+        standard: Optional[ModelRoute] = None,
+        threshold: Optional[float] = None,
+        enabled: Optional[bool] = None
+    ):
+        if light is None:
+            light = _env_route("ROUTE_LIGHT", "light", "gpt-3.5-turbo", 2500, 0.0005, 0.0015)
+        if standard is None:
+            standard = _env_route("ROUTE_STANDARD", "standard", "gpt-4", 4000, 0.03, 0.06)
+        if threshold is None:
+            threshold = float(os.getenv("MODEL_ROUTING_THRESHOLD", "3"))
+        if enabled is None:
+            enabled = os.getenv("MODEL_ROUTING_ENABLED", "true").lower() not in ("0", "false", "no")
+        self.light = light
+        self.standard = standard
+        self.threshold = threshold
+        self.enabled = enabled
+        self.stats: Dict[str, RouteStats] = {light.name: RouteStats(), standard.name: RouteStats()}
+
+    def score(self, request: ProjectRequest) -> float:
+        """
+        Score de difficulté d'une requête (plus il est élevé, plus le modèle doit être capable)
+
+        Args:
+            request: Requête de projet
+
+        Returns:
+            float: Score
+        """
+        preferences = request.preferences
+        complexity = preferences.complexity if preferences else None
+        score = PROJECT_TYPE_WEIGHTS.get(request.project_type, 1.5) + COMPLEXITY_WEIGHTS.get(complexity, 1.0)
+        # Une description longue ou de nombreuses exigences demandent plus de raisonnement
+        score += min(len(request.description) / 500, 2.0)
+        score += min(len(request.additional_requirements or []) * 0.5, 2.0)
+        if preferences and preferences.team_size and preferences.team_size > 5:
+            score += 1.0
+        return score
+
+    def select(self, request: ProjectRequest, configured_model: Optional[str] = None) -> ModelRoute:
+        """
+        Choisit le niveau de modèle d'une requête
+
+        Args:
+            request: Requête de projet
+            configured_model: Modèle choisi par l'utilisateur lors de la configuration
+
+        Returns:
+            ModelRoute: Niveau retenu
+        """
+        standard = self.standard
+        if configured_model and configured_model != standard.model:
+            standard = ModelRoute(
+                name=standard.name,
+                model=configured_model,
+                max_tokens=standard.max_tokens,
+                prompt_cost_per_1k=standard.prompt_cost_per_1k,
+                completion_cost_per_1k=standard.completion_cost_per_1k
+            )
+        if not self.enabled or self.score(request) >= self.threshold:
+            return standard
+        return self.light
+
+    def record_usage(self, route: ModelRoute, response: Any) -> None:
+        """
+        Enregistre les tokens consommés par un appel (response.usage)
+
+        Args:
+            route: Niveau utilisé
+            response: Réponse de l'API OpenAI
+        """
+        usage = getattr(response, "usage", None)
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        if not isinstance(prompt_tokens, int) or not isinstance(completion_tokens, int):
+            return
+        stats = self.stats.setdefault(route.name, RouteStats())
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.cost += (
+            prompt_tokens * route.prompt_cost_per_1k + completion_tokens * route.completion_cost_per_1k
+        ) / 1000
+
+    def record_generation(self, route: ModelRoute, started_at: float, is_fallback: bool = False) -> None:
+        """
+        Enregistre la latence d'une génération complète
+
+        Args:
+            route: Niveau utilisé
+            started_at: Instant de début (time.monotonic())
+            is_fallback: La génération a-t-elle utilisé le schéma de repli ?
+        """
+        stats = self.stats.setdefault(route.name, RouteStats())
+        stats.generations += 1
+        if is_fallback:
+            stats.fallbacks += 1
+        stats.latencies.append(time.monotonic() - started_at)
+
+    def describe(self) -> Dict[str, Any]:
+        """Politique courante et statistiques par niveau"""
+        routes: List[Dict[str, Any]] = []
+        for route in (self.light, self.standard):
+            stats = self.stats.get(route.name, RouteStats())
+            p50 = stats.percentile(0.5)
+            p95 = stats.percentile(0.95)
+            routes.append({
+                "name": route.name,
+                "model": route.model,
+                "max_tokens": route.max_tokens,
+                "generations": stats.generations,
+                "fallbacks": stats.fallbacks,
+                "latency_p50_ms": round(p50 * 1000, 1) if p50 is not None else None,
+                "latency_p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "prompt_tokens": stats.prompt_tokens,
+                "completion_tokens": stats.completion_tokens,
+                "cost_usd": round(stats.cost, 4)
+            })
+        return {"enabled": self.enabled, "threshold": self.threshold, "routes": routes}
+
+# Instance globale de la politique de routage
+model_router = ModelRouter()
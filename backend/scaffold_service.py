@@ -0,0 +1,165 @@
+import io
+import re
+import time
+import tarfile
+import zipfile
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from models import FileStructure
+
+# Taille des morceaux envoyés au client (octets)
+CHUNK_SIZE = 64 * 1024
+
+class ScaffoldEntry(NamedTuple):
+    """Entrée de l'arborescence à écrire dans l'archive"""
+    path: str
+    is_dir: bool
+    content: Optional[str] = None
+
+class _ChunkWriter:
+    """
+    Destination d'écriture non seekable vidée par morceaux
+
+    zipfile et tarfile (mode flux) y écrivent séquentiellement ; les octets
+    accumulés sont repris par drain() et envoyés au client, la mémoire reste
+    bornée par la taille d'un morceau.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self.size = 0
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        self.size = 0
+        return data
+
+def _safe_parts(name: str) -> List[str]:
+    """
+    Segments de chemin d'un nom de nœud
+
+    Un nom contenant des séparateurs ("src/index.js") crée les dossiers
+    intermédiaires ; les segments vides, "." et ".." sont ignorés pour que
+    l'archive ne puisse pas écrire hors de son dossier racine.
+    """
+    parts = re.split(r"[\\/]+", name or "")
+    return [part for part in (part.strip() for part in parts) if part and part not in (".", "..")]
+
+def _is_directory(node: FileStructure) -> bool:
+    return node.type == "directory" or bool(node.children)
+
+def iter_scaffold(root: FileStructure) -> Iterator[ScaffoldEntry]:
+    """
+    Parcourt l'arborescence en profondeur, dossier avant son contenu
+
+    Parcours itératif (pile d'itérateurs, un par dossier ouvert) : aucune
+    limite de récursion quelle que soit la profondeur, et la mémoire du
+    parcours est proportionnelle à la profondeur, pas au nombre de nœuds.
+
+    Args:
+        root: Racine de la structure de fichiers (dossier racine de l'archive)
+
+    Yields:
+        ScaffoldEntry: Dossiers et fichiers avec leur chemin complet
+    """
+    root_path = "/".join(_safe_parts(root.name)) or "project"
+    yield ScaffoldEntry(root_path, True)
+    stack: List[Tuple[Iterator[FileStructure], str]] = [(iter(root.children or []), root_path)]
+    while stack:
+        children, parent = stack[-1]
+        child = next(children, None)
+        if child is None:
+            stack.pop()
+            continue
+        parts = _safe_parts(child.name)
+        if not parts:
+            continue
+        path = f"{parent}/{'/'.join(parts)}"
+        if _is_directory(child):
+            yield ScaffoldEntry(path, True)
+            stack.append((iter(child.children or []), path))
+        else:
+            yield ScaffoldEntry(path, False, child.content or "")
+
+def stream_zip(root: FileStructure, mtime: Optional[float] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Archive ZIP de l'arborescence, produite par morceaux
+
+    La destination n'étant pas seekable, zipfile écrit les tailles et CRC
+    après chaque fichier (descripteurs de données). Seul le répertoire
+    central, écrit à la fin, garde une entrée par fichier en mémoire.
+
+    Args:
+        root: Racine de la structure de fichiers
+        mtime: Date des entrées (timestamp), maintenant par défaut
+        chunk_size: Taille minimale des morceaux produits
+
+    Yields:
+        bytes: Morceaux successifs de l'archive
+    """
+    writer = _ChunkWriter()
+    date_time = time.localtime(mtime if mtime is not None else time.time())[:6]
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for entry in iter_scaffold(root):
+            if entry.is_dir:
+                info = zipfile.ZipInfo(entry.path + "/", date_time)
+                info.external_attr = (0o40755 << 16) | 0x10
+                archive.writestr(info, b"")
+            else:
+                info = zipfile.ZipInfo(entry.path, date_time)
+                info.external_attr = 0o644 << 16
+                info.compress_type = zipfile.ZIP_DEFLATED
+                archive.writestr(info, entry.content.encode("utf-8"))
+            if writer.size >= chunk_size:
+                yield writer.drain()
+    yield writer.drain()
+
+def stream_tar(root: FileStructure, mtime: Optional[float] = None, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Archive tar.gz de l'arborescence, produite par morceaux (mémoire constante)
+
+    Args:
+        root: Racine de la structure de fichiers
+        mtime: Date des entrées (timestamp), maintenant par défaut
+        chunk_size: Taille minimale des morceaux produits
+
+    Yields:
+        bytes: Morceaux successifs de l'archive
+    """
+    writer = _ChunkWriter()
+    timestamp = int(mtime if mtime is not None else time.time())
+    with tarfile.open(fileobj=writer, mode="w|gz", format=tarfile.PAX_FORMAT) as archive:
+        for entry in iter_scaffold(root):
+            info = tarfile.TarInfo(entry.path)
+            info.mtime = timestamp
+            if entry.is_dir:
+                info.type = tarfile.DIRTYPE
+                info.mode = 0o755
+                archive.addfile(info)
+            else:
+                data = entry.content.encode("utf-8")
+                info.size = len(data)
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+            if writer.size >= chunk_size:
+                yield writer.drain()
+    yield writer.drain()
+
+# Formats d'archive : type MIME et générateur
+ARCHIVE_FORMATS: Dict[str, Tuple[str, Callable[..., Iterator[bytes]]]] = {
+    "zip": ("application/zip", stream_zip),
+    "tar.gz": ("application/gzip", stream_tar),
+}
+
+def archive_filename(project_name: str, archive_format: str) -> str:
+    """Nom du fichier proposé au téléchargement"""
+    slug = re.sub(r"[^A-Za-z0-9._-]+", "-", project_name).strip("-.") or "project"
+    return f"{slug}.{archive_format}"
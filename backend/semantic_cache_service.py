@@ -0,0 +1,264 @@
+import os
+import re
+import math
+import time
+import zlib
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+from models import ProjectRequest, ProjectSchema
+
+try:
+    import numpy as np
+except ImportError:  # Dépendance optionnelle : recherche en Python pur sans elle
+    np = None
+
+logger = logging.getLogger(__name__)
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Mots vides ignorés (français et anglais)
+STOPWORDS = frozenset(
+    "a au aux avec ce ces cette dans de des du en et je la le les leur ma mes mon ne nous on ou par pas "
+    "pour qu que qui sa se ses son sur ta te tes ton un une vos votre vous veux voudrais souhaite faire creer "
+    "site web plateforme application projet outil "
+    "an and app for i in is of on or the to with want need build create".split()
+)
+
+# Expressions équivalentes ramenées à un même terme
+SYNONYMS: List[Tuple[re.Pattern, str]] = [
+    (re.compile(pattern), replacement) for pattern, replacement in [
+        (r"\b(?:boutique|magasin|vente|shop|store) (?:en ligne|online)\b", "ecommerce"),
+        (r"\bonline (?:shop|store)\b", "ecommerce"),
+        (r"\be commerce\b", "ecommerce"),
+        (r"\b(?:application|appli|app) mobile\b", "mobileapp"),
+        (r"\bmobile app(?:lication)?\b", "mobileapp"),
+        (r"\bsite (?:web )?vitrine\b", "portfolio"),
+    ]
+]
+
+def _normalize_text(text: str) -> str:
+    """Minuscules, sans accents ni ponctuation, expressions équivalentes unifiées"""
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode("ascii")
+    text = " ".join(_WORD.findall(text))
+    for pattern, replacement in SYNONYMS:
+        text = pattern.sub(replacement, text)
+    return text
+
+def _stem(word: str) -> str:
+    """Racinisation minimale (pluriels en -s / -x)"""
+    if len(word) > 3 and word[-1] in "sx":
+        return word[:-1]
+    return word
+
+def extract_features(text: str) -> Dict[str, float]:
+    """
+    Caractéristiques pondérées d'un texte : mots racinisés et trigrammes de caractères
+
+    Les trigrammes rapprochent les variantes d'un même mot (artisanal / artisanaux).
+
+    Args:
+        text: Texte à analyser
+
+    Returns:
+        Dict[str, float]: Poids par caractéristique
+    """
+    features: Dict[str, float] = {}
+    for word in _normalize_text(text).split():
+        if word in STOPWORDS:
+            continue
+        word = _stem(word)
+        features["w:" + word] = features.get("w:" + word, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            gram = "g:" + padded[i:i + 3]
+            features[gram] = features.get(gram, 0.0) + 0.25
+    return features
+
+class HashingVectorizer:
+    """
+    Vectorisation locale par hachage (sans vocabulaire ni modèle)
+
+    Chaque caractéristique est projetée sur `dimensions` composantes par
+    CRC32 avec un signe pseudo-aléatoire ; le poids est amorti (1 + log tf) et
+    le vecteur normalisé (norme L2), le produit scalaire donnant le cosinus.
+    """
+
+    def __init__(self, dimensions: int = 2048):
+        self.dimensions = dimensions
+
+    def sparse(self, text: str) -> Dict[int, float]:
+        """Vecteur creux normalisé {indice: valeur}"""
+        vector: Dict[int, float] = {}
+        for feature, weight in extract_features(text).items():
+            digest = zlib.crc32(feature.encode("utf-8"))
+            index = digest % self.dimensions
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            value = 1.0 + math.log(weight) if weight > 1 else weight
+            vector[index] = vector.get(index, 0.0) + sign * value
+        norm = math.sqrt(sum(value * value for value in vector.values()))
+        if norm == 0:
+            return {}
+        return {index: value / norm for index, value in vector.items()}
+
+    def dense(self, text: str) -> Any:
+        """Vecteur dense normalisé (tableau NumPy float32)"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for index, value in self.sparse(text).items():
+            vector[index] = value
+        return vector
+
+@dataclass
+class _SemanticEntry:
+    """Schéma en cache avec le vecteur de la description qui l'a produit"""
+    scope: str
+    vector: Any
+    schema: ProjectSchema
+    description: str
+    created_at: float
+
+class SemanticCacheService:
+    """
+    Cache sémantique des générations passées (CPU uniquement, hors ligne)
+
+    Les descriptions sont vectorisées localement (HashingVectorizer) ; une
+    requête réutilise le schéma de la description la plus proche si le cosinus
+    dépasse le seuil. La recherche est restreinte aux entrées de même portée
+    (type, complexité, préférences, modèle, version des prompts). Recherche
+    vectorisée avec NumPy si disponible, en Python pur sinon. Éviction LRU par
+    capacité et expiration par TTL.
+    """
+
+    def __init__(
+        self,
+        enabled: Optional[bool] = None,
+        threshold: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        ttl: Optional[float] = None,
+        dimensions: int = 2048
+    ):
+        if enabled is None:
+            enabled = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+        if threshold is None:
+            threshold = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.8"))
+        if max_entries is None:
+            max_entries = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000"))
+        if ttl is None:
+            ttl = float(os.getenv("SEMANTIC_CACHE_TTL", os.getenv("SCHEMA_CACHE_TTL", "86400")))
+        self.enabled = enabled
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.vectorizer = HashingVectorizer(dimensions)
+        self._entries: "OrderedDict[str, _SemanticEntry]" = OrderedDict()
+        # Matrice des vecteurs par portée (NumPy), reconstruite après modification
+        self._matrices: Dict[str, Tuple[List[str], Any]] = {}
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _vectorize(self, text: str) -> Any:
+        return self.vectorizer.dense(text) if np is not None else self.vectorizer.sparse(text)
+
+    def _similarities(self, scope: str, query: Any) -> List[Tuple[str, float]]:
+        """Cosinus entre la requête et chaque entrée de la portée"""
+        if np is not None:
+            if scope not in self._matrices:
+                keys = [key for key, entry in self._entries.items() if entry.scope == scope]
+                matrix = np.stack([self._entries[key].vector for key in keys]) if keys else None
+                self._matrices[scope] = (keys, matrix)
+            keys, matrix = self._matrices[scope]
+            if matrix is None:
+                return []
+            return list(zip(keys, (matrix @ query).tolist()))
+
+        results = []
+        for key, entry in self._entries.items():
+            if entry.scope != scope:
+                continue
+            vector = entry.vector
+            small, large = (query, vector) if len(query) < len(vector) else (vector, query)
+            results.append((key, sum(value * large.get(index, 0.0) for index, value in small.items())))
+        return results
+
+    def lookup(self, request: ProjectRequest, scope: str) -> Optional[Tuple[ProjectSchema, float]]:
+        """
+        Recherche le schéma d'une description similaire
+
+        Args:
+            request: Requête de projet
+            scope: Portée de la requête (empreinte hors description)
+
+        Returns:
+            Optional[Tuple[ProjectSchema, float]]: Schéma adapté à la requête et similarité, ou None
+        """
+        if not self.enabled or not self._entries:
+            self.stats["misses"] += 1
+            return None
+
+        query = self._vectorize(request.description)
+        best_key, best_score = None, -1.0
+        for key, score in self._similarities(scope, query):
+            if score > best_score:
+                best_key, best_score = key, score
+
+        if best_key is None or best_score < self.threshold:
+            self.stats["misses"] += 1
+            return None
+
+        entry = self._entries[best_key]
+        if time.time() - entry.created_at > self.ttl:
+            self._remove(best_key)
+            self.stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(best_key)
+        self.stats["hits"] += 1
+        logger.info(f"Cache sémantique : description similaire réutilisée (similarité {best_score:.2f})")
+        return self._adapt(entry.schema, request), best_score
+
+    def store(self, request: ProjectRequest, scope: str, schema: ProjectSchema) -> None:
+        """
+        Enregistre le schéma généré pour une description
+
+        Args:
+            request: Requête de projet
+            scope: Portée de la requête (empreinte hors description)
+            schema: Schéma généré
+        """
+        if not self.enabled:
+            return
+        key = f"{scope}:{request.description}"
+        self._entries[key] = _SemanticEntry(
+            scope=scope,
+            vector=self._vectorize(request.description),
+            schema=schema,
+            description=request.description,
+            created_at=time.time()
+        )
+        self._entries.move_to_end(key)
+        self._matrices.pop(scope, None)
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+
+    def clear(self) -> None:
+        """Vide le cache"""
+        self._entries.clear()
+        self._matrices.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._matrices.pop(entry.scope, None)
+
+    @staticmethod
+    def _adapt(schema: ProjectSchema, request: ProjectRequest) -> ProjectSchema:
+        """Reprend la description de la nouvelle requête dans le schéma réutilisé"""
+        return schema.model_copy(update={"description": request.description})
+
+# Instance globale du cache sémantique
+semantic_cache = SemanticCacheService()
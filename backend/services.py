@@ -1,47 +1,295 @@
 import os
-import json
-from typing import Dict, Any
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
 import openai
+from pydantic import BaseModel, ValidationError
 from models import ProjectRequest, ProjectSchema, Architecture, Roadmap, FileStructure, RecommendedStack, TechnologyRecommendation
 from config_service import config_service
+from stream_service import IncrementalSectionParser
+from json_recovery import recover_sections
+from routing_service import ModelRoute, model_router
+from template_service import template_store
+from metrics_service import metrics_service
+import json_backend
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class GenerationResult:
+    """Résultat d'une génération, avec l'indication d'un éventuel repli"""
+    schema: ProjectSchema
+    is_fallback: bool = False
+    fallback_reason: Optional[str] = None
+    # Sections obtenues par la requête complémentaire après une réponse imparfaite
+    recovered_sections: List[str] = field(default_factory=list)
+    # Sections restées incomplètes (valeurs tronquées ou par défaut)
+    incomplete_sections: List[str] = field(default_factory=list)
+    # Identifiant du schéma dans l'historique (history_service)
+    schema_id: Optional[str] = None
+    
+    @property
+    def cacheable(self) -> bool:
+        """Le résultat peut-il être mis en cache (ni repli, ni sections incomplètes) ?"""
+        return not self.is_fallback and not self.incomplete_sections
+
+def validation_reason(error: ValidationError) -> str:
+    """
+    Motif de repli correspondant à une erreur de validation de la réponse
+    
+    Returns:
+        str: "invalid_json" si le texte n'est pas du JSON, sinon "invalid_schema"
+    """
+    if any(detail["type"] == "json_invalid" for detail in error.errors()):
+        return "invalid_json"
+    return "invalid_schema"
 
 class SchemaGeneratorService:
     """Service pour générer des schémas de projets avec OpenAI"""
     
-    def __init__(self):
+    # Version du prompt (à incrémenter à chaque modification des prompts pour
+    # invalider les réponses mises en cache). Le modèle et le budget de sortie
+    # sont choisis par requête par la politique de routage (routing_service).
+    prompt_version = "1"
+    # Budget de référence auquel les budgets des sections sont proportionnés
+    max_tokens = 4000
+    # Budget de la requête complémentaire demandant les sections manquantes
+    followup_max_tokens = 2000
+    
+    # Mode "parallel" : squelette du projet, puis une requête concurrente par
+    # groupe de sections (latence bornée par le groupe le plus lent)
+    skeleton_sections = ["project_name", "description", "project_type", "complexity",
+                         "estimated_duration", "recommended_stack", "features"]
+    skeleton_max_tokens = 1200
+    section_groups: Dict[str, Tuple[List[str], int]] = {
+        "architecture": (["architecture", "technical_requirements"], 1200),
+        "file_structure": (["file_structure"], 1500),
+        "roadmap": (["roadmap", "potential_challenges", "success_metrics"], 1000),
+        "strategies": (["deployment_strategy", "testing_strategy", "monitoring_strategy", "documentation"], 1000),
+    }
+    
+    # Démarrage à partir des bases précalculées (template_service) : "off",
+    # "instant" (base personnalisée hors ligne, sans appel) ou "diff" (le modèle
+    # ne renvoie que les sections à modifier par rapport à la base)
+    template_modes = ("off", "instant", "diff")
+    template_diff_max_tokens = 1200
+    
+    # Budgets de sortie de la régénération d'une section (budget par défaut
+    # pour les sections courtes et les sous-sections comme une technologie)
+    regenerate_budgets: Dict[str, int] = {
+        "recommended_stack": 1200,
+        "architecture": 1000,
+        "file_structure": 1500,
+        "roadmap": 800,
+    }
+    regenerate_default_budget = 400
+    
+    def __init__(self, mode: Optional[str] = None, template_mode: Optional[str] = None):
         # Ne plus créer directement le client ici, utiliser le service de configuration
-        pass
+        if mode is None:
+            mode = os.getenv("SCHEMA_GENERATION_MODE", "single")
+        if template_mode is None:
+            template_mode = os.getenv("TEMPLATE_WARM_START", "off")
+        self.parallel = mode.lower() == "parallel"
+        self.template_mode = template_mode.lower() if template_mode.lower() in self.template_modes else "off"
+        if self.parallel:
+            # Les schémas des deux modes ne partagent pas leurs entrées de cache
+            self.prompt_version = f"{self.prompt_version}-parallel"
+        if self.template_mode != "off":
+            # Un nouveau jeu de bases invalide les schémas qui en sont dérivés
+            self.prompt_version = f"{self.prompt_version}-template-{self.template_mode}-{template_store.version}"
         
     async def generate_schema(self, request: ProjectRequest) -> ProjectSchema:
         """Génère un schéma complet de projet"""
+        result = await self.generate(request)
+        return result.schema
+    
+    def route(self, request: ProjectRequest) -> ModelRoute:
+        """Niveau de modèle retenu pour une requête (tient compte du modèle configuré)"""
+        return model_router.select(request, config_service.get_model())
+    
+    async def generate(self, request: ProjectRequest) -> GenerationResult:
+        """Génère un schéma complet de projet en indiquant si le repli a été utilisé"""
+        route = self.route(request)
+        started_at = time.monotonic()
+        result = await self._generate(request, route)
+        self._record_generation(route, started_at, result)
+        return result
+    
+    def _record_usage(self, route: ModelRoute, response: Any) -> None:
+        """Enregistre les tokens d'un appel (coût par niveau et métriques)"""
+        model_router.record_usage(route, response)
+        metrics_service.record_usage(route.name, response)
+    
+    def _record_generation(self, route: ModelRoute, started_at: float, result: GenerationResult) -> None:
+        """Enregistre la latence et l'issue d'une génération (routage et métriques)"""
+        model_router.record_generation(route, started_at, result.is_fallback)
+        metrics_service.record_generation(
+            route.name,
+            time.monotonic() - started_at,
+            result.fallback_reason if result.is_fallback else None,
+            bool(result.incomplete_sections)
+        )
+    
+    async def _generate(self, request: ProjectRequest, route: ModelRoute) -> GenerationResult:
+        """Génère un schéma avec le niveau de modèle donné"""
+        if self.template_mode == "instant":
+            return GenerationResult(schema=self._complete_schema(template_store.customize(request), request))
+        if self.template_mode == "diff":
+            return await self._generate_from_template(request, route)
+        if self.parallel:
+            async for event, payload in self._generate_sections(request, route):
+                if event == "complete":
+                    return payload
         
         # Construire le prompt pour OpenAI
-        prompt = self._build_prompt(request)
+        with metrics_service.stage("prompt_build"):
+            prompt = self._build_prompt(request)
         
         try:
             # Utiliser le service de configuration pour obtenir le client
             client = config_service.get_client()
             
-            # Appel à OpenAI
-            response = client.chat.completions.create(
-                model="gpt-4",
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=4000,
-                temperature=0.7
-            )
+            # Appel à OpenAI (non bloquant pour la boucle d'événements)
+            with metrics_service.stage("upstream"):
+                response = await config_service.call_openai(
+                    client.chat.completions.create,
+                    model=route.model,
+                    messages=[
+                        {"role": "system", "content": self._get_system_prompt()},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=route.max_tokens,
+                    temperature=0.7
+                )
+            self._record_usage(route, response)
             
             # Parser la réponse
             ai_response = response.choices[0].message.content
-            schema_data = self._parse_ai_response(ai_response, request)
+            try:
+                with metrics_service.stage("parse"):
+                    schema_data = self._parse_ai_response(ai_response, request)
+            except ValidationError as e:
+                # Réponse imparfaite : conserver les sections valides plutôt que tout jeter
+                with metrics_service.stage("recovery"):
+                    recovered = await self._recover_response(ai_response, request, route)
+                if recovered is not None:
+                    return recovered
+                logger.warning(f"Réponse OpenAI non parsable, utilisation du schéma par défaut: {str(e)}")
+                return GenerationResult(
+                    schema=self._generate_fallback_schema(request),
+                    is_fallback=True,
+                    fallback_reason=validation_reason(e)
+                )
             
-            return schema_data
+            return GenerationResult(schema=schema_data)
             
         except Exception as e:
             # Fallback avec un schéma par défaut
-            return self._generate_fallback_schema(request)
+            logger.warning(f"Échec de la génération OpenAI, utilisation du schéma par défaut: {str(e)}")
+            return GenerationResult(
+                schema=self._generate_fallback_schema(request),
+                is_fallback=True,
+                fallback_reason="upstream_error"
+            )
+    
+    async def stream_schema(self, request: ProjectRequest) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Génère un schéma en streaming
+        
+        Produit des événements ("token", texte) pour chaque morceau reçu,
+        ("section", {"name", "value"}) dès qu'une section de premier niveau est
+        complète, puis un unique ("complete", GenerationResult). En mode
+        parallèle, aucun événement "token" n'est produit : les sections sont
+        émises par groupe dès que chaque requête se termine.
+        """
+        route = self.route(request)
+        started_at = time.monotonic()
+        async for event, payload in self._stream(request, route):
+            if event == "complete":
+                self._record_generation(route, started_at, payload)
+            yield event, payload
+    
+    async def _stream(self, request: ProjectRequest, route: ModelRoute) -> AsyncIterator[Tuple[str, Any]]:
+        """Génère un schéma en streaming avec le niveau de modèle donné"""
+        if self.template_mode != "off":
+            # Base précalculée : une seule réponse courte, émise section par section
+            result = await self._generate(request, route)
+            for name, value in result.schema.model_dump(mode="json").items():
+                yield "section", {"name": name, "value": value}
+            yield "complete", result
+            return
+        if self.parallel:
+            async for event in self._generate_sections(request, route):
+                yield event
+            return
+        
+        with metrics_service.stage("prompt_build"):
+            prompt = self._build_prompt(request)
+        parser = IncrementalSectionParser()
+        upstream_started_at = time.perf_counter()
+        
+        try:
+            client = config_service.get_client()
+            
+            stream = await config_service.call_openai(
+                client.chat.completions.create,
+                model=route.model,
+                messages=[
+                    {"role": "system", "content": self._get_system_prompt()},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=route.max_tokens,
+                temperature=0.7,
+                stream=True,
+                stream_options={"include_usage": True}
+            )
+            
+            async for chunk in config_service.iterate_stream(stream):
+                # Le dernier fragment (sans choix) porte les tokens consommés
+                if chunk.usage:
+                    self._record_usage(route, chunk)
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                yield "token", delta
+                for name, value in parser.feed(delta):
+                    yield "section", {"name": name, "value": value}
+            metrics_service.stage_duration.observe(time.perf_counter() - upstream_started_at, stage="upstream")
+                    
+        except Exception as e:
+            logger.warning(f"Échec du streaming OpenAI, utilisation du schéma par défaut: {str(e)}")
+            yield "complete", GenerationResult(
+                schema=self._generate_fallback_schema(request),
+                is_fallback=True,
+                fallback_reason="upstream_error"
+            )
+            return
+        
+        try:
+            with metrics_service.stage("parse"):
+                schema = self._parse_ai_response(parser.text, request)
+            yield "complete", GenerationResult(schema=schema)
+        except ValidationError as e:
+            with metrics_service.stage("recovery"):
+                recovered = await self._recover_response(parser.text, request, route)
+            if recovered is not None:
+                if recovered.recovered_sections:
+                    values = recovered.schema.model_dump(mode="json", include=set(recovered.recovered_sections))
+                    for name in recovered.recovered_sections:
+                        yield "section", {"name": name, "value": values[name]}
+                yield "complete", recovered
+                return
+            logger.warning(f"Réponse OpenAI en streaming non parsable, utilisation du schéma par défaut: {str(e)}")
+            yield "complete", GenerationResult(
+                schema=self._generate_fallback_schema(request),
+                is_fallback=True,
+                fallback_reason=validation_reason(e)
+            )
     
     def _get_system_prompt(self) -> str:
         """Prompt système pour OpenAI"""
@@ -96,127 +344,409 @@ class SchemaGeneratorService:
         return prompt
     
     def _parse_ai_response(self, ai_response: str, request: ProjectRequest) -> ProjectSchema:
-        """Parse la réponse d'OpenAI et crée un ProjectSchema"""
-        try:
-            # Tenter de parser le JSON
-            data = json.loads(ai_response)
-            
-            # Créer le schéma avec les données parsées
-            return self._create_schema_from_data(data, request)
-            
-        except json.JSONDecodeError:
-            # Si le parsing échoue, utiliser le fallback
-            return self._generate_fallback_schema(request)
+        """
+        Valide la réponse d'OpenAI directement en ProjectSchema (un seul passage)
+        
+        Les champs absents prennent les valeurs par défaut déclarées sur les
+        modèles ; la description et le type manquants sont repris de la requête.
+        
+        Raises:
+            ValidationError: Si la réponse n'est pas un JSON valide ou ne respecte pas le schéma
+        """
+        schema = ProjectSchema.model_validate_json(ai_response)
+        return self._complete_schema(schema, request)
     
-    def _create_schema_from_data(self, data: Dict[str, Any], request: ProjectRequest) -> ProjectSchema:
-        """Crée un ProjectSchema à partir des données parsées"""
+    def _complete_schema(self, schema: ProjectSchema, request: ProjectRequest) -> ProjectSchema:
+        """Complète un schéma validé avec les informations de la requête"""
+        fields_set = schema.model_fields_set
+        if "description" not in fields_set:
+            schema.description = request.description
+        if "project_type" not in fields_set:
+            schema.project_type = self._project_type(request)
         
-        # Créer les recommandations technologiques
-        frontend_rec = TechnologyRecommendation(
-            name=data.get("recommended_stack", {}).get("frontend", {}).get("name", "React"),
-            description=data.get("recommended_stack", {}).get("frontend", {}).get("description", ""),
-            pros=data.get("recommended_stack", {}).get("frontend", {}).get("pros", []),
-            cons=data.get("recommended_stack", {}).get("frontend", {}).get("cons", []),
-            learning_curve=data.get("recommended_stack", {}).get("frontend", {}).get("learning_curve", "Medium"),
-            community_support=data.get("recommended_stack", {}).get("frontend", {}).get("community_support", "Excellent"),
-            job_market=data.get("recommended_stack", {}).get("frontend", {}).get("job_market", "High")
-        )
+        # La racine de l'arborescence est toujours un dossier
+        schema.file_structure.type = "directory"
+        if not schema.file_structure.name:
+            schema.file_structure.name = "project-root"
+        return schema
+    
+    @staticmethod
+    def _valid_sections(sections: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ne conserve que les sections connues dont la valeur respecte le schéma
         
-        backend_rec = TechnologyRecommendation(
-            name=data.get("recommended_stack", {}).get("backend", {}).get("name", "FastAPI"),
-            description=data.get("recommended_stack", {}).get("backend", {}).get("description", ""),
-            pros=data.get("recommended_stack", {}).get("backend", {}).get("pros", []),
-            cons=data.get("recommended_stack", {}).get("backend", {}).get("cons", []),
-            learning_curve=data.get("recommended_stack", {}).get("backend", {}).get("learning_curve", "Medium"),
-            community_support=data.get("recommended_stack", {}).get("backend", {}).get("community_support", "Good"),
-            job_market=data.get("recommended_stack", {}).get("backend", {}).get("job_market", "High")
-        )
+        Les sections fautives sont retirées une à une d'après les erreurs de
+        validation jusqu'à obtenir un ensemble valide.
+        """
+        sections = {name: value for name, value in sections.items() if name in ProjectSchema.model_fields}
+        while sections:
+            try:
+                ProjectSchema.model_validate(sections)
+                return sections
+            except ValidationError as e:
+                invalid = {detail["loc"][0] for detail in e.errors() if detail["loc"]}
+                if not invalid & sections.keys():
+                    return {}
+                for name in invalid:
+                    sections.pop(name, None)
+        return sections
+    
+    async def _recover_response(self, ai_response: str, request: ProjectRequest, route: ModelRoute) -> Optional[GenerationResult]:
+        """
+        Récupère une réponse imparfaite (bloc markdown, préambule, troncature)
         
-        database_rec = TechnologyRecommendation(
-            name=data.get("recommended_stack", {}).get("database", {}).get("name", "PostgreSQL"),
-            description=data.get("recommended_stack", {}).get("database", {}).get("description", ""),
-            pros=data.get("recommended_stack", {}).get("database", {}).get("pros", []),
-            cons=data.get("recommended_stack", {}).get("database", {}).get("cons", []),
-            learning_curve=data.get("recommended_stack", {}).get("database", {}).get("learning_curve", "Medium"),
-            community_support=data.get("recommended_stack", {}).get("database", {}).get("community_support", "Excellent"),
-            job_market=data.get("recommended_stack", {}).get("database", {}).get("job_market", "High")
-        )
+        Les sections complètes et valides sont conservées ; seules les sections
+        manquantes sont redemandées au modèle. Si la requête complémentaire
+        échoue, les sections tronquées réparées sont utilisées en dernier recours.
         
-        deployment_rec = TechnologyRecommendation(
-            name=data.get("recommended_stack", {}).get("deployment", {}).get("name", "Vercel"),
-            description=data.get("recommended_stack", {}).get("deployment", {}).get("description", ""),
-            pros=data.get("recommended_stack", {}).get("deployment", {}).get("pros", []),
-            cons=data.get("recommended_stack", {}).get("deployment", {}).get("cons", []),
-            learning_curve=data.get("recommended_stack", {}).get("deployment", {}).get("learning_curve", "Easy"),
-            community_support=data.get("recommended_stack", {}).get("deployment", {}).get("community_support", "Good"),
-            job_market=data.get("recommended_stack", {}).get("deployment", {}).get("job_market", "Medium")
-        )
+        Returns:
+            Optional[GenerationResult]: Résultat récupéré, ou None si aucune section n'est exploitable
+        """
+        recovered_sections = recover_sections(ai_response or "")
+        sections = self._valid_sections(recovered_sections.complete)
+        if not sections:
+            return None
         
-        recommended_stack = RecommendedStack(
-            frontend=frontend_rec,
-            backend=backend_rec,
-            database=database_rec,
-            deployment=deployment_rec,
-            additional_tools=[],
-            justification=data.get("recommended_stack", {}).get("justification", "")
-        )
+        # Réponse tronquée : tout ce qui n'a pas été reçu manque ; sinon seules
+        # les sections invalides sont redemandées (les absentes gardent leur défaut)
+        if recovered_sections.is_truncated:
+            missing = [name for name in ProjectSchema.model_fields if name not in sections]
+        else:
+            missing = [name for name in recovered_sections.complete if name in ProjectSchema.model_fields and name not in sections]
+        recovered: List[str] = []
+        if missing:
+            followup = self._valid_sections(await self._request_sections(request, sections, missing, route))
+            recovered = [name for name in missing if name in followup]
+            sections.update({name: followup[name] for name in recovered})
         
-        # Créer l'architecture
-        architecture = Architecture(
-            overview=data.get("architecture", {}).get("overview", ""),
-            components=data.get("architecture", {}).get("components", []),
-            data_flow=data.get("architecture", {}).get("data_flow", []),
-            security=data.get("architecture", {}).get("security", []),
-            performance=data.get("architecture", {}).get("performance", [])
-        )
+        incomplete = [name for name in missing if name not in sections]
+        if incomplete:
+            truncated = recovered_sections.truncated
+            repaired = self._valid_sections({name: truncated[name] for name in incomplete if name in truncated})
+            sections.update(repaired)
         
-        # Créer la structure de fichiers
-        file_structure = FileStructure(
-            name=data.get("file_structure", {}).get("name", "project-root"),
-            type="directory",
-            children=self._parse_file_structure(data.get("file_structure", {}).get("children", []))
+        schema = self._complete_schema(ProjectSchema.model_validate(sections), request)
+        logger.info(
+            f"Réponse OpenAI récupérée: {len(sections) - len(recovered)} sections conservées, "
+            f"{len(recovered)} redemandées, {len(incomplete)} incomplètes"
         )
+        return GenerationResult(schema=schema, recovered_sections=recovered, incomplete_sections=incomplete)
+    
+    def _section_budget(self, budget: int, route: ModelRoute) -> int:
+        """Budget de sortie d'une section, proportionné au budget du niveau de modèle"""
+        return max(256, budget * route.max_tokens // self.max_tokens)
+    
+    async def _generate_sections(self, request: ProjectRequest, route: ModelRoute) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Génère un schéma par sections concurrentes (mode parallèle)
         
-        # Créer la roadmap
-        roadmap = Roadmap(
-            phases=data.get("roadmap", {}).get("phases", []),
-            milestones=data.get("roadmap", {}).get("milestones", []),
-            estimated_duration=data.get("roadmap", {}).get("estimated_duration", ""),
-            team_recommendations=data.get("roadmap", {}).get("team_recommendations", [])
+        Un squelette (nom, type, stack, fonctionnalités) est d'abord généré,
+        puis chaque groupe de sections est demandé en parallèle avec le squelette
+        comme contexte. Produit ("section", {"name", "value"}) à mesure que les
+        groupes se terminent, puis ("complete", GenerationResult).
+        """
+        skeleton = self._valid_sections(
+            await self._request_sections(
+                request, {}, self.skeleton_sections, route, self._section_budget(self.skeleton_max_tokens, route)
+            )
         )
+        if not skeleton:
+            logger.warning("Échec de la génération du squelette, utilisation du schéma par défaut")
+            yield "complete", GenerationResult(
+                schema=self._generate_fallback_schema(request),
+                is_fallback=True,
+                fallback_reason="upstream_error"
+            )
+            return
         
-        return ProjectSchema(
-            project_name=data.get("project_name", "Mon Projet"),
-            description=data.get("description", request.description),
-            project_type=data.get("project_type", str(request.project_type) if request.project_type else "custom"),
-            complexity=data.get("complexity", "medium"),
-            estimated_duration=data.get("estimated_duration", "2-3 mois"),
-            recommended_stack=recommended_stack,
-            architecture=architecture,
-            file_structure=file_structure,
-            roadmap=roadmap,
-            features=data.get("features", []),
-            technical_requirements=data.get("technical_requirements", []),
-            deployment_strategy=data.get("deployment_strategy", {}),
-            testing_strategy=data.get("testing_strategy", {}),
-            monitoring_strategy=data.get("monitoring_strategy", {}),
-            documentation=data.get("documentation", []),
-            potential_challenges=data.get("potential_challenges", []),
-            success_metrics=data.get("success_metrics", [])
+        for name, value in skeleton.items():
+            yield "section", {"name": name, "value": value}
+        
+        sections = dict(skeleton)
+        pending = [
+            asyncio.create_task(
+                self._request_sections(request, skeleton, names, route, self._section_budget(budget, route))
+            )
+            for names, budget in self.section_groups.values()
+        ]
+        try:
+            for next_group in asyncio.as_completed(pending):
+                group = self._valid_sections(await next_group)
+                sections.update(group)
+                for name, value in group.items():
+                    yield "section", {"name": name, "value": value}
+        finally:
+            # Client déconnecté : annuler les requêtes restantes
+            for task in pending:
+                task.cancel()
+        
+        incomplete = [name for name in ProjectSchema.model_fields if name not in sections]
+        schema = self._complete_schema(ProjectSchema.model_validate(sections), request)
+        yield "complete", GenerationResult(schema=schema, incomplete_sections=incomplete)
+    
+    @staticmethod
+    def parse_selector(selector: str) -> Tuple[str, Optional[str]]:
+        """
+        Décompose un sélecteur de section ("roadmap", "recommended_stack.database")
+        
+        Raises:
+            ValueError: Si le sélecteur ne désigne pas une section du schéma
+        """
+        name, _, child = selector.partition(".")
+        field_info = ProjectSchema.model_fields.get(name)
+        if field_info is None:
+            raise ValueError(f"Section inconnue : {selector}")
+        if child:
+            annotation = field_info.annotation
+            if not (isinstance(annotation, type) and issubclass(annotation, BaseModel) and child in annotation.model_fields):
+                raise ValueError(f"Section inconnue : {selector}")
+        return name, child or None
+    
+    async def regenerate_sections(
+        self,
+        request: ProjectRequest,
+        schema: ProjectSchema,
+        selectors: List[str],
+        instructions: Optional[str] = None
+    ) -> GenerationResult:
+        """
+        Régénère uniquement certaines sections d'un schéma existant
+        
+        Le modèle reçoit le contexte du projet, les valeurs actuelles des
+        sections choisies et les consignes éventuelles ; le budget de sortie est
+        la somme des budgets de ces sections. Les nouvelles valeurs valides sont
+        fusionnées dans le schéma, les autres sections restent inchangées.
+        
+        Args:
+            request: Requête d'origine du schéma
+            schema: Schéma à modifier
+            selectors: Sections à régénérer ("roadmap", "recommended_stack.database"...)
+            instructions: Consignes de l'utilisateur
+        
+        Returns:
+            GenerationResult: Schéma fusionné ; incomplete_sections liste les
+            sections non régénérées (repli si aucune ne l'a été)
+        
+        Raises:
+            ValueError: Si un sélecteur est inconnu
+        """
+        paths = {selector: self.parse_selector(selector) for selector in dict.fromkeys(selectors)}
+        # Une section entière choisie inclut ses sous-sections
+        paths = {
+            selector: (name, child) for selector, (name, child) in paths.items()
+            if child is None or name not in paths
+        }
+        selected = list(paths)
+        
+        data = schema.model_dump(mode="json")
+        context = {name: value for name, value in data.items() if name not in paths}
+        current = {}
+        for selector, (name, child) in paths.items():
+            current[selector] = data[name][child] if child else data[name]
+        budget = sum(self.regenerate_budgets.get(selector, self.regenerate_default_budget) for selector in selected)
+        
+        route = self.route(request)
+        started_at = time.monotonic()
+        values = await self._request_sections(
+            request, context, selected, route, self._section_budget(budget, route), current, instructions
         )
+        
+        merged: Dict[str, Any] = {}
+        for selector, value in values.items():
+            name, child = paths[selector]
+            if child is None:
+                merged[name] = value
+            else:
+                parent = merged.setdefault(name, dict(data[name]))
+                parent[child] = value
+        valid = self._valid_sections(merged)
+        regenerated = [selector for selector in selected if selector in values and paths[selector][0] in valid]
+        
+        if not regenerated:
+            result = GenerationResult(
+                schema=schema,
+                is_fallback=True,
+                fallback_reason="invalid_schema" if values else "upstream_error",
+                incomplete_sections=selected
+            )
+        else:
+            validated = ProjectSchema.model_validate(valid)
+            result = GenerationResult(
+                schema=schema.model_copy(update={name: getattr(validated, name) for name in valid}),
+                incomplete_sections=[selector for selector in selected if selector not in regenerated]
+            )
+            logger.info(f"Sections régénérées: {', '.join(regenerated)}")
+        self._record_generation(route, started_at, result)
+        return result
     
-    def _parse_file_structure(self, children_data: list) -> list:
-        """Parse récursivement la structure de fichiers"""
-        children = []
-        for child in children_data:
-            file_struct = FileStructure(
-                name=child.get("name", ""),
-                type=child.get("type", "file"),
-                children=self._parse_file_structure(child.get("children", [])) if child.get("children") else None,
-                content=child.get("content")
+    async def _generate_from_template(self, request: ProjectRequest, route: ModelRoute) -> GenerationResult:
+        """
+        Génère un schéma par différence avec la base précalculée de l'archétype
+        
+        La base personnalisée est résumée dans le prompt ; le modèle ne renvoie
+        que les sections à modifier, fusionnées dans la base. En cas d'échec,
+        la base personnalisée est renvoyée comme repli.
+        """
+        with metrics_service.stage("prompt_build"):
+            base = template_store.customize(request)
+            prompt = self._build_template_prompt(request, base)
+        try:
+            client = config_service.get_client()
+            with metrics_service.stage("upstream"):
+                response = await config_service.call_openai(
+                    client.chat.completions.create,
+                    model=route.model,
+                    messages=[
+                        {"role": "system", "content": self._get_system_prompt()},
+                        {"role": "user", "content": prompt}
+                    ],
+                    max_tokens=self._section_budget(self.template_diff_max_tokens, route),
+                    temperature=0.7
+                )
+            self._record_usage(route, response)
+            with metrics_service.stage("parse"):
+                changes = self._valid_sections(recover_sections(response.choices[0].message.content or "").complete)
+        except Exception as e:
+            logger.warning(f"Échec de la génération par différence, utilisation de la base précalculée: {str(e)}")
+            return GenerationResult(
+                schema=self._complete_schema(base, request),
+                is_fallback=True,
+                fallback_reason="upstream_error"
             )
-            children.append(file_struct)
-        return children
+        
+        if changes:
+            validated = ProjectSchema.model_validate(changes)
+            base = base.model_copy(update={name: getattr(validated, name) for name in changes})
+        logger.info(f"Schéma dérivé de la base précalculée: {len(changes)} sections modifiées")
+        return GenerationResult(schema=self._complete_schema(base, request))
+    
+    def _build_template_prompt(self, request: ProjectRequest, base: ProjectSchema) -> str:
+        """Construit le prompt demandant uniquement les modifications de la base précalculée"""
+        project_type, complexity = template_store.archetype(request)
+        return f"""
+        DESCRIPTION DU PROJET:
+        {request.description}
+        
+        SCHÉMA DE BASE ({project_type.value} / {complexity.value}):
+        {json_backend.dumps(template_store.outline(base))}
+        
+        Adapte ce schéma de base au projet décrit. Retourne uniquement un objet JSON contenant les sections
+        du schéma de projet à remplacer (valeurs complètes), en omettant celles qui conviennent déjà.
+        Retourne uniquement un JSON valide sans texte supplémentaire.
+        """
+    
+    async def _request_sections(
+        self,
+        request: ProjectRequest,
+        sections: Dict[str, Any],
+        missing: List[str],
+        route: ModelRoute,
+        max_tokens: Optional[int] = None,
+        current: Optional[Dict[str, Any]] = None,
+        instructions: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Demande uniquement certaines sections d'un schéma
+        
+        Args:
+            request: Requête de projet
+            sections: Sections déjà obtenues (contexte de cohérence)
+            missing: Noms des sections à générer
+            route: Niveau de modèle
+            max_tokens: Budget de sortie (followup_max_tokens proportionné au niveau par défaut)
+            current: Valeurs actuelles des sections à remplacer (régénération)
+            instructions: Consignes de l'utilisateur pour la régénération
+        
+        Returns:
+            Dict[str, Any]: Sections obtenues par nom demandé (vide en cas d'échec) ;
+            une sous-section ("recommended_stack.database") est acceptée sous sa
+            clé pointée ou imbriquée dans sa section
+        """
+        try:
+            client = config_service.get_client()
+            with metrics_service.stage("upstream"):
+                response = await config_service.call_openai(
+                    client.chat.completions.create,
+                    model=route.model,
+                    messages=[
+                        {"role": "system", "content": self._get_system_prompt()},
+                        {"role": "user", "content": self._build_followup_prompt(request, sections, missing, current, instructions)}
+                    ],
+                    max_tokens=max_tokens or self._section_budget(self.followup_max_tokens, route),
+                    temperature=0.7
+                )
+            self._record_usage(route, response)
+            with metrics_service.stage("parse"):
+                complete = recover_sections(response.choices[0].message.content or "").complete
+            sections = {}
+            for name in missing:
+                if name in complete:
+                    sections[name] = complete[name]
+                elif "." in name:
+                    # Sous-section renvoyée imbriquée : {"recommended_stack": {"database": {...}}}
+                    parent, child = name.split(".", 1)
+                    nested = complete.get(parent)
+                    if isinstance(nested, dict) and child in nested:
+                        sections[name] = nested[child]
+            return sections
+        except Exception as e:
+            logger.warning(f"Échec de la génération des sections {', '.join(missing)}: {str(e)}")
+            return {}
+    
+    def _build_followup_prompt(
+        self,
+        request: ProjectRequest,
+        sections: Dict[str, Any],
+        missing: List[str],
+        current: Optional[Dict[str, Any]] = None,
+        instructions: Optional[str] = None
+    ) -> str:
+        """Construit le prompt demandant uniquement certaines sections (ou leur nouvelle version)"""
+        context = {name: sections[name] for name in ("project_name", "complexity", "features") if name in sections}
+        stack = sections.get("recommended_stack")
+        if isinstance(stack, dict):
+            context["recommended_stack"] = {
+                slot: value.get("name") for slot, value in stack.items() if isinstance(value, dict) and value.get("name")
+            }
+        
+        prompt = f"""
+        DESCRIPTION DU PROJET:
+        {request.description}
+        
+        TYPE DE PROJET: {request.project_type or 'Non spécifié'}
+        """
+        
+        if context:
+            prompt += f"""
+        ÉLÉMENTS DÉJÀ DÉFINIS:
+        {json_backend.dumps(context)}
+        """
+        
+        if current is None:
+            prompt += f"""
+        Génère uniquement les sections suivantes du schéma de projet, cohérentes avec les éléments déjà définis : {", ".join(missing)}.
+        Retourne uniquement un objet JSON valide contenant exactement ces clés, sans texte supplémentaire.
+        """
+            return prompt
+        
+        prompt += f"""
+        VALEURS ACTUELLES À REMPLACER:
+        {json_backend.dumps(current)}
+        """
+        if instructions:
+            prompt += f"""
+        CONSIGNES: {instructions}
+        """
+        prompt += f"""
+        Génère une nouvelle version des sections suivantes du schéma de projet, cohérentes avec les éléments déjà définis : {", ".join(missing)}.
+        Retourne uniquement un objet JSON valide contenant exactement ces clés (au même format que les valeurs actuelles), sans texte supplémentaire.
+        """
+        return prompt
+    
+    @staticmethod
+    def _project_type(request: ProjectRequest) -> str:
+        """Type de projet de la requête ("custom" s'il n'est pas précisé)"""
+        return request.project_type.value if request.project_type else "custom"
     
     def _generate_fallback_schema(self, request: ProjectRequest) -> ProjectSchema:
         """Génère un schéma de base en cas d'échec de l'IA"""
@@ -312,7 +842,7 @@ class SchemaGeneratorService:
         return ProjectSchema(
             project_name="Mon Projet",
             description=request.description,
-            project_type=str(request.project_type) if request.project_type else "custom",
+            project_type=self._project_type(request),
             complexity="medium",
             estimated_duration="2-3 mois",
             recommended_stack=recommended_stack,
@@ -0,0 +1,132 @@
+import json
+import json_backend
+from typing import Any, List, Optional, Tuple
+
+class IncrementalSectionParser:
+    """
+    Parseur JSON incrémental des sections de premier niveau
+
+    Reçoit le texte produit par le modèle morceau par morceau et renvoie chaque
+    paire (clé, valeur) de l'objet racine dès que sa valeur est complète. Le
+    texte précédant la première accolade (bloc markdown, préambule) est ignoré.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.depth = 0
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        # État au niveau de l'objet racine :
+        # key, key_string, colon, value, value_string, value_scalar, value_nested, comma
+        self.expect = "key"
+        self.key: Optional[str] = None
+        self.key_start = 0
+        self.value_start = 0
+
+    def feed(self, text: str) -> List[Tuple[str, Any]]:
+        """
+        Ajoute un morceau de texte et renvoie les sections complétées
+
+        Args:
+            text: Nouveau morceau de la réponse du modèle
+
+        Returns:
+            List[Tuple[str, Any]]: Sections (clé, valeur) terminées dans ce morceau
+        """
+        self.buffer += text
+        sections: List[Tuple[str, Any]] = []
+        buffer = self.buffer
+
+        for i in range(self.position, len(buffer)):
+            if self.done:
+                break
+            char = buffer[i]
+
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                    self.depth = 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+                    if self.depth == 1 and self.expect == "key_string":
+                        self.key = json.loads(buffer[self.key_start:i + 1])
+                        self.expect = "colon"
+                    elif self.depth == 1 and self.expect == "value_string":
+                        self._finish_value(i + 1, sections)
+                continue
+
+            if char == '"':
+                self.in_string = True
+                if self.depth == 1:
+                    if self.expect == "key":
+                        self.key_start = i
+                        self.expect = "key_string"
+                    elif self.expect == "value":
+                        self.value_start = i
+                        self.expect = "value_string"
+            elif char in "{[":
+                if self.depth == 1 and self.expect == "value":
+                    self.value_start = i
+                    self.expect = "value_nested"
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 1 and self.expect == "value_nested":
+                    self._finish_value(i + 1, sections)
+                elif self.depth == 0:
+                    if self.expect == "value_scalar":
+                        self._finish_value(i, sections)
+                    self.done = True
+            elif self.depth == 1:
+                if char == ":" and self.expect == "colon":
+                    self.expect = "value"
+                elif char == ",":
+                    if self.expect == "value_scalar":
+                        self._finish_value(i, sections)
+                    self.expect = "key"
+                elif self.expect == "value" and not char.isspace():
+                    self.value_start = i
+                    self.expect = "value_scalar"
+
+        self.position = len(buffer)
+        return sections
+
+    def _finish_value(self, end: int, sections: List[Tuple[str, Any]]) -> None:
+        """Décode la valeur courante et l'ajoute aux sections terminées"""
+        raw = self.buffer[self.value_start:end].strip()
+        self.expect = "comma"
+        try:
+            value = json_backend.loads(raw)
+        except json_backend.JSONDecodeError:
+            return
+        if self.key is not None:
+            sections.append((self.key, value))
+
+    @property
+    def text(self) -> str:
+        """Texte complet reçu jusqu'ici"""
+        return self.buffer
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Formate un événement Server-Sent Events
+
+    Args:
+        event: Nom de l'événement
+        data: Données sérialisables en JSON
+
+    Returns:
+        str: Trame SSE
+    """
+    payload = json_backend.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
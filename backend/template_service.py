@@ -0,0 +1,378 @@
+import os
+import json
+import asyncio
+import hashlib
+import argparse
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+from models import (
+    ProjectRequest, ProjectSchema, ProjectType, ComplexityLevel, Architecture, Roadmap,
+    FileStructure, RecommendedStack, TechnologyRecommendation, STACK_SLOT_DEFAULTS
+)
+from catalog_data import STACKS, TEMPLATES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "template_bases.json")
+
+# Caractéristiques de chaque archétype pour la construction hors ligne des bases
+ARCHETYPES: Dict[ProjectType, Dict[str, Any]] = {
+    ProjectType.ECOMMERCE: {
+        "name": "Boutique en ligne",
+        "stack": ("React", "FastAPI", "PostgreSQL", "Vercel"),
+        "directories": ["frontend", "backend", "backend/payments", "backend/catalog"],
+        "challenges": ["Sécurité des paiements", "Gestion des stocks", "Pics de trafic"],
+        "metrics": ["Taux de conversion", "Panier moyen", "Taux d'abandon de panier"],
+    },
+    ProjectType.BLOG: {
+        "name": "Blog",
+        "stack": ("Vue.js", "Django", "PostgreSQL", "Vercel"),
+        "directories": ["frontend", "backend", "backend/articles", "content"],
+        "features": ["Articles", "Catégories et tags", "Commentaires", "SEO", "Interface d'administration"],
+        "challenges": ["Référencement", "Modération des commentaires", "Performance des pages"],
+        "metrics": ["Visiteurs mensuels", "Temps de lecture", "Taux de rebond"],
+    },
+    ProjectType.SAAS: {
+        "name": "Plateforme SaaS",
+        "stack": ("React", "FastAPI", "PostgreSQL", "Vercel"),
+        "directories": ["frontend", "backend", "backend/billing", "backend/tenants"],
+        "challenges": ["Isolation des données clients", "Facturation", "Scalabilité"],
+        "metrics": ["MRR", "Taux de churn", "Utilisateurs actifs"],
+    },
+    ProjectType.PORTFOLIO: {
+        "name": "Portfolio",
+        "stack": ("Vanilla JS", "FastAPI", "SQLite", "Vercel"),
+        "directories": ["site", "site/assets", "site/projects"],
+        "challenges": ["Mise en valeur des projets", "Temps de chargement"],
+        "metrics": ["Visites", "Prises de contact"],
+    },
+    ProjectType.MOBILE_APP: {
+        "name": "Application mobile",
+        "stack": ("React Native", "Node.js", "PostgreSQL", "App Store / Play Store"),
+        "directories": ["mobile", "mobile/screens", "backend", "backend/api"],
+        "features": ["Authentification", "Écrans principaux", "Notifications push", "Mode hors ligne"],
+        "challenges": ["Compatibilité des appareils", "Publication sur les stores", "Synchronisation hors ligne"],
+        "metrics": ["Installations", "Rétention à 30 jours", "Note sur les stores"],
+    },
+    ProjectType.DESKTOP_APP: {
+        "name": "Application de bureau",
+        "stack": ("Electron", "Node.js", "SQLite", "GitHub Releases"),
+        "directories": ["app", "app/main", "app/renderer", "build"],
+        "features": ["Interface principale", "Stockage local", "Mises à jour automatiques", "Préférences"],
+        "challenges": ["Distribution multiplateforme", "Signature du code", "Mises à jour"],
+        "metrics": ["Téléchargements", "Crashs par session", "Utilisateurs actifs"],
+    },
+    ProjectType.API: {
+        "name": "API",
+        "stack": ("Swagger UI", "FastAPI", "PostgreSQL", "Docker"),
+        "directories": ["app", "app/routers", "app/models", "tests"],
+        "features": ["Endpoints REST", "Authentification par jeton", "Documentation OpenAPI", "Limitation de débit"],
+        "challenges": ["Versionnement", "Rétrocompatibilité", "Limitation de débit"],
+        "metrics": ["Latence p95", "Taux d'erreur", "Requêtes par minute"],
+    },
+    ProjectType.CUSTOM: {
+        "name": "Application web",
+        "stack": ("React", "FastAPI", "PostgreSQL", "Vercel"),
+        "directories": ["frontend", "backend"],
+        "features": ["Interface utilisateur", "API REST", "Base de données", "Authentification"],
+        "challenges": ["Périmètre fonctionnel", "Performance", "Sécurité"],
+        "metrics": ["Adoption", "Performance", "Taux d'erreur"],
+    },
+}
+
+# Ajustements selon la complexité
+COMPLEXITY_PROFILES: Dict[ComplexityLevel, Dict[str, Any]] = {
+    ComplexityLevel.LOW: {
+        "duration": "2-4 semaines",
+        "overview": "Application monolithique simple",
+        "phases": [("Mise en place", "1 semaine"), ("Développement et mise en ligne", "1-3 semaines")],
+        "team": ["1 développeur full-stack"],
+        "extra_components": [],
+    },
+    ComplexityLevel.MEDIUM: {
+        "duration": "2-3 mois",
+        "overview": "Architecture en couches avec séparation frontend/backend",
+        "phases": [("Setup et architecture", "1-2 semaines"), ("Développement core", "4-6 semaines"),
+                   ("Tests et déploiement", "1-2 semaines")],
+        "team": ["1-2 développeurs full-stack", "1 designer (optionnel)"],
+        "extra_components": [{"name": "Cache", "description": "Mise en cache des lectures fréquentes"}],
+    },
+    ComplexityLevel.HIGH: {
+        "duration": "4-6 mois",
+        "overview": "Architecture modulaire orientée services avec traitements asynchrones",
+        "phases": [("Cadrage et architecture", "2-3 semaines"), ("Fondations et authentification", "3-4 semaines"),
+                   ("Fonctionnalités principales", "6-8 semaines"), ("Durcissement et mise en production", "3-4 semaines")],
+        "team": ["2-3 développeurs backend", "1-2 développeurs frontend", "1 DevOps", "1 designer"],
+        "extra_components": [
+            {"name": "Cache", "description": "Mise en cache des lectures fréquentes"},
+            {"name": "File de messages", "description": "Traitements asynchrones et tâches planifiées"},
+            {"name": "Observabilité", "description": "Logs structurés, métriques et alertes"},
+        ],
+    },
+}
+
+def _technology(slot: str, name: str) -> TechnologyRecommendation:
+    """Recommandation d'une technologie, complétée depuis le catalogue des stacks si elle y figure"""
+    data: Dict[str, Any] = dict(STACK_SLOT_DEFAULTS.get(slot, {}))
+    data["name"] = name
+    for item in STACKS.get(slot, []):
+        if item["name"].lower() == name.lower():
+            data.update(item)
+            break
+    return TechnologyRecommendation(**data)
+
+def _shallow_tree(node: FileStructure, depth: int) -> Dict[str, Any]:
+    """Nœud de l'arborescence limité à depth niveaux de descendants"""
+    tree: Dict[str, Any] = {"name": node.name, "type": node.type}
+    if node.children and depth > 0:
+        tree["children"] = [_shallow_tree(child, depth - 1) for child in node.children]
+    return tree
+
+def build_offline_base(project_type: ProjectType, complexity: ComplexityLevel) -> ProjectSchema:
+    """
+    Construit une base déterministe sans appel au modèle
+
+    Args:
+        project_type: Archétype
+        complexity: Niveau de complexité
+
+    Returns:
+        ProjectSchema: Schéma de base
+    """
+    archetype = ARCHETYPES[project_type]
+    profile = COMPLEXITY_PROFILES[complexity]
+    catalog = next((item for item in TEMPLATES if item["id"] == project_type.value), {})
+    features = list(archetype.get("features") or catalog.get("features", []))
+    frontend, backend, database, deployment = archetype["stack"]
+
+    components = [
+        {"name": "Frontend", "description": f"Interface utilisateur {frontend}"},
+        {"name": "Backend", "description": f"API {backend}"},
+        {"name": "Base de données", "description": f"Persistance {database}"},
+    ] + profile["extra_components"]
+
+    children = [FileStructure(name=directory, type="directory", children=[]) for directory in archetype["directories"]]
+    children += [FileStructure(name="README.md", type="file"), FileStructure(name=".gitignore", type="file")]
+
+    return ProjectSchema(
+        project_name=archetype["name"],
+        description=catalog.get("description", archetype["name"]),
+        project_type=project_type.value,
+        complexity=complexity.value,
+        estimated_duration=profile["duration"],
+        recommended_stack=RecommendedStack(
+            frontend=_technology("frontend", frontend),
+            backend=_technology("backend", backend),
+            database=_technology("database", database),
+            deployment=_technology("deployment", deployment),
+            justification=f"Stack éprouvée pour un projet de type {archetype['name'].lower()} de complexité {complexity.value}"
+        ),
+        architecture=Architecture(
+            overview=profile["overview"],
+            components=components,
+            data_flow=["Client → Frontend → API → Base de données"],
+            security=["HTTPS", "Authentification JWT", "Validation des entrées"],
+            performance=["CDN pour les ressources statiques", "Index sur les requêtes fréquentes"]
+        ),
+        file_structure=FileStructure(name="project-root", type="directory", children=children),
+        roadmap=Roadmap(
+            phases=[{"name": name, "duration": duration} for name, duration in profile["phases"]],
+            milestones=[{"name": "MVP"}, {"name": "Production"}],
+            estimated_duration=profile["duration"],
+            team_recommendations=list(profile["team"])
+        ),
+        features=features,
+        technical_requirements=[f"{backend}", f"{database}", f"Déploiement {deployment}"],
+        deployment_strategy={"platform": deployment, "strategy": "Déploiement continu"},
+        testing_strategy={"unit": "Tests unitaires", "integration": "Tests d'intégration de l'API"},
+        monitoring_strategy={"logging": "Logs structurés", "alerts": "Alertes sur le taux d'erreur"},
+        documentation=["README", "Documentation de l'API"],
+        potential_challenges=list(archetype["challenges"]),
+        success_metrics=list(archetype["metrics"])
+    )
+
+def archetype_request(project_type: ProjectType, complexity: ComplexityLevel) -> ProjectRequest:
+    """Requête générique décrivant un archétype (utilisée pour générer sa base avec le modèle)"""
+    archetype = ARCHETYPES[project_type]
+    catalog = next((item for item in TEMPLATES if item["id"] == project_type.value), {})
+    description = f"{archetype['name']} générique : {catalog.get('description', archetype['name'])}"
+    return ProjectRequest(
+        description=description,
+        project_type=project_type,
+        preferences={"complexity": complexity}
+    )
+
+Generator = Callable[[ProjectRequest], Awaitable[Any]]
+
+async def build_bases(generate: Optional[Generator] = None) -> Dict[str, ProjectSchema]:
+    """
+    Construit les bases de tous les archétypes (type × complexité)
+
+    Args:
+        generate: Génération par le modèle (renvoie schema et is_fallback) ;
+            sans elle, ou en cas de repli, la base hors ligne est utilisée
+
+    Returns:
+        Dict[str, ProjectSchema]: Bases indexées par "type:complexité"
+    """
+    bases: Dict[str, ProjectSchema] = {}
+    for project_type in ProjectType:
+        for complexity in ComplexityLevel:
+            key = f"{project_type.value}:{complexity.value}"
+            schema = None
+            if generate is not None:
+                result = await generate(archetype_request(project_type, complexity))
+                if not result.is_fallback:
+                    schema = result.schema
+                else:
+                    logger.warning(f"Génération de la base {key} en échec, base hors ligne utilisée")
+            bases[key] = schema or build_offline_base(project_type, complexity)
+    return bases
+
+def save_bases(bases: Dict[str, ProjectSchema], path: str) -> str:
+    """
+    Enregistre les bases au format JSON
+
+    Returns:
+        str: Version (empreinte du contenu)
+    """
+    payload = {key: schema.model_dump(mode="json") for key, schema in sorted(bases.items())}
+    body = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    version = hashlib.sha256(body.encode("utf-8")).hexdigest()[:12]
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({"version": version, "bases": payload}, handle, ensure_ascii=False, indent=1)
+    return version
+
+class TemplateStore:
+    """
+    Schémas de base précalculés par archétype (type de projet × complexité)
+
+    Les bases sont produites au déploiement (python -m template_service) puis
+    chargées au démarrage ; à défaut de fichier, les bases hors ligne sont
+    construites en mémoire. À la requête, une base est soit personnalisée hors
+    ligne (mode "instant"), soit résumée au modèle qui ne renvoie que les
+    sections à modifier (mode "diff").
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        if path is None:
+            path = os.getenv("TEMPLATE_BASES_PATH", DEFAULT_BASES_PATH)
+        self.path = path
+        self.bases: Dict[str, ProjectSchema] = {}
+        self.version = "offline"
+        self._load()
+
+    def _load(self) -> None:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, encoding="utf-8") as handle:
+                    data = json.load(handle)
+                self.bases = {key: ProjectSchema.model_validate(value) for key, value in data["bases"].items()}
+                self.version = data.get("version", "file")
+                return
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Bases de templates illisibles ({self.path}), bases hors ligne utilisées: {str(e)}")
+        self.bases = {
+            f"{project_type.value}:{complexity.value}": build_offline_base(project_type, complexity)
+            for project_type in ProjectType
+            for complexity in ComplexityLevel
+        }
+        self.version = "offline"
+
+    @staticmethod
+    def archetype(request: ProjectRequest) -> Tuple[ProjectType, ComplexityLevel]:
+        """Archétype d'une requête (personnalisé et complexité moyenne par défaut)"""
+        complexity = request.preferences.complexity if request.preferences else None
+        return request.project_type or ProjectType.CUSTOM, complexity or ComplexityLevel.MEDIUM
+
+    def get(self, request: ProjectRequest) -> ProjectSchema:
+        """Copie modifiable de la base correspondant à la requête"""
+        project_type, complexity = self.archetype(request)
+        base = self.bases.get(f"{project_type.value}:{complexity.value}")
+        if base is None:
+            base = build_offline_base(project_type, complexity)
+        return base.model_copy(deep=True)
+
+    def customize(self, request: ProjectRequest) -> ProjectSchema:
+        """
+        Personnalise hors ligne la base d'une requête (description, préférences, exigences)
+
+        Args:
+            request: Requête de projet
+
+        Returns:
+            ProjectSchema: Schéma personnalisé
+        """
+        schema = self.get(request)
+        schema.description = request.description
+
+        preferences = request.preferences
+        if preferences:
+            if preferences.stack:
+                for slot in ("frontend", "backend", "database", "deployment"):
+                    name = getattr(preferences.stack, slot)
+                    if name:
+                        setattr(schema.recommended_stack, slot, _technology(slot, name))
+                for name in preferences.stack.additional or []:
+                    schema.recommended_stack.additional_tools.append(TechnologyRecommendation(name=name))
+            if preferences.timeline:
+                schema.estimated_duration = preferences.timeline
+                schema.roadmap.estimated_duration = preferences.timeline
+            if preferences.team_size:
+                schema.roadmap.team_recommendations = [f"Équipe de {preferences.team_size} personne(s)"]
+
+        for requirement in request.additional_requirements or []:
+            if requirement not in schema.features:
+                schema.features.append(requirement)
+        return schema
+
+    def outline(self, schema: ProjectSchema) -> Dict[str, Any]:
+        """
+        Base au format JSON du schéma pour le prompt "diff"
+
+        Chaque section y a la forme attendue en retour (objets complets de la
+        stack, phases et jalons de la roadmap...) ; seule l'arborescence est
+        abrégée à deux niveaux, sans contenu de fichiers.
+
+        Args:
+            schema: Base personnalisée
+
+        Returns:
+            Dict[str, Any]: Sections de la base
+        """
+        outline = schema.model_dump(mode="json", exclude={"description", "file_structure"})
+        outline["file_structure"] = _shallow_tree(schema.file_structure, 2)
+        return outline
+
+# Instance globale des bases précalculées
+template_store = TemplateStore()
+
+async def _build_with_model() -> Dict[str, ProjectSchema]:
+    """Génère les bases avec le modèle configuré par OPENAI_API_KEY"""
+    from config_service import config_service, OpenAIConfigRequest
+    from services import SchemaGeneratorService
+
+    validation = await config_service.validate_openai_config(OpenAIConfigRequest(api_key=os.getenv("OPENAI_API_KEY", "")))
+    if not validation.is_valid:
+        raise SystemExit(f"Configuration OpenAI invalide : {validation.message}")
+    service = SchemaGeneratorService(mode="single", template_mode="off")
+    try:
+        return await build_bases(service.generate)
+    finally:
+        await config_service.aclose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Précalcule les schémas de base par archétype")
+    parser.add_argument("--output", default=DEFAULT_BASES_PATH, help="Fichier JSON produit")
+    parser.add_argument("--with-model", action="store_true", help="Générer les bases avec OpenAI (OPENAI_API_KEY)")
+    args = parser.parse_args()
+
+    if args.with_model:
+        bases = asyncio.run(_build_with_model())
+    else:
+        bases = asyncio.run(build_bases())
+    version = save_bases(bases, args.output)
+    print(f"{len(bases)} bases enregistrées dans {args.output} (version {version})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,316 @@
+import os
+import time
+import base64
+import hashlib
+import sqlite3
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+import logging
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:  # Dépendance optionnelle (fournie par python-jose[cryptography])
+    Fernet = None
+    InvalidToken = Exception
+
+logger = logging.getLogger(__name__)
+
+# Tenant (jeton de session) de la requête en cours
+current_tenant: ContextVar[Optional[str]] = ContextVar("current_tenant", default=None)
+
+TENANT_HEADER = "X-Session-Token"
+
+def tenant_hash(tenant_id: Optional[str]) -> str:
+    """Empreinte stockable d'un tenant ("" sans jeton de session)"""
+    if not tenant_id:
+        return ""
+    return hashlib.sha256(tenant_id.encode("utf-8")).hexdigest()
+
+@dataclass
+class TenantConfig:
+    """Configuration OpenAI validée d'un tenant"""
+    api_key: str
+    organization_id: Optional[str] = None
+    model: Optional[str] = "gpt-4"
+    validated_at: float = field(default_factory=time.time)
+
+@dataclass
+class _TenantEntry:
+    """Client d'un tenant conservé en mémoire"""
+    config: TenantConfig
+    client: Any
+    last_used: float
+
+class TenantConfigBackend(ABC):
+    """Interface des stockages de configurations validées"""
+
+    @abstractmethod
+    async def load(self, tenant_id: str) -> Optional[TenantConfig]:
+        ...
+
+    @abstractmethod
+    async def save(self, tenant_id: str, config: TenantConfig) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, tenant_id: str) -> None:
+        ...
+
+class InMemoryTenantBackend(TenantConfigBackend):
+    """
+    Stockage en mémoire (un seul processus)
+
+    Borné comme le registre (nombre de tenants, expiration après inactivité) :
+    une configuration évincée du registre n'y reste pas conservée, avec sa
+    clé API, au-delà de ces limites.
+    """
+
+    def __init__(self, max_entries: Optional[int] = None, idle_ttl: Optional[float] = None):
+        if max_entries is None:
+            max_entries = int(os.getenv("TENANT_MAX_CLIENTS", "1000"))
+        if idle_ttl is None:
+            idle_ttl = float(os.getenv("TENANT_IDLE_TTL", "3600"))
+        self.max_entries = max(1, max_entries)
+        self.idle_ttl = idle_ttl
+        # Jeton -> (configuration, date de dernière utilisation)
+        self._configs: "OrderedDict[str, Tuple[TenantConfig, float]]" = OrderedDict()
+
+    async def load(self, tenant_id: str) -> Optional[TenantConfig]:
+        item = self._configs.get(tenant_id)
+        if item is None:
+            return None
+        config, last_used = item
+        now = time.monotonic()
+        if now - last_used > self.idle_ttl:
+            del self._configs[tenant_id]
+            return None
+        self._configs[tenant_id] = (config, now)
+        self._configs.move_to_end(tenant_id)
+        return config
+
+    async def save(self, tenant_id: str, config: TenantConfig) -> None:
+        now = time.monotonic()
+        self._configs[tenant_id] = (config, now)
+        self._configs.move_to_end(tenant_id)
+        while self._configs:
+            oldest, (_, last_used) = next(iter(self._configs.items()))
+            if len(self._configs) <= self.max_entries and now - last_used <= self.idle_ttl:
+                break
+            del self._configs[oldest]
+
+    async def delete(self, tenant_id: str) -> None:
+        self._configs.pop(tenant_id, None)
+
+class SQLiteTenantBackend(TenantConfigBackend):
+    """
+    Stockage SQLite partagé entre les workers d'un même hôte
+
+    Les clés API sont chiffrées (Fernet) avec une clé dérivée du secret fourni.
+    """
+
+    def __init__(self, path: str, secret: str, ttl: float = 86400):
+        if Fernet is None:
+            raise RuntimeError("Le paquet 'cryptography' est requis pour le stockage SQLite des configurations")
+        self.path = path
+        self.ttl = ttl
+        key = base64.urlsafe_b64encode(hashlib.sha256(secret.encode("utf-8")).digest())
+        self._fernet = Fernet(key)
+        self._lock = threading.Lock()
+        self._init_db()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=5)
+
+    def _init_db(self) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tenant_configs ("
+                "tenant_hash TEXT PRIMARY KEY, api_key TEXT NOT NULL, organization_id TEXT, "
+                "model TEXT, validated_at REAL NOT NULL)"
+            )
+
+    @staticmethod
+    def _hash(tenant_id: str) -> str:
+        return tenant_hash(tenant_id)
+
+    def _load(self, tenant_id: str) -> Optional[TenantConfig]:
+        with self._lock, self._connect() as conn:
+            row = conn.execute(
+                "SELECT api_key, organization_id, model, validated_at FROM tenant_configs "
+                "WHERE tenant_hash = ? AND validated_at > ?",
+                (self._hash(tenant_id), time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        try:
+            api_key = self._fernet.decrypt(row[0].encode("utf-8")).decode("utf-8")
+        except InvalidToken:
+            logger.warning("Configuration de tenant illisible (secret modifié ?)")
+            return None
+        return TenantConfig(api_key=api_key, organization_id=row[1], model=row[2], validated_at=row[3])
+
+    def _save(self, tenant_id: str, config: TenantConfig) -> None:
+        encrypted = self._fernet.encrypt(config.api_key.encode("utf-8")).decode("utf-8")
+        with self._lock, self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tenant_configs "
+                "(tenant_hash, api_key, organization_id, model, validated_at) VALUES (?, ?, ?, ?, ?)",
+                (self._hash(tenant_id), encrypted, config.organization_id, config.model, config.validated_at)
+            )
+
+    def _delete(self, tenant_id: str) -> None:
+        with self._lock, self._connect() as conn:
+            conn.execute("DELETE FROM tenant_configs WHERE tenant_hash = ?", (self._hash(tenant_id),))
+
+    async def load(self, tenant_id: str) -> Optional[TenantConfig]:
+        return await asyncio.to_thread(self._load, tenant_id)
+
+    async def save(self, tenant_id: str, config: TenantConfig) -> None:
+        await asyncio.to_thread(self._save, tenant_id, config)
+
+    async def delete(self, tenant_id: str) -> None:
+        await asyncio.to_thread(self._delete, tenant_id)
+
+def create_tenant_backend() -> TenantConfigBackend:
+    """
+    Crée le stockage des configurations selon l'environnement
+
+    TENANT_BACKEND=memory (défaut) ou sqlite (TENANT_BACKEND_PATH, TENANT_CONFIG_SECRET).
+    """
+    backend = os.getenv("TENANT_BACKEND", "memory").lower()
+    if backend == "sqlite":
+        secret = os.getenv("TENANT_CONFIG_SECRET")
+        if not secret:
+            logger.error("TENANT_CONFIG_SECRET manquant : stockage des configurations en mémoire")
+            return InMemoryTenantBackend()
+        return SQLiteTenantBackend(
+            os.getenv("TENANT_BACKEND_PATH", "tenants.db"),
+            secret,
+            ttl=float(os.getenv("TENANT_CONFIG_TTL", "86400"))
+        )
+    return InMemoryTenantBackend()
+
+class TenantRegistry:
+    """
+    Registre des clients OpenAI par tenant
+
+    La lecture (get_client) se fait sans verrou : simple accès au dictionnaire et
+    mise à jour de la date d'utilisation. Les écritures appliquent l'expiration
+    après inactivité et l'éviction LRU. Les configurations validées sont
+    partagées via le stockage : un autre worker les recharge sans nouvelle
+    validation payante.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[TenantConfig], Any],
+        backend: Optional[TenantConfigBackend] = None,
+        max_tenants: Optional[int] = None,
+        idle_ttl: Optional[float] = None,
+        negative_ttl: float = 30
+    ):
+        if max_tenants is None:
+            max_tenants = int(os.getenv("TENANT_MAX_CLIENTS", "1000"))
+        if idle_ttl is None:
+            idle_ttl = float(os.getenv("TENANT_IDLE_TTL", "3600"))
+        self.client_factory = client_factory
+        self.backend = backend if backend is not None else create_tenant_backend()
+        self.max_tenants = max(1, max_tenants)
+        self.idle_ttl = idle_ttl
+        self.negative_ttl = negative_ttl
+        self._entries: Dict[str, _TenantEntry] = {}
+        self._misses: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_client(self, tenant_id: str) -> Optional[Any]:
+        """
+        Retourne le client du tenant s'il est en mémoire (chemin critique, sans verrou)
+
+        Args:
+            tenant_id: Jeton de session
+
+        Returns:
+            Optional[Any]: Client OpenAI ou None
+        """
+        entry = self._entries.get(tenant_id)
+        if entry is None:
+            return None
+        now = time.monotonic()
+        if now - entry.last_used > self.idle_ttl:
+            self._entries.pop(tenant_id, None)
+            return None
+        entry.last_used = now
+        return entry.client
+
+    def get_config(self, tenant_id: str) -> Optional[TenantConfig]:
+        """Retourne la configuration du tenant s'il est en mémoire"""
+        entry = self._entries.get(tenant_id)
+        return entry.config if entry is not None else None
+
+    async def register(self, tenant_id: str, config: TenantConfig, client: Any) -> None:
+        """
+        Enregistre le client validé d'un tenant et partage sa configuration
+
+        Args:
+            tenant_id: Jeton de session
+            config: Configuration validée
+            client: Client OpenAI correspondant
+        """
+        self._put(tenant_id, config, client)
+        self._misses.pop(tenant_id, None)
+        await self.backend.save(tenant_id, config)
+
+    async def load(self, tenant_id: str) -> Optional[Any]:
+        """
+        Retourne le client du tenant, en rechargeant sa configuration depuis le stockage si besoin
+
+        Args:
+            tenant_id: Jeton de session
+
+        Returns:
+            Optional[Any]: Client OpenAI ou None si le tenant n'a rien configuré
+        """
+        client = self.get_client(tenant_id)
+        if client is not None:
+            return client
+
+        missed_at = self._misses.get(tenant_id)
+        if missed_at is not None and time.monotonic() - missed_at < self.negative_ttl:
+            return None
+
+        config = await self.backend.load(tenant_id)
+        if config is None:
+            self._misses[tenant_id] = time.monotonic()
+            if len(self._misses) > self.max_tenants:
+                self._misses.clear()
+            return None
+
+        client = self.client_factory(config)
+        self._put(tenant_id, config, client)
+        return client
+
+    async def forget(self, tenant_id: str) -> None:
+        """Supprime la configuration d'un tenant"""
+        self._entries.pop(tenant_id, None)
+        await self.backend.delete(tenant_id)
+
+    def _put(self, tenant_id: str, config: TenantConfig, client: Any) -> None:
+        # Nouveau dictionnaire : les lecteurs concurrents voient l'ancien ou le nouveau
+        entries = dict(self._entries)
+        entries[tenant_id] = _TenantEntry(config=config, client=client, last_used=time.monotonic())
+        self._entries = self._evict(entries)
+
+    def _evict(self, entries: Dict[str, _TenantEntry]) -> Dict[str, _TenantEntry]:
+        now = time.monotonic()
+        entries = {key: entry for key, entry in entries.items() if now - entry.last_used <= self.idle_ttl}
+        if len(entries) > self.max_tenants:
+            ordered = sorted(entries.items(), key=lambda item: item[1].last_used)
+            entries = dict(ordered[len(entries) - self.max_tenants:])
+        return entries
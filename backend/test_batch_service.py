@@ -0,0 +1,60 @@
+import pytest
+import asyncio
+from batch_service import BatchService
+from models import ProjectRequest
+from services import GenerationResult, SchemaGeneratorService
+
+class TestBatchService:
+    """Tests pour la génération par lot"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.items = [ProjectRequest(description=f"Projet numéro {i} à générer") for i in range(6)]
+        self.schema = SchemaGeneratorService()._generate_fallback_schema(self.items[0])
+        self.running = 0
+        self.max_running = 0
+    
+    async def generate(self, request):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        if "3" in request.description:
+            raise RuntimeError("upstream")
+        return GenerationResult(schema=self.schema)
+    
+    @pytest.mark.asyncio
+    async def test_results_are_streamed_with_isolated_errors(self):
+        """Test que chaque élément produit un résultat et que les erreurs sont isolées"""
+        service = BatchService(concurrency=2)
+        
+        results = [item async for item in service.run(self.items, self.generate)]
+        
+        assert sorted(item["index"] for item in results) == list(range(6))
+        failed = [item for item in results if not item["success"]]
+        assert len(failed) == 1
+        assert failed[0]["index"] == 3
+        assert failed[0]["error"] == "upstream"
+        assert self.max_running == 2
+    
+    @pytest.mark.asyncio
+    async def test_per_batch_concurrency_override(self):
+        """Test de la limite de parallélisme propre au lot"""
+        service = BatchService(concurrency=4)
+        
+        [item async for item in service.run(self.items, self.generate, max_concurrency=1)]
+        
+        assert self.max_running == 1
+    
+    @pytest.mark.asyncio
+    async def test_cache_hits_skip_generation(self):
+        """Test que les éléments en cache ne déclenchent pas de génération"""
+        service = BatchService(concurrency=2)
+        
+        async def lookup(request):
+            return self.schema
+        
+        results = [item async for item in service.run(self.items, self.generate, lookup=lookup)]
+        
+        assert all(item["cache"] == "HIT" for item in results)
+        assert self.max_running == 0
@@ -0,0 +1,105 @@
+import pytest
+import time
+from cache_service import LRUCache, SchemaCacheService, compute_request_hash
+from models import ProjectRequest
+from services import SchemaGeneratorService
+
+class TestCacheService:
+    """Tests pour le cache des schémas générés"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.request = ProjectRequest(
+            description="Boutique en ligne de bijoux artisanaux",
+            project_type="ecommerce",
+            additional_requirements=["SEO optimisé", "Multilingue"]
+        )
+        self.schema = SchemaGeneratorService()._generate_fallback_schema(self.request)
+
+    def test_request_hash_is_canonical(self):
+        """Test que les requêtes quasi identiques ont la même empreinte"""
+        variant = ProjectRequest(
+            description="  boutique en ligne   de BIJOUX artisanaux ",
+            project_type="ecommerce",
+            additional_requirements=["Multilingue", "SEO optimisé"]
+        )
+
+        assert compute_request_hash(self.request, "gpt-4", "1") == compute_request_hash(variant, "gpt-4", "1")
+
+    def test_request_hash_depends_on_model_and_prompt_version(self):
+        """Test que le modèle et la version du prompt font partie de la clé"""
+        base = compute_request_hash(self.request, "gpt-4", "1")
+
+        assert base != compute_request_hash(self.request, "gpt-3.5-turbo", "1")
+        assert base != compute_request_hash(self.request, "gpt-4", "2")
+
+    def test_request_hash_depends_on_tenant(self):
+        """Test que le tenant fait partie de la clé (inchangée hors session)"""
+        base = compute_request_hash(self.request, "gpt-4", "1")
+
+        assert compute_request_hash(self.request, "gpt-4", "1", "") == base
+        assert compute_request_hash(self.request, "gpt-4", "1", "tenant-a") != base
+        assert compute_request_hash(self.request, "gpt-4", "1", "tenant-a") != compute_request_hash(self.request, "gpt-4", "1", "tenant-b")
+
+    def test_lru_evicts_least_recently_used(self):
+        """Test de l'éviction LRU par nombre d'entrées"""
+        cache = LRUCache(max_entries=2)
+        cache.set("a", 1, 1)
+        cache.set("b", 2, 1)
+        cache.get("a")
+        cache.set("c", 3, 1)
+
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_lru_evicts_by_size(self):
+        """Test de l'éviction par taille totale"""
+        cache = LRUCache(max_entries=10, max_bytes=100)
+        cache.set("a", 1, 60)
+        cache.set("b", 2, 60)
+
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+        assert cache.total_bytes == 60
+
+    def test_lru_expires_entries(self):
+        """Test de l'expiration par TTL"""
+        cache = LRUCache(ttl=0.01)
+        cache.set("a", 1, 1)
+        time.sleep(0.02)
+
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_memory_hit_and_miss(self):
+        """Test des succès et échecs du cache mémoire"""
+        service = SchemaCacheService(enabled=True, db_path="")
+
+        assert await service.get("key") is None
+        await service.set("key", self.schema)
+
+        assert await service.get("key") == self.schema
+        assert service.stats == {"hits": 1, "disk_hits": 0, "misses": 1}
+
+    @pytest.mark.asyncio
+    async def test_disk_tier_survives_restart(self, tmp_path):
+        """Test de la persistance du cache disque entre deux instances"""
+        db_path = str(tmp_path / "cache.db")
+        first = SchemaCacheService(enabled=True, db_path=db_path)
+        await first.set("key", self.schema)
+
+        second = SchemaCacheService(enabled=True, db_path=db_path)
+        cached = await second.get("key")
+
+        assert cached == self.schema
+        assert second.stats["disk_hits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_disabled_cache(self):
+        """Test que le cache désactivé ne stocke rien"""
+        service = SchemaCacheService(enabled=False)
+        await service.set("key", self.schema)
+
+        assert await service.get("key") is None
@@ -0,0 +1,69 @@
+import gzip
+import json
+from starlette.requests import Request
+from catalog_service import PrecomputedJSON, stacks_response, templates_response
+from catalog_data import STACKS, TEMPLATES
+
+def make_request(headers=None):
+    raw_headers = [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw_headers})
+
+class TestPrecomputedJSON:
+    """Tests pour les réponses de catalogue précalculées"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.response = PrecomputedJSON({"success": True, "data": ["é"]}, "test", max_age=60)
+    
+    def test_identity_body_and_headers(self):
+        """Test du corps non compressé et des en-têtes de cache"""
+        response = self.response.respond(make_request())
+        
+        assert json.loads(response.body) == {"success": True, "data": ["é"]}
+        assert response.headers["cache-control"] == "public, max-age=60"
+        assert response.headers["etag"].startswith('"')
+        assert "content-encoding" not in response.headers
+    
+    def test_gzip_variant(self):
+        """Test de la variante gzip précompressée"""
+        response = self.response.respond(make_request({"Accept-Encoding": "gzip, deflate"}))
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert json.loads(gzip.decompress(response.body)) == {"success": True, "data": ["é"]}
+        assert response.headers["vary"] == "Accept-Encoding"
+    
+    def test_refused_encoding_falls_back_to_identity(self):
+        """Test qu'un encodage refusé (q=0) n'est pas utilisé"""
+        response = self.response.respond(make_request({"Accept-Encoding": "gzip;q=0"}))
+        
+        assert "content-encoding" not in response.headers
+    
+    def test_conditional_get_returns_304(self):
+        """Test de la requête conditionnelle avec un ETag connu"""
+        etag = self.response.respond(make_request()).headers["etag"]
+        
+        response = self.response.respond(make_request({"If-None-Match": etag}))
+        
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == etag
+    
+    def test_unknown_etag_returns_body(self):
+        """Test qu'un ETag périmé renvoie le contenu complet"""
+        response = self.response.respond(make_request({"If-None-Match": '"perime"'}))
+        
+        assert response.status_code == 200
+    
+    def test_version_changes_etag(self):
+        """Test que la version du catalogue fait partie de l'ETag"""
+        other = PrecomputedJSON({"success": True, "data": ["é"]}, "test-2", max_age=60)
+        
+        assert other.etags.isdisjoint(self.response.etags)
+    
+    def test_catalog_payloads(self):
+        """Test du contenu des catalogues servis"""
+        stacks = json.loads(stacks_response.respond(make_request()).body)
+        templates = json.loads(templates_response.respond(make_request()).body)
+        
+        assert stacks == {"success": True, "data": STACKS}
+        assert templates == {"success": True, "data": TEMPLATES}
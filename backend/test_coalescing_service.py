@@ -0,0 +1,105 @@
+import pytest
+import asyncio
+from coalescing_service import RequestCoalescer, COALESCING_EVENTS
+from metrics_service import metrics_service
+
+class TestRequestCoalescer:
+    """Tests pour le regroupement des requêtes identiques"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.coalescer = RequestCoalescer()
+        self.calls = 0
+    
+    async def slow_call(self, value="schema", delay=0.05):
+        self.calls += 1
+        await asyncio.sleep(delay)
+        return value
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_call(self):
+        """Test que les requêtes concurrentes identiques partagent un seul appel"""
+        results = await asyncio.gather(*[
+            self.coalescer.run("key", self.slow_call) for _ in range(10)
+        ])
+        
+        assert results == ["schema"] * 10
+        assert self.calls == 1
+        assert self.coalescer.stats["leaders"] == 1
+        assert self.coalescer.stats["coalesced"] == 9
+        assert self.coalescer.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_different_keys_are_not_coalesced(self):
+        """Test que des clés différentes lancent des appels distincts"""
+        await asyncio.gather(
+            self.coalescer.run("a", self.slow_call),
+            self.coalescer.run("b", self.slow_call)
+        )
+        
+        assert self.calls == 2
+    
+    @pytest.mark.asyncio
+    async def test_errors_are_propagated_to_all_waiters(self):
+        """Test que l'erreur de l'appel partagé est transmise à chaque requête"""
+        async def failing_call():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("upstream")
+        
+        results = await asyncio.gather(
+            self.coalescer.run("key", failing_call),
+            self.coalescer.run("key", failing_call),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert self.coalescer.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_leader_cancellation_keeps_call_for_followers(self):
+        """Test que l'annulation du leader ne pénalise pas les autres requêtes"""
+        leader = asyncio.create_task(self.coalescer.run("key", self.slow_call))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(self.coalescer.run("key", self.slow_call))
+        await asyncio.sleep(0)
+        
+        leader.cancel()
+        
+        assert await follower == "schema"
+        assert leader.cancelled()
+        assert self.coalescer.stats["cancelled"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_last_waiter_cancellation_cancels_upstream_call(self):
+        """Test que l'appel amont est annulé quand plus personne n'attend"""
+        started = asyncio.Event()
+        upstream_cancelled = asyncio.Event()
+        
+        async def long_call():
+            started.set()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                upstream_cancelled.set()
+                raise
+        
+        task = asyncio.create_task(self.coalescer.run("key", long_call))
+        await started.wait()
+        task.cancel()
+        await asyncio.sleep(0.01)
+        
+        assert upstream_cancelled.is_set()
+        assert self.coalescer.stats["cancelled"] == 1
+        assert self.coalescer.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_counts_are_exported_as_metrics(self):
+        """Test que les appels lancés et les requêtes regroupées sont exposés sur /metrics"""
+        leaders = COALESCING_EVENTS.value(event="leader")
+        coalesced = COALESCING_EVENTS.value(event="coalesced")
+        
+        await asyncio.gather(*[self.coalescer.run("key", self.slow_call) for _ in range(3)])
+        
+        assert COALESCING_EVENTS.value(event="leader") == leaders + 1
+        assert COALESCING_EVENTS.value(event="coalesced") == coalesced + 2
+        assert 'devplan_coalescing_events_total{event="coalesced"}' in metrics_service.render()
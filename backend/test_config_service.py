@@ -1,7 +1,10 @@
+import json
 import pytest
 import asyncio
+import httpx
 from unittest.mock import Mock, patch, AsyncMock
 from config_service import ConfigService, OpenAIConfigRequest, OpenAIConfigResponse
+from rate_limiter import RateLimiterRegistry
 import openai
 
 class TestConfigService:
@@ -49,7 +52,7 @@ class TestConfigService:
         assert "Format de clé API invalide" in result.message
     
     @pytest.mark.asyncio
-    @patch('config_service.OpenAI')
+    @patch('config_service.AsyncOpenAI')
     async def test_validate_openai_config_connection_success(self, mock_openai_class):
         """Test de validation avec connexion réussie"""
         # Mock du client OpenAI
@@ -65,13 +68,13 @@ class TestConfigService:
             "x-ratelimit-remaining-tokens": "10000"
         }
         
-        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
         
         # Mock de la liste des organisations
         mock_org_response = Mock()
         mock_org_response.data = [Mock()]
         mock_org_response.data[0].name = "Test Organization"
-        mock_client.organizations.list.return_value = mock_org_response
+        mock_client.organizations.list = AsyncMock(return_value=mock_org_response)
         
         config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
         
@@ -83,14 +86,14 @@ class TestConfigService:
         assert result.organization == "Test Organization"
     
     @pytest.mark.asyncio
-    @patch('config_service.OpenAI')
+    @patch('config_service.AsyncOpenAI')
     async def test_validate_openai_config_auth_error(self, mock_openai_class):
         """Test de validation avec erreur d'authentification"""
         mock_client = Mock()
         mock_openai_class.return_value = mock_client
         
         # Simuler une erreur d'authentification
-        mock_client.chat.completions.create.side_effect = openai.AuthenticationError("Invalid API key")
+        mock_client.chat.completions.create = AsyncMock(side_effect=openai.AuthenticationError("Invalid API key"))
         
         config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
         
@@ -101,14 +104,14 @@ class TestConfigService:
         assert "Clé API invalide" in result.message
     
     @pytest.mark.asyncio
-    @patch('config_service.OpenAI')
+    @patch('config_service.AsyncOpenAI')
     async def test_validate_openai_config_rate_limit_error(self, mock_openai_class):
         """Test de validation avec erreur de limite de taux"""
         mock_client = Mock()
         mock_openai_class.return_value = mock_client
         
         # Simuler une erreur de limite de taux
-        mock_client.chat.completions.create.side_effect = openai.RateLimitError("Rate limit exceeded")
+        mock_client.chat.completions.create = AsyncMock(side_effect=openai.RateLimitError("Rate limit exceeded"))
         
         config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
         
@@ -137,7 +140,7 @@ class TestConfigService:
         assert "OpenAI n'est pas configuré" in str(exc_info.value.detail)
     
     @pytest.mark.asyncio
-    @patch('config_service.OpenAI')
+    @patch('config_service.AsyncOpenAI')
     async def test_get_client_configured(self, mock_openai_class):
         """Test d'obtention du client avec configuration valide"""
         # Configurer d'abord le service
@@ -147,8 +150,8 @@ class TestConfigService:
         mock_response = Mock()
         mock_response.choices = [Mock()]
         mock_response.choices[0].message.content = "OK"
-        mock_client.chat.completions.create.return_value = mock_response
-        mock_client.organizations.list.return_value = Mock(data=[])
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        mock_client.organizations.list = AsyncMock(return_value=Mock(data=[]))
         
         config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
         await self.config_service.validate_openai_config(config)
@@ -156,6 +159,163 @@ class TestConfigService:
         # Maintenant tester get_client
         client = self.config_service.get_client()
         assert client == mock_client
+    
+    @pytest.mark.asyncio
+    @patch('config_service.OpenAI')
+    async def test_validate_openai_config_sync_fallback(self, mock_openai_class):
+        """Test du repli sur le client synchrone exécuté dans le pool de threads"""
+        service = ConfigService(use_async_client=False, sync_workers=2)
+        mock_client = Mock()
+        mock_openai_class.return_value = mock_client
+        
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_response.choices[0].message.content = "OK"
+        mock_client.chat.completions.create.return_value = mock_response
+        mock_client.organizations.list.return_value = Mock(data=[])
+        
+        config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
+        result = await service.validate_openai_config(config)
+        
+        assert result.is_valid == True
+        assert service.get_client() == mock_client
+        mock_client.chat.completions.create.assert_called_once()
+    
+    @pytest.mark.asyncio
+    async def test_call_openai_does_not_block_event_loop(self):
+        """Test que les appels synchrones ne bloquent pas la boucle d'événements"""
+        import time
+        service = ConfigService(use_async_client=False, sync_workers=2)
+        
+        def slow_call():
+            time.sleep(0.2)
+            return "done"
+        
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            for _ in range(5):
+                await asyncio.sleep(0.02)
+                ticks += 1
+        
+        result, _ = await asyncio.gather(service.call_openai(slow_call), ticker())
+        
+        assert result == "done"
+        assert ticks == 5
+    
+    @pytest.mark.asyncio
+    @patch('config_service.AsyncOpenAI')
+    async def test_clients_share_one_http_transport(self, mock_openai_class):
+        """Test que tous les clients partagent le même transport HTTP"""
+        self.config_service._create_client(OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890"))
+        self.config_service._create_client(OpenAIConfigRequest(api_key="sk-other1234567890abcdef123456789"))
+        
+        first_transport = mock_openai_class.call_args_list[0].kwargs["http_client"]
+        second_transport = mock_openai_class.call_args_list[1].kwargs["http_client"]
+        assert first_transport is second_transport
+        assert mock_openai_class.call_args_list[0].kwargs["max_retries"] == 0
+        
+        await self.config_service.aclose()
+        assert first_transport.is_closed
+    
+    @pytest.mark.asyncio
+    @patch('config_service.AsyncOpenAI')
+    async def test_validated_client_is_reused(self, mock_openai_class):
+        """Test de la réutilisation du client validé pour la même clé et organisation"""
+        mock_client = Mock()
+        mock_openai_class.return_value = mock_client
+        mock_response = Mock()
+        mock_response.choices = [Mock()]
+        mock_client.chat.completions.create = AsyncMock(return_value=mock_response)
+        mock_client.organizations.list = AsyncMock(return_value=Mock(data=[]))
+        
+        config = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890")
+        await self.config_service.validate_openai_config(config)
+        await self.config_service.validate_openai_config(config)
+        await self.config_service.validate_openai_config(
+            OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890", organization_id="org-1")
+        )
+        
+        assert mock_openai_class.call_count == 2
+    
+    def test_client_cache_lru_eviction(self):
+        """Test de l'éviction LRU des clients en cache"""
+        service = ConfigService(max_cached_clients=2)
+        configs = [OpenAIConfigRequest(api_key=f"sk-test{i}234567890abcdef1234567890") for i in range(3)]
+        for config in configs:
+            service._remember_client(config, Mock())
+        
+        assert service._get_cached_client(configs[0]) is None
+        assert service._get_cached_client(configs[1]) is not None
+        assert service._get_cached_client(configs[2]) is not None
+    
+    @pytest.mark.asyncio
+    async def test_each_client_has_its_own_rate_limiter(self):
+        """Test que les appels et les en-têtes x-ratelimit-* d'un client n'affectent que son limiteur"""
+        def handler(request):
+            return httpx.Response(200, headers={"x-ratelimit-remaining-tokens": "1000"}, json={
+                "id": "cmpl", "object": "chat.completion", "created": 0, "model": "gpt-4",
+                "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "OK"}}]
+            })
+        
+        self.config_service.http_transport = httpx.MockTransport(handler)
+        first = OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890", organization_id="org-1")
+        second = OpenAIConfigRequest(api_key="sk-other1234567890abcdef123456789")
+        first_client = self.config_service._create_client(first)
+        second_client = self.config_service._create_client(second)
+        
+        with patch("config_service.openai_rate_limiters", RateLimiterRegistry()) as limiters:
+            await self.config_service.call_openai(
+                first_client.chat.completions.create,
+                model="gpt-4", messages=[{"role": "user", "content": "Test"}], max_tokens=10
+            )
+            first_limiter = limiters.get(self.config_service._client_key(first))
+            second_limiter = limiters.get(self.config_service._client_key(second))
+            
+            assert self.config_service._limiter_for(first_client.chat.completions.create) is first_limiter
+            assert self.config_service._limiter_for(second_client.chat.completions.create) is second_limiter
+            assert first_limiter.stats["calls"] == 1
+            assert first_limiter.tokens.level <= 1000
+            assert second_limiter.stats["calls"] == 0
+            assert second_limiter.tokens.level == second_limiter.tokens.capacity
+        await self.config_service.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_stream_holds_concurrency_slot_until_consumed(self):
+        """Test qu'un flux occupe son créneau jusqu'à la fin de la lecture puis restitue les tokens non consommés"""
+        def event(payload):
+            return "data: " + json.dumps(payload) + "\n\n"
+        
+        chunk = {"id": "c", "object": "chat.completion.chunk", "created": 0, "model": "gpt-4"}
+        body = (
+            event({**chunk, "choices": [{"index": 0, "delta": {"content": "OK"}, "finish_reason": None}]})
+            + event({**chunk, "choices": [], "usage": {"prompt_tokens": 8, "completion_tokens": 2, "total_tokens": 10}})
+            + "data: [DONE]\n\n"
+        )
+        
+        def handler(request):
+            return httpx.Response(200, headers={"content-type": "text/event-stream"}, content=body.encode("utf-8"))
+        
+        self.config_service.http_transport = httpx.MockTransport(handler)
+        client = self.config_service._create_client(OpenAIConfigRequest(api_key="sk-test1234567890abcdef1234567890"))
+        
+        with patch("config_service.openai_rate_limiters", RateLimiterRegistry()):
+            limiter = self.config_service._limiter_for(client.chat.completions.create)
+            stream = await self.config_service.call_openai(
+                client.chat.completions.create,
+                model="gpt-4", messages=[{"role": "user", "content": "Test"}], max_tokens=1000,
+                stream=True, stream_options={"include_usage": True}
+            )
+            assert limiter.concurrency.in_flight == 1
+            level_before = limiter.tokens.level
+            
+            chunks = [chunk async for chunk in self.config_service.iterate_stream(stream)]
+            
+            assert [c.choices[0].delta.content for c in chunks if c.choices] == ["OK"]
+            assert limiter.concurrency.in_flight == 0
+            assert limiter.tokens.level > level_before
+        await self.config_service.aclose()
 
 if __name__ == "__main__":
     # Exécuter les tests
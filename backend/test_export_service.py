@@ -0,0 +1,96 @@
+import json
+import shutil
+import pytest
+from unittest.mock import patch
+from export_service import ExportService, DEFAULT_TEMPLATES_DIR
+from history_service import SchemaRecord
+from models import ProjectRequest, ProjectSchema, FileStructure
+from services import SchemaGeneratorService
+
+class TestExportService:
+    """Tests pour l'export des schémas en Markdown, HTML et JSON"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.service = ExportService()
+        request = ProjectRequest(description="Plateforme e-commerce pour produits artisanaux", project_type="ecommerce")
+        schema = SchemaGeneratorService(mode="single", template_mode="off")._generate_fallback_schema(request)
+        schema.project_name = "Artisan <Market>"
+        self.record = SchemaRecord(
+            id="abc123", request_hash="hash-1", project_name=schema.project_name,
+            project_type=schema.project_type, complexity=schema.complexity,
+            created_at=1700000000.0, request=request, schema_data=schema
+        )
+
+    def test_markdown_export(self):
+        """Test du rendu Markdown : sections, stack, arborescence et jalons"""
+        text = self.service.render(self.record, "md").decode("utf-8")
+
+        assert text.startswith("# Artisan <Market>\n")
+        assert "### Base de données : PostgreSQL" in text
+        assert "- **Frontend** : Interface utilisateur React\n" in text
+        assert "project-root/\n  frontend/\n" in text
+        assert "- **MVP** (Semaine 4) : Version minimale viable" in text
+        assert "## Stratégie de tests" in text
+
+    def test_html_export_is_standalone_and_escaped(self):
+        """Test que le HTML est autonome, imprimable et échappe le contenu du modèle"""
+        html = self.service.render(self.record, "html").decode("utf-8")
+
+        assert html.startswith("<!DOCTYPE html>")
+        assert "@page" in html and "@media print" in html
+        assert "<h1>Artisan &lt;Market&gt;</h1>" in html
+        assert "<Market>" not in html
+
+    def test_json_export(self):
+        """Test que le document JSON contient les métadonnées et le schéma complet"""
+        document = json.loads(self.service.render(self.record, "json"))
+
+        assert document["id"] == "abc123"
+        assert document["created_at"].startswith("2023-11-14T22:13:20")
+        assert ProjectSchema.model_validate(document["schema"]) == self.record.schema_data
+        assert document["request"]["project_type"] == "ecommerce"
+
+    @pytest.mark.asyncio
+    async def test_exports_are_cached_per_revision(self):
+        """Test que les exports répétés sont servis depuis le cache jusqu'à la révision suivante"""
+        with patch.object(self.service, "render", wraps=self.service.render) as render:
+            first, first_cached = await self.service.export(self.record, "md")
+            second, second_cached = await self.service.export(self.record, "md")
+            await self.service.export(self.record, "html")
+            updated = self.record.model_copy(update={"revision": 1})
+            _, updated_cached = await self.service.export(updated, "md")
+
+        assert (first_cached, second_cached, updated_cached) == (False, True, False)
+        assert first == second
+        assert render.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_unknown_format_is_rejected(self):
+        """Test qu'un format inconnu lève une ValueError"""
+        with pytest.raises(ValueError):
+            await self.service.export(self.record, "pdf")
+
+    def test_template_change_changes_version(self, tmp_path):
+        """Test que la modification d'un gabarit change la version (et donc la clé de cache)"""
+        templates_dir = tmp_path / "templates"
+        shutil.copytree(DEFAULT_TEMPLATES_DIR, templates_dir)
+        assert ExportService(str(templates_dir)).version == self.service.version
+
+        (templates_dir / "plan.md").write_text("# {{ schema.project_name }}\n", encoding="utf-8")
+        service = ExportService(str(templates_dir))
+
+        assert service.version != self.service.version
+        assert service.cache_key(self.record, "md") != self.service.cache_key(self.record, "md")
+        assert service.render(self.record, "md") == b"# Artisan <Market>\n"
+
+    def test_deep_file_structure_is_rendered(self):
+        """Test qu'une arborescence plus profonde que la limite de récursion est rendue"""
+        node = FileStructure.model_construct(name="main.py", type="file", children=None, content=None)
+        for i in range(1500):
+            node = FileStructure.model_construct(name=f"d{i}", type="directory", children=[node], content=None)
+        schema = self.record.schema_data.model_copy(update={"file_structure": node})
+        record = self.record.model_copy(update={"schema_data": schema})
+
+        text = self.service.render(record, "md").decode("utf-8")
+        assert "  " * 1500 + "main.py\n" in text
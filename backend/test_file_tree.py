@@ -0,0 +1,102 @@
+import sys
+import pytest
+from unittest.mock import patch
+from pydantic import ValidationError
+from file_tree import FileTree
+from models import FileStructure, ProjectSchema
+
+def chain(depth):
+    """Arborescence linéaire de la profondeur demandée (construite sans récursion)"""
+    node = {"name": "main.py", "type": "file", "content": "print('ok')"}
+    for i in range(depth):
+        node = {"name": f"d{i}", "type": "directory", "children": [node]}
+    return node
+
+class TestFileTree:
+    """Tests pour l'arborescence compacte de la structure de fichiers"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.data = {
+            "name": "shop",
+            "type": "directory",
+            "children": [
+                {"name": "backend", "type": "directory", "children": [
+                    {"name": "index.ts", "type": "file", "content": "export {};"},
+                    {"name": "routes", "type": "directory"}
+                ]},
+                {"name": "frontend", "type": "directory", "children": [{"name": "index.ts"}]},
+                {"name": "README.md", "type": "file", "children": []}
+            ]
+        }
+
+    def test_roundtrip_matches_recursive_validation(self):
+        """Test que la forme compacte redonne exactement la validation récursive"""
+        expected = FileStructure.model_validate(self.data)
+        tree = FileTree.parse(self.data)
+
+        assert len(tree) == 7
+        assert tree.to_dict() == expected.model_dump()
+        assert FileTree.within_limits(self.data)
+        assert ProjectSchema.model_validate({"file_structure": self.data}).file_structure == expected
+
+    def test_names_are_interned(self):
+        """Test que les noms répétés partagent la même chaîne"""
+        tree = FileTree.parse(self.data)
+        first, second = [name for name in tree.names if name == "index.ts"]
+        assert first is second
+
+    def test_depth_limit_keeps_directories_empty(self):
+        """Test que les dossiers au-delà de la profondeur maximale sont conservés vides"""
+        tree = FileTree.parse(chain(50), max_depth=5)
+
+        assert not FileTree.within_limits(chain(50), max_depth=5)
+        assert len(tree) == 6
+        assert tree.pruned == 1
+        node = tree.to_dict()
+        for _ in range(5):
+            node = node["children"][0]
+        assert node["type"] == "directory"
+        assert node["children"] == []
+
+    def test_node_limit_drops_deepest_levels_first(self):
+        """Test que la limite de nœuds abandonne d'abord les niveaux profonds"""
+        data = {"name": "root", "type": "directory", "children": [
+            {"name": f"pkg{i}", "type": "directory", "children": [{"name": "index.ts"}]} for i in range(100)
+        ]}
+        tree = FileTree.parse(data, max_nodes=10)
+
+        assert len(tree) == 10
+        assert tree.pruned == 100
+        assert [child["name"] for child in tree.to_dict()["children"]] == [f"pkg{i}" for i in range(9)]
+
+    def test_deep_tree_does_not_recurse(self):
+        """Test qu'une arborescence plus profonde que la limite de récursion est traitée"""
+        depth = sys.getrecursionlimit() + 500
+        tree = FileTree.parse(chain(depth), max_depth=depth)
+        assert len(tree) == depth + 1
+        assert tree.to_dict()["children"][0]["name"] == f"d{depth - 2}"
+        assert FileTree.within_limits(chain(depth), max_depth=depth)
+
+    def test_schema_validation_prunes_oversized_trees(self):
+        """Test que la validation du schéma élague une arborescence hors limites"""
+        with patch("file_tree.MAX_DEPTH", 4):
+            schema = ProjectSchema.model_validate({"file_structure": chain(10)})
+
+        node = schema.file_structure
+        for _ in range(4):
+            node = node.children[0]
+        assert node.name == "d5"
+        assert node.children == []
+
+    def test_invalid_nodes_are_skipped(self):
+        """Test que les enfants invalides sont ignorés et qu'une racine invalide est rejetée"""
+        tree = FileTree.parse({"name": "root", "children": ["texte", None, {"name": 42, "content": ["x"]}]})
+        data = tree.to_dict()
+        assert data["type"] == "directory"
+        assert data["children"] == [{"name": "42", "type": "file", "children": None, "content": None}]
+
+        with pytest.raises(ValueError):
+            FileTree.parse(["root"])
+        with pytest.raises(ValidationError):
+            ProjectSchema.model_validate({"file_structure": "root"})
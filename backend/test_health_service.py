@@ -0,0 +1,84 @@
+import pytest
+import asyncio
+from unittest.mock import patch, AsyncMock
+from health_service import HealthService
+from config_service import OpenAIConfigResponse
+
+class TestHealthService:
+    """Tests pour le service de santé"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.valid_result = OpenAIConfigResponse(
+            is_valid=True,
+            status="connected",
+            message="Configuration testée avec succès",
+            model_available=True
+        )
+    
+    def test_readiness_before_first_check(self):
+        """Test de l'état de disponibilité avant le premier contrôle"""
+        service = HealthService(freshness=60)
+        service.schedule_refresh = lambda: None
+        
+        readiness = service.readiness()
+        
+        assert readiness["ready"] == False
+        assert readiness["status"] == "starting"
+    
+    @pytest.mark.asyncio
+    @patch('health_service.config_service.test_current_config', new_callable=AsyncMock)
+    async def test_probes_are_served_from_cache(self, mock_test):
+        """Test que les sondes successives ne relancent pas la validation"""
+        mock_test.return_value = self.valid_result
+        service = HealthService(freshness=60)
+        
+        await service.refresh()
+        for _ in range(10):
+            status = service.get_openai_status()
+        await asyncio.sleep(0)
+        
+        assert status == self.valid_result
+        assert service.readiness()["ready"] == True
+        assert mock_test.await_count == 1
+    
+    @pytest.mark.asyncio
+    @patch('health_service.config_service.test_current_config', new_callable=AsyncMock)
+    async def test_stale_result_triggers_single_background_refresh(self, mock_test):
+        """Test qu'un résultat périmé déclenche un seul rafraîchissement"""
+        mock_test.return_value = self.valid_result
+        service = HealthService(freshness=0)
+        service.record(self.valid_result)
+        
+        for _ in range(5):
+            assert service.get_openai_status() == self.valid_result
+        await service._refresh_task
+        
+        assert mock_test.await_count == 1
+    
+    @pytest.mark.asyncio
+    @patch('health_service.config_service.test_current_config', new_callable=AsyncMock)
+    async def test_refresh_error_is_recorded(self, mock_test):
+        """Test qu'une erreur de validation est enregistrée comme non disponible"""
+        mock_test.side_effect = RuntimeError("boom")
+        service = HealthService(freshness=60)
+        
+        result = await service.refresh()
+        
+        assert result.is_valid == False
+        assert result.status == "error"
+        assert service.readiness()["status"] == "not_ready"
+    
+    @pytest.mark.asyncio
+    @patch('health_service.config_service.test_current_config', new_callable=AsyncMock)
+    async def test_start_and_stop_background_loop(self, mock_test):
+        """Test du démarrage et de l'arrêt de la boucle de rafraîchissement"""
+        mock_test.return_value = self.valid_result
+        service = HealthService(freshness=60, refresh_interval=60)
+        
+        await service.start()
+        await asyncio.sleep(0.01)
+        await service.stop()
+        
+        assert mock_test.await_count == 1
+        assert service.is_fresh()
@@ -0,0 +1,180 @@
+import pytest
+import sqlite3
+from models import ProjectRequest, ProjectSchema
+from history_service import HistoryService, InMemoryHistoryStore, SQLiteHistoryStore, RevisionConflictError
+from tenant_service import current_tenant
+
+def make_store(kind, tmp_path):
+    if kind == "sqlite":
+        return SQLiteHistoryStore(str(tmp_path / "history.db"))
+    return InMemoryHistoryStore()
+
+class TestHistoryService:
+    """Tests pour l'historique des schémas générés"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.request = ProjectRequest(description="Boutique en ligne de bijoux artisanaux", project_type="ecommerce")
+
+    def schema(self, name, project_type="ecommerce", complexity="medium"):
+        return ProjectSchema(project_name=name, project_type=project_type, complexity=complexity, features=["Panier"] * 50)
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    async def test_record_and_get_roundtrip(self, kind, tmp_path):
+        """Test qu'un schéma enregistré est relu à l'identique par son identifiant"""
+        service = HistoryService(store=make_store(kind, tmp_path))
+        schema_id = await service.record(self.request, self.schema("Bijoux"), "hash-1")
+
+        record = await service.get(schema_id)
+
+        assert record.schema_data == self.schema("Bijoux")
+        assert record.request == self.request
+        assert await service.get("inconnu") is None
+        assert await service.find_id("hash-1") == schema_id
+        assert await service.find_id("hash-2") is None
+        service.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    async def test_listing_is_paginated_and_filtered(self, kind, tmp_path):
+        """Test de la pagination par curseur et des filtres par type et complexité"""
+        service = HistoryService(store=make_store(kind, tmp_path))
+        for i in range(5):
+            await service.record(self.request, self.schema(f"Boutique {i}"), f"hash-{i}")
+        await service.record(self.request, self.schema("Blog", project_type="blog", complexity="low"), "hash-blog")
+
+        first = await service.list(limit=3)
+        second = await service.list(limit=3, cursor=first.next_cursor)
+
+        assert [item.project_name for item in first.items] == ["Blog", "Boutique 4", "Boutique 3"]
+        assert [item.project_name for item in second.items] == ["Boutique 2", "Boutique 1", "Boutique 0"]
+        assert second.next_cursor is None
+        blogs = await service.list(project_type="blog")
+        assert [item.project_name for item in blogs.items] == ["Blog"]
+        low = await service.list(complexity="low", project_type="ecommerce")
+        assert low.items == []
+        service.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    async def test_update_replaces_schema_in_place(self, kind, tmp_path):
+        """Test qu'une mise à jour conserve l'identifiant et la date de l'entrée"""
+        service = HistoryService(store=make_store(kind, tmp_path))
+        schema_id = await service.record(self.request, self.schema("Bijoux"), "hash-1")
+        record = await service.get(schema_id)
+
+        await service.update(record, self.schema("Bijoux v2"))
+
+        updated = await service.get(schema_id)
+        assert updated.schema_data.project_name == "Bijoux v2"
+        assert updated.created_at == record.created_at
+        assert (record.revision, updated.revision) == (0, 1)
+        assert [item.project_name for item in (await service.list()).items] == ["Bijoux v2"]
+        service.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    async def test_concurrent_update_is_rejected(self, kind, tmp_path):
+        """Test qu'une mise à jour fondée sur une révision périmée est refusée"""
+        service = HistoryService(store=make_store(kind, tmp_path))
+        schema_id = await service.record(self.request, self.schema("Bijoux"), "hash-1")
+        first = await service.get(schema_id)
+        second = await service.get(schema_id)
+
+        await service.update(first, self.schema("Bijoux v2"))
+        with pytest.raises(RevisionConflictError):
+            await service.update(second, self.schema("Bijoux v3"))
+
+        updated = await service.get(schema_id)
+        assert (updated.schema_data.project_name, updated.revision) == ("Bijoux v2", 1)
+        service.close()
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("kind", ["memory", "sqlite"])
+    async def test_history_is_isolated_per_tenant(self, kind, tmp_path):
+        """Test qu'un tenant ne liste ni ne retrouve les schémas d'un autre tenant"""
+        service = HistoryService(store=make_store(kind, tmp_path))
+        token = current_tenant.set("session-a")
+        try:
+            schema_id = await service.record(self.request, self.schema("Projet A"), "hash-1")
+        finally:
+            current_tenant.reset(token)
+
+        token = current_tenant.set("session-b")
+        try:
+            assert await service.get(schema_id) is None
+            assert await service.find_id("hash-1") is None
+            assert (await service.list()).items == []
+        finally:
+            current_tenant.reset(token)
+        assert await service.get(schema_id) is None
+
+        token = current_tenant.set("session-a")
+        try:
+            record = await service.get(schema_id)
+            assert record.schema_data.project_name == "Projet A"
+            assert "session-a" not in record.tenant
+            assert await service.find_id("hash-1") == schema_id
+            assert [item.id for item in (await service.list()).items] == [schema_id]
+        finally:
+            current_tenant.reset(token)
+        service.close()
+
+    @pytest.mark.asyncio
+    async def test_sqlite_store_migrates_tables_without_tenant(self, tmp_path):
+        """Test qu'une base créée avant le cloisonnement par tenant reste lisible et modifiable"""
+        path = str(tmp_path / "history.db")
+        conn = sqlite3.connect(path)
+        conn.execute(
+            "CREATE TABLE schema_history (id TEXT PRIMARY KEY, request_hash TEXT NOT NULL, "
+            "project_name TEXT NOT NULL, project_type TEXT NOT NULL, complexity TEXT NOT NULL, "
+            "created_at REAL NOT NULL, payload BLOB NOT NULL)"
+        )
+        conn.commit()
+        conn.close()
+
+        service = HistoryService(store=SQLiteHistoryStore(path))
+        schema_id = await service.record(self.request, self.schema("Bijoux"), "hash-1")
+
+        record = await service.get(schema_id)
+        assert record.schema_data.project_name == "Bijoux"
+        await service.update(record, self.schema("Bijoux v2"))
+        assert (await service.get(schema_id)).revision == 1
+        service.close()
+
+    @pytest.mark.asyncio
+    async def test_invalid_cursor_is_rejected(self):
+        """Test qu'un curseur invalide lève une ValueError"""
+        service = HistoryService(store=InMemoryHistoryStore())
+        with pytest.raises(ValueError):
+            await service.list(cursor="n'importe quoi")
+
+    @pytest.mark.asyncio
+    async def test_sqlite_store_uses_wal_indexes_and_compression(self, tmp_path):
+        """Test du mode WAL, des index et de la compression des schémas"""
+        path = str(tmp_path / "history.db")
+        store = SQLiteHistoryStore(path)
+        service = HistoryService(store=store)
+        schema = self.schema("Bijoux")
+        await service.record(self.request, schema, "hash-1")
+
+        conn = sqlite3.connect(path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        indexes = {row[1] for row in conn.execute("PRAGMA index_list(schema_history)")}
+        assert {"idx_history_hash", "idx_history_type", "idx_history_complexity", "idx_history_created"} <= indexes
+        payload = conn.execute("SELECT payload FROM schema_history").fetchone()[0]
+        assert len(payload) < len(schema.model_dump_json()) / 2
+        plan = " ".join(str(row) for row in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT id FROM schema_history WHERE request_hash = ? ORDER BY created_at DESC LIMIT 1", ("x",)
+        ))
+        assert "idx_history_hash" in plan
+        conn.close()
+        service.close()
+
+    @pytest.mark.asyncio
+    async def test_disabled_history_records_nothing(self):
+        """Test qu'un historique désactivé n'attribue pas d'identifiant"""
+        service = HistoryService(enabled=False)
+        assert await service.record(self.request, self.schema("Bijoux"), "hash-1") is None
+        assert (await service.list()).items == []
@@ -0,0 +1,94 @@
+import pytest
+import asyncio
+from job_service import JobService, JobStatus, InMemoryJobStore, SQLiteJobStore, QueueFullError
+from models import ProjectRequest
+from services import GenerationResult, SchemaGeneratorService
+
+class TestJobService:
+    """Tests pour la file d'attente des générations"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.request = ProjectRequest(description="Une plateforme SaaS de facturation")
+        self.schema = SchemaGeneratorService()._generate_fallback_schema(self.request)
+        self.running = 0
+        self.max_running = 0
+    
+    async def runner(self, request):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(0.02)
+        self.running -= 1
+        return GenerationResult(schema=self.schema)
+    
+    @pytest.mark.asyncio
+    async def test_submit_returns_immediately_and_completes(self):
+        """Test qu'une tâche est créée en attente puis terminée par un worker"""
+        service = JobService(store=InMemoryJobStore(), concurrency=1, max_queue_size=10)
+        await service.start(self.runner)
+        
+        job = await service.submit(self.request)
+        assert job.status == JobStatus.QUEUED
+        
+        done = await service.wait(job.id, timeout=1)
+        await service.stop()
+        
+        assert done.status == JobStatus.SUCCEEDED
+        assert done.result == self.schema
+        assert done.finished_at >= done.started_at
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self):
+        """Test que le nombre de générations simultanées est borné"""
+        service = JobService(store=InMemoryJobStore(), concurrency=2, max_queue_size=10)
+        await service.start(self.runner)
+        
+        jobs = [await service.submit(self.request) for _ in range(6)]
+        await asyncio.gather(*[service.wait(job.id, timeout=1) for job in jobs])
+        await service.stop()
+        
+        assert self.max_running == 2
+    
+    @pytest.mark.asyncio
+    async def test_queue_full_is_rejected(self):
+        """Test du rejet des tâches quand la file est pleine"""
+        service = JobService(store=InMemoryJobStore(), concurrency=1, max_queue_size=1)
+        await service.start(self.runner)
+        
+        await service.submit(self.request)
+        await asyncio.sleep(0)  # Le worker prend la première tâche
+        await service.submit(self.request)
+        with pytest.raises(QueueFullError):
+            await service.submit(self.request)
+        await service.stop()
+    
+    @pytest.mark.asyncio
+    async def test_runner_error_marks_job_failed(self):
+        """Test qu'une erreur de génération est enregistrée sur la tâche"""
+        async def failing_runner(request):
+            raise RuntimeError("upstream")
+        
+        service = JobService(store=InMemoryJobStore(), concurrency=1, max_queue_size=10)
+        await service.start(failing_runner)
+        
+        job = await service.submit(self.request)
+        done = await service.wait(job.id, timeout=1)
+        await service.stop()
+        
+        assert done.status == JobStatus.FAILED
+        assert done.error == "upstream"
+    
+    @pytest.mark.asyncio
+    async def test_sqlite_store_roundtrip(self, tmp_path):
+        """Test de la persistance des tâches dans SQLite"""
+        store = SQLiteJobStore(str(tmp_path / "jobs.db"))
+        service = JobService(store=store, concurrency=1, max_queue_size=10)
+        await service.start(self.runner)
+        
+        job = await service.submit(self.request)
+        await service.wait(job.id, timeout=1)
+        await service.stop()
+        
+        reloaded = await SQLiteJobStore(str(tmp_path / "jobs.db")).get(job.id)
+        assert reloaded.status == JobStatus.SUCCEEDED
+        assert reloaded.result == self.schema
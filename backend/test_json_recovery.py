@@ -0,0 +1,61 @@
+import pytest
+import json
+from json_recovery import strip_code_fences, extract_json_object, repair_truncated_json, recover_sections
+
+class TestJsonRecovery:
+    """Tests pour l'extraction tolérante du JSON produit par le modèle"""
+
+    def test_strip_code_fences(self):
+        """Test que les blocs markdown sont retirés"""
+        assert strip_code_fences('```json\n{"a": 1}\n```').strip() == '{"a": 1}'
+
+    def test_code_fences_inside_values_are_kept(self):
+        """Test qu'un bloc de code cité dans une valeur n'est pas retiré"""
+        content = "```bash\nnpm install\n```"
+        text = "```json\n" + json.dumps({"documentation": [content], "features": ["Panier"]}) + "\n```"
+
+        assert json.loads(strip_code_fences(text)) == {"documentation": [content], "features": ["Panier"]}
+        assert recover_sections(text).complete["documentation"] == [content]
+
+    def test_extract_outermost_object(self):
+        """Test que le préambule et le texte final sont ignorés"""
+        text = 'Voici le schéma : {"a": {"b": "}"}} Bonne chance !'
+
+        assert extract_json_object(text) == '{"a": {"b": "}"}}'
+        assert extract_json_object("pas de JSON") is None
+
+    @pytest.mark.parametrize("truncated, expected", [
+        ('{"a": 1, "b": ["x", "y', {"a": 1, "b": ["x"]}),
+        ('{"a": 1, "b": {"c": tru', {"a": 1, "b": {}}),
+        ('{"a": 12, "b"', {"a": 12}),
+        ('{"a": 12, "b": ', {"a": 12}),
+        ('{"a": {"k": [1, 2, {"z": "q\\"', {"a": {"k": [1, 2, {}]}}),
+        ('{"a": [1, 2]}', {"a": [1, 2]}),
+    ])
+    def test_repair_truncated_json(self, truncated, expected):
+        """Test que le document tronqué est coupé à la dernière valeur complète et refermé"""
+        assert json.loads(repair_truncated_json(truncated)) == expected
+
+    def test_recover_sections_from_fenced_response(self):
+        """Test qu'une réponse complète entourée de markdown est entièrement récupérée"""
+        recovered = recover_sections('Bien sûr !\n```json\n{"project_name": "Shop", "features": ["Panier"]}\n```')
+
+        assert recovered.complete == {"project_name": "Shop", "features": ["Panier"]}
+        assert recovered.is_truncated is False
+
+    def test_recover_sections_from_truncated_response(self):
+        """Test que seules les sections terminées sont considérées comme complètes"""
+        text = '{"project_name": "Shop", "features": ["Panier"], "roadmap": {"phases": [{"name": "P1"}, {"na'
+
+        recovered = recover_sections(text)
+
+        assert recovered.complete == {"project_name": "Shop", "features": ["Panier"]}
+        assert recovered.truncated == {"roadmap": {"phases": [{"name": "P1"}, {}]}}
+        assert recovered.is_truncated is True
+
+    def test_recover_sections_skips_unreadable_section(self):
+        """Test qu'une section illisible d'un objet complet est écartée sans troncature"""
+        recovered = recover_sections('{"project_name": "Shop", "features": ["Panier",], "complexity": "low"}')
+
+        assert recovered.complete == {"project_name": "Shop", "complexity": "low"}
+        assert recovered.is_truncated is False
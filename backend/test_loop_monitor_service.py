@@ -0,0 +1,65 @@
+import pytest
+import time
+import asyncio
+from loop_monitor_service import LoopMonitor
+from metrics_service import metrics_service
+
+def blocking_call(duration):
+    """Appel synchrone bloquant la boucle"""
+    time.sleep(duration)
+
+class TestLoopMonitor:
+    """Tests pour le détecteur de blocages de la boucle d'événements"""
+
+    @pytest.mark.asyncio
+    async def test_disabled_monitor_does_not_start(self):
+        """Test que le détecteur est inactif sans activation explicite"""
+        monitor = LoopMonitor(enabled=False)
+        await monitor.start()
+        assert monitor._task is None
+        await monitor.stop()
+
+    @pytest.mark.asyncio
+    async def test_blocking_call_is_reported_with_its_site(self):
+        """Test qu'un appel bloquant est compté et attribué à son site d'appel"""
+        monitor = LoopMonitor(enabled=True, interval=0.01, threshold=0.05)
+        await monitor.start()
+        try:
+            await asyncio.sleep(0.03)
+            blocking_call(0.2)
+            await asyncio.sleep(0.03)
+        finally:
+            await monitor.stop()
+
+        assert len(monitor.recent) == 1
+        block = monitor.recent[0]
+        assert block["duration_ms"] >= 150
+        assert block["site"].startswith("test_loop_monitor_service.py")
+        assert "blocking_call" in block["site"]
+        assert "time.sleep" in block["stack"] or "blocking_call" in block["stack"]
+        assert monitor.blocks.value(site=block["site"]) == 1
+
+    @pytest.mark.asyncio
+    async def test_short_pauses_are_not_reported(self):
+        """Test que les pauses sous le seuil alimentent seulement l'histogramme de retard"""
+        monitor = LoopMonitor(enabled=True, interval=0.01, threshold=0.2)
+        await monitor.start()
+        try:
+            blocking_call(0.02)
+            await asyncio.sleep(0.05)
+        finally:
+            await monitor.stop()
+
+        assert not monitor.recent
+        assert monitor.lag.count() > 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_exposed_once_started(self):
+        """Test que les métriques du détecteur apparaissent dans /metrics"""
+        monitor = LoopMonitor(enabled=True, interval=0.01, threshold=0.05)
+        await monitor.start()
+        await monitor.stop()
+
+        text = metrics_service.render()
+        assert "# TYPE devplan_event_loop_lag_seconds histogram" in text
+        assert "# TYPE devplan_event_loop_blocks_total counter" in text
@@ -0,0 +1,158 @@
+import os
+import time
+import asyncio
+from unittest.mock import AsyncMock, patch
+from fastapi.testclient import TestClient
+import main
+from models import ProjectRequest
+from services import SchemaGeneratorService, GenerationResult
+from cache_service import SchemaCacheService
+from semantic_cache_service import SemanticCacheService
+from coalescing_service import RequestCoalescer
+from history_service import HistoryService, InMemoryHistoryStore
+from job_service import JobService, InMemoryJobStore
+
+class ApiTestCase:
+    """Application isolée : caches, historique et file de tâches neufs, génération simulée"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.request = ProjectRequest(description="Boutique en ligne de bijoux artisanaux", project_type="ecommerce")
+        self.schema = SchemaGeneratorService()._generate_fallback_schema(self.request)
+        self.generate = AsyncMock(return_value=GenerationResult(schema=self.schema))
+        self.job_service = JobService(store=InMemoryJobStore(), concurrency=1, max_queue_size=1)
+        self.patches = [
+            patch.dict(os.environ, {"OPENAI_API_KEY": "sk-test1234567890abcdef1234567890"}),
+            patch.object(main, "schema_cache", SchemaCacheService(enabled=True, db_path="")),
+            patch.object(main, "semantic_cache", SemanticCacheService(enabled=True, threshold=0.8)),
+            patch.object(main, "history_service", HistoryService(store=InMemoryHistoryStore())),
+            patch.object(main, "request_coalescer", RequestCoalescer()),
+            patch.object(main, "job_service", self.job_service),
+            patch.object(main.health_service, "start", AsyncMock()),
+            patch.object(main.health_service, "stop", AsyncMock()),
+            patch.object(main.schema_service, "generate", self.generate),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def teardown_method(self):
+        for patcher in reversed(self.patches):
+            patcher.stop()
+
+    def payload(self, description=None):
+        request = self.request if description is None else self.request.model_copy(update={"description": description})
+        return request.model_dump(mode="json")
+
+class TestJobsApi(ApiTestCase):
+    """Tests HTTP de la file d'attente des générations"""
+
+    def test_wait_returns_finished_job(self):
+        """Test qu'une tâche soumise est suivie jusqu'à son résultat par long-polling"""
+        with TestClient(main.app) as client:
+            response = client.post("/api/jobs", json=self.payload())
+            assert response.status_code == 202
+            job_id = response.json()["id"]
+
+            response = client.get(f"/api/jobs/{job_id}/wait", params={"timeout": 5})
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "succeeded"
+        assert response.json()["result"]["project_name"] == self.schema.project_name
+        self.generate.assert_awaited_once()
+
+    def test_full_queue_is_rejected_with_retry_after(self):
+        """Test que la file pleine renvoie 429 avec Retry-After au lieu d'accepter la tâche"""
+        async def slow_generate(request):
+            await asyncio.sleep(30)
+
+        self.generate.side_effect = slow_generate
+        with TestClient(main.app) as client:
+            running = client.post("/api/jobs", json=self.payload("Boutique de bijoux numéro 1")).json()["id"]
+            deadline = time.monotonic() + 5
+            while client.get(f"/api/jobs/{running}").json()["status"] != "running":
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+
+            queued = client.post("/api/jobs", json=self.payload("Boutique de bijoux numéro 2"))
+            rejected = client.post("/api/jobs", json=self.payload("Boutique de bijoux numéro 3"))
+
+        assert queued.status_code == 202
+        assert queued.json()["status"] == "queued"
+        assert rejected.status_code == 429
+        assert rejected.headers["Retry-After"] == "5"
+
+    def test_unknown_job_is_not_found(self):
+        """Test qu'une tâche inconnue renvoie 404, en lecture comme en attente"""
+        with TestClient(main.app) as client:
+            assert client.get("/api/jobs/inconnue").status_code == 404
+            assert client.get("/api/jobs/inconnue/wait", params={"timeout": 0}).status_code == 404
+
+class TestGenerateSchemaApi(ApiTestCase):
+    """Tests HTTP des en-têtes de cache de la génération"""
+
+    def test_cache_headers(self):
+        """Test des en-têtes X-Cache : génération, requête identique puis description similaire"""
+        with TestClient(main.app) as client:
+            miss = client.post("/api/generate-schema", json=self.payload())
+            hit = client.post("/api/generate-schema", json=self.payload())
+            semantic = client.post("/api/generate-schema", json=self.payload("Magasin en ligne de bijoux artisanaux"))
+
+        assert miss.status_code == 200
+        assert miss.headers["X-Cache"] == "MISS"
+        assert miss.headers["X-Schema-Id"]
+        assert hit.headers["X-Cache"] == "HIT"
+        assert hit.headers["X-Cache-Key"] == miss.headers["X-Cache-Key"]
+        assert hit.headers["X-Schema-Id"] == miss.headers["X-Schema-Id"]
+        assert semantic.headers["X-Cache"] == "SEMANTIC"
+        assert semantic.headers["X-Cache-Key"] != miss.headers["X-Cache-Key"]
+        assert "X-Schema-Id" not in semantic.headers
+        assert semantic.json()["data"]["description"] == "Magasin en ligne de bijoux artisanaux"
+        self.generate.assert_awaited_once()
+
+    def test_fallback_schema_is_not_cached(self):
+        """Test qu'un schéma de repli n'est pas resservi depuis le cache"""
+        self.generate.return_value = GenerationResult(schema=self.schema, is_fallback=True)
+        with TestClient(main.app) as client:
+            first = client.post("/api/generate-schema", json=self.payload())
+            second = client.post("/api/generate-schema", json=self.payload())
+
+        assert first.headers["X-Cache"] == "MISS"
+        assert second.headers["X-Cache"] == "MISS"
+        assert "X-Schema-Id" not in first.headers
+        assert self.generate.await_count == 2
+
+class TestRegenerateApi(ApiTestCase):
+    """Tests HTTP de la régénération de sections d'un schéma de l'historique"""
+
+    def regenerated(self, name):
+        return GenerationResult(schema=self.schema.model_copy(update={"project_name": name}))
+
+    def test_regenerated_schema_is_served_from_cache(self):
+        """Test que la régénération met à jour l'historique et le cache de la requête"""
+        with patch.object(main.schema_service, "regenerate_sections", AsyncMock(return_value=self.regenerated("Bijoux v2"))):
+            with TestClient(main.app) as client:
+                schema_id = client.post("/api/generate-schema", json=self.payload()).headers["X-Schema-Id"]
+                response = client.post(f"/api/schemas/{schema_id}/regenerate", json={"sections": ["roadmap"]})
+                hit = client.post("/api/generate-schema", json=self.payload())
+
+        assert response.status_code == 200
+        assert response.headers["X-Regenerated-Sections"] == "roadmap"
+        assert hit.headers["X-Cache"] == "HIT"
+        assert hit.json()["data"]["project_name"] == "Bijoux v2"
+
+    def test_concurrent_regeneration_is_rejected(self):
+        """Test qu'une régénération partie d'une révision dépassée renvoie 409 sans écraser l'autre"""
+        async def concurrent_regeneration(request, schema, sections, instructions):
+            # Une autre régénération du même schéma aboutit pendant l'appel au modèle
+            record = await main.history_service.get(schema_id)
+            await main.history_service.update(record, self.regenerated("Bijoux concurrent").schema)
+            return self.regenerated("Bijoux v2")
+
+        with patch.object(main.schema_service, "regenerate_sections", AsyncMock(side_effect=concurrent_regeneration)):
+            with TestClient(main.app) as client:
+                schema_id = client.post("/api/generate-schema", json=self.payload()).headers["X-Schema-Id"]
+                response = client.post(f"/api/schemas/{schema_id}/regenerate", json={"sections": ["roadmap"]})
+                stored = client.get(f"/api/schemas/{schema_id}")
+
+        assert response.status_code == 409
+        assert stored.json()["data"]["project_name"] == "Bijoux concurrent"
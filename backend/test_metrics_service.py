@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import Mock, AsyncMock, patch
+from models import ProjectRequest
+from metrics_service import MetricsService, Histogram, Counter, metrics_service
+from services import SchemaGeneratorService
+
+class TestMetricsService:
+    """Tests pour l'instrumentation et l'exposition Prometheus"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.metrics = MetricsService(tracing=False)
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test que les effectifs des bornes sont cumulés jusqu'à +Inf"""
+        histogram = Histogram("duration_seconds", "Durée", ["stage"], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, stage="parse")
+
+        samples = list(histogram.samples())
+
+        assert 'duration_seconds_bucket{stage="parse",le="0.1"} 2' in samples
+        assert 'duration_seconds_bucket{stage="parse",le="1"} 3' in samples
+        assert 'duration_seconds_bucket{stage="parse",le="+Inf"} 4' in samples
+        assert 'duration_seconds_sum{stage="parse"} 3.65' in samples
+        assert 'duration_seconds_count{stage="parse"} 4' in samples
+
+    def test_label_values_are_escaped(self):
+        """Test que les valeurs d'étiquettes sont échappées"""
+        counter = Counter("errors_total", "Erreurs", ["reason"])
+        counter.inc(reason='a "b"\nc')
+        assert list(counter.samples()) == ['errors_total{reason="a \\"b\\"\\nc"} 1']
+
+    def test_stage_records_duration_even_on_error(self):
+        """Test qu'une étape en erreur est tout de même mesurée"""
+        with pytest.raises(ValueError):
+            with self.metrics.stage("parse"):
+                raise ValueError("invalide")
+        assert self.metrics.stage_duration.count(stage="parse") == 1
+
+    def test_usage_and_fallbacks_are_counted(self):
+        """Test des tokens consommés et des replis par motif"""
+        response = Mock(usage=Mock(prompt_tokens=120, completion_tokens=800))
+        self.metrics.record_usage("light", response)
+        self.metrics.record_usage("light", Mock(usage=None))
+        self.metrics.record_generation("light", 1.5, fallback_reason="invalid_json")
+        self.metrics.record_generation("light", 2.0, incomplete=True)
+
+        assert self.metrics.tokens.value(route="light", kind="completion") == 800
+        assert self.metrics.fallbacks.value(reason="invalid_json") == 1
+        assert self.metrics.generations.value(route="light", outcome="fallback") == 1
+        assert self.metrics.generations.value(route="light", outcome="partial") == 1
+
+    def test_render_declares_every_metric(self):
+        """Test que l'exposition déclare le type de chaque métrique"""
+        self.metrics.cache_lookups.inc(status="HIT")
+        text = self.metrics.render()
+
+        assert "# TYPE devplan_stage_duration_seconds histogram" in text
+        assert "# TYPE devplan_fallbacks_total counter" in text
+        assert 'devplan_cache_lookups_total{status="HIT"} 1' in text
+        assert text.endswith("\n")
+
+class TestPipelineInstrumentation:
+    """Tests pour l'instrumentation du service de génération"""
+
+    @pytest.mark.asyncio
+    async def test_generation_records_stages_and_fallback_reason(self):
+        """Test que les étapes et le motif d'un repli sont enregistrés"""
+        service = SchemaGeneratorService(mode="single", template_mode="off")
+        request = ProjectRequest(description="Plateforme e-commerce pour produits artisanaux")
+        response = Mock(usage=Mock(prompt_tokens=100, completion_tokens=50))
+        response.choices = [Mock(message=Mock(content="pas du JSON"))]
+        route = service.route(request)
+        fallbacks = metrics_service.fallbacks.value(reason="invalid_json")
+        completion_tokens = metrics_service.tokens.value(route=route.name, kind="completion")
+        upstream = metrics_service.stage_duration.count(stage="upstream")
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.get_model.return_value = None
+            mock_config.call_openai = AsyncMock(return_value=response)
+            result = await service.generate(request)
+
+        assert result.fallback_reason == "invalid_json"
+        assert metrics_service.fallbacks.value(reason="invalid_json") == fallbacks + 1
+        assert metrics_service.tokens.value(route=route.name, kind="completion") == completion_tokens + 50
+        assert metrics_service.stage_duration.count(stage="upstream") == upstream + 1
@@ -0,0 +1,162 @@
+import pytest
+import time
+import asyncio
+import httpx
+import openai
+from unittest.mock import AsyncMock
+from metrics_service import metrics_service
+from rate_limiter import (
+    LIMITER_EVENTS, OpenAIRateLimiter, AdaptiveConcurrency, RateLimiterRegistry, client_key, parse_reset_duration, estimate_call_tokens
+)
+
+def make_rate_limit_error(headers=None):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    response = httpx.Response(429, headers=headers or {}, request=request)
+    return openai.RateLimitError("Rate limit exceeded", response=response, body=None)
+
+class TestRateLimiter:
+    """Tests pour le limiteur partagé des appels OpenAI"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.limiter = OpenAIRateLimiter(
+            requests_per_minute=6000,
+            tokens_per_minute=600000,
+            max_concurrency=8,
+            max_retries=3,
+            base_delay=0.001,
+            max_delay=0.01
+        )
+    
+    def test_parse_reset_duration(self):
+        """Test de la lecture des durées des en-têtes OpenAI"""
+        assert parse_reset_duration("1s") == 1.0
+        assert parse_reset_duration("6m0s") == 360.0
+        assert parse_reset_duration("20ms") == pytest.approx(0.02)
+        assert parse_reset_duration("2") == 2.0
+        assert parse_reset_duration(None) is None
+        assert parse_reset_duration("bientôt") is None
+    
+    def test_estimate_call_tokens(self):
+        """Test de l'estimation des tokens d'un appel"""
+        kwargs = {"messages": [{"role": "user", "content": "x" * 400}], "max_tokens": 100}
+        
+        assert estimate_call_tokens(kwargs) == 200
+        assert estimate_call_tokens({}) == 0
+    
+    def test_headers_lower_remaining_budget(self):
+        """Test du recalage des budgets sur les en-têtes x-ratelimit-*"""
+        self.limiter.update_from_headers({
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "3",
+            "x-ratelimit-remaining-tokens": "1000"
+        })
+        
+        assert self.limiter.requests.capacity == 500
+        assert self.limiter.requests.level <= 3
+        assert self.limiter.tokens.level <= 1000
+        assert self.limiter.last_headers["requests_remaining"] == "3"
+    
+    @pytest.mark.asyncio
+    async def test_token_budget_delays_calls(self):
+        """Test que l'épuisement du budget de tokens retarde l'appel suivant"""
+        limiter = OpenAIRateLimiter(requests_per_minute=6000, tokens_per_minute=6000, max_concurrency=4)
+        call = AsyncMock(return_value="ok")
+        
+        started = time.monotonic()
+        await limiter.execute(call, estimated_tokens=6000)
+        await limiter.execute(call, estimated_tokens=10)
+        
+        assert time.monotonic() - started >= 0.09
+    
+    @pytest.mark.asyncio
+    async def test_retries_rate_limit_then_succeeds(self):
+        """Test des nouvelles tentatives après une erreur 429"""
+        call = AsyncMock(side_effect=[make_rate_limit_error(), make_rate_limit_error(), "ok"])
+        initial_limit = self.limiter.concurrency.limit
+        
+        result = await self.limiter.execute(call)
+        
+        assert result == "ok"
+        assert call.await_count == 3
+        assert self.limiter.stats["retries"] == 2
+        assert self.limiter.stats["rate_limited"] == 2
+        assert self.limiter.concurrency.limit < initial_limit
+    
+    @pytest.mark.asyncio
+    async def test_events_are_exported_as_metrics(self):
+        """Test que les nouveaux essais et les erreurs 429 sont exposés sur /metrics"""
+        retries = LIMITER_EVENTS.value(event="retries")
+        rate_limited = LIMITER_EVENTS.value(event="rate_limited")
+        call = AsyncMock(side_effect=[make_rate_limit_error(), "ok"])
+        
+        await self.limiter.execute(call)
+        
+        assert LIMITER_EVENTS.value(event="retries") == retries + 1
+        assert LIMITER_EVENTS.value(event="rate_limited") == rate_limited + 1
+        assert 'devplan_openai_limiter_events_total{event="retries"}' in metrics_service.render()
+    
+    @pytest.mark.asyncio
+    async def test_gives_up_after_max_retries(self):
+        """Test de l'abandon après le nombre maximal de tentatives"""
+        call = AsyncMock(side_effect=make_rate_limit_error())
+        
+        with pytest.raises(openai.RateLimitError):
+            await self.limiter.execute(call)
+        
+        assert call.await_count == 4
+        assert self.limiter.stats["failures"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_non_retryable_errors_are_raised_immediately(self):
+        """Test que les erreurs non transitoires ne sont pas réessayées"""
+        call = AsyncMock(side_effect=ValueError("bad request"))
+        
+        with pytest.raises(ValueError):
+            await self.limiter.execute(call)
+        
+        assert call.await_count == 1
+        assert self.limiter.concurrency.in_flight == 0
+    
+    @pytest.mark.asyncio
+    async def test_adaptive_concurrency_bounds_in_flight_calls(self):
+        """Test que la concurrence est bornée par la limite AIMD"""
+        concurrency = AdaptiveConcurrency(initial=2, maximum=2)
+        running = 0
+        max_running = 0
+        
+        async def worker():
+            nonlocal running, max_running
+            await concurrency.acquire()
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            await concurrency.release()
+        
+        await asyncio.gather(*[worker() for _ in range(6)])
+        
+        assert max_running == 2
+    
+    def test_aimd_adjustments(self):
+        """Test de l'augmentation additive et de la diminution multiplicative"""
+        concurrency = AdaptiveConcurrency(initial=4, maximum=16)
+        
+        concurrency.on_overload()
+        assert concurrency.limit == 2
+        concurrency.on_success()
+        assert concurrency.limit == 2.5
+        for _ in range(10):
+            concurrency.on_overload()
+        assert concurrency.limit == 1
+    
+    def test_registry_keeps_one_limiter_per_client(self):
+        """Test qu'un limiteur distinct est attribué à chaque clé API et organisation (éviction LRU)"""
+        registry = RateLimiterRegistry(max_entries=2)
+        first = registry.get(client_key("sk-a", None))
+        
+        assert registry.get(client_key("sk-a", None)) is first
+        assert registry.get(client_key("sk-a", "org-1")) is not first
+        assert client_key("sk-a", None)[0] != "sk-a"
+        registry.get(client_key("sk-b", None))
+        assert registry.get(client_key("sk-a", None)) is not first
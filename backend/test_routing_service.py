@@ -0,0 +1,99 @@
+import pytest
+import time
+from unittest.mock import Mock, AsyncMock, patch
+from models import ProjectRequest
+from routing_service import ModelRouter, ModelRoute
+from services import SchemaGeneratorService
+
+LIGHT = ModelRoute(name="light", model="gpt-3.5-turbo", max_tokens=2000, prompt_cost_per_1k=0.001, completion_cost_per_1k=0.002)
+STANDARD = ModelRoute(name="standard", model="gpt-4", max_tokens=4000, prompt_cost_per_1k=0.03, completion_cost_per_1k=0.06)
+
+class TestModelRouter:
+    """Tests pour la politique de routage des modèles"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.router = ModelRouter(light=LIGHT, standard=STANDARD, threshold=3, enabled=True)
+    
+    def test_simple_request_uses_light_route(self):
+        """Test qu'un portfolio peu complexe est routé vers le niveau léger"""
+        request = ProjectRequest(
+            description="Un portfolio simple pour présenter mes photos",
+            project_type="portfolio",
+            preferences={"complexity": "low"}
+        )
+        
+        assert self.router.select(request) == LIGHT
+    
+    def test_complex_request_uses_standard_route(self):
+        """Test qu'un SaaS complexe avec exigences est routé vers le niveau standard"""
+        request = ProjectRequest(
+            description="Plateforme SaaS multi-tenant de facturation " * 10,
+            project_type="saas",
+            preferences={"complexity": "high"},
+            additional_requirements=["SSO", "Audit", "Multilingue"]
+        )
+        
+        assert self.router.score(request) > self.router.score(ProjectRequest(description="Un portfolio simple", project_type="portfolio"))
+        assert self.router.select(request) == STANDARD
+    
+    def test_configured_model_replaces_standard_model(self):
+        """Test que le modèle configuré par l'utilisateur est utilisé pour le niveau standard"""
+        request = ProjectRequest(description="Plateforme e-commerce complète", project_type="ecommerce", preferences={"complexity": "high"})
+        
+        route = self.router.select(request, configured_model="gpt-4-turbo")
+        
+        assert route.name == "standard"
+        assert route.model == "gpt-4-turbo"
+        assert route.max_tokens == STANDARD.max_tokens
+    
+    def test_disabled_routing_always_uses_standard(self):
+        """Test que la désactivation du routage conserve le niveau standard"""
+        router = ModelRouter(light=LIGHT, standard=STANDARD, threshold=3, enabled=False)
+        request = ProjectRequest(description="Un portfolio simple", project_type="portfolio")
+        
+        assert router.select(request) == STANDARD
+    
+    def test_usage_and_latency_are_recorded_per_route(self):
+        """Test de l'enregistrement des tokens, du coût et de la latence par niveau"""
+        response = Mock()
+        response.usage = Mock(prompt_tokens=1000, completion_tokens=500)
+        
+        self.router.record_usage(LIGHT, response)
+        self.router.record_generation(LIGHT, time.monotonic() - 0.2)
+        self.router.record_generation(LIGHT, time.monotonic(), is_fallback=True)
+        
+        light = self.router.describe()["routes"][0]
+        assert light["name"] == "light"
+        assert light["generations"] == 2
+        assert light["fallbacks"] == 1
+        assert light["prompt_tokens"] == 1000
+        assert light["completion_tokens"] == 500
+        assert light["cost_usd"] == pytest.approx(0.002)
+        assert light["latency_p95_ms"] >= 200
+
+class TestServiceRouting:
+    """Tests de l'utilisation du routage par le service de génération"""
+    
+    @pytest.mark.asyncio
+    async def test_generate_uses_selected_model_and_budget(self):
+        """Test que l'appel OpenAI utilise le modèle et le budget du niveau choisi"""
+        service = SchemaGeneratorService(mode="single")
+        request = ProjectRequest(description="Un portfolio simple pour mes photos", project_type="portfolio")
+        router = ModelRouter(light=LIGHT, standard=STANDARD, threshold=3, enabled=True)
+        response = Mock()
+        response.choices = [Mock(message=Mock(content='{"project_name": "Portfolio"}'))]
+        response.usage = Mock(prompt_tokens=300, completion_tokens=200)
+        
+        with patch("services.config_service") as mock_config, patch("services.model_router", router):
+            mock_config.get_client.return_value = Mock()
+            mock_config.get_model.return_value = "gpt-4"
+            mock_config.call_openai = AsyncMock(return_value=response)
+            result = await service.generate(request)
+        
+        kwargs = mock_config.call_openai.await_args.kwargs
+        assert kwargs["model"] == "gpt-3.5-turbo"
+        assert kwargs["max_tokens"] == 2000
+        assert result.schema.project_name == "Portfolio"
+        assert router.stats["light"].generations == 1
+        assert router.stats["light"].completion_tokens == 200
@@ -0,0 +1,89 @@
+import io
+import hashlib
+import sys
+import tarfile
+import zipfile
+from models import FileStructure
+from scaffold_service import iter_scaffold, stream_zip, stream_tar, archive_filename
+
+def directory(name, *children):
+    return FileStructure(name=name, type="directory", children=list(children))
+
+def deep_tree(depth):
+    """Arborescence imbriquée construite sans validation (plus profonde que la limite de récursion)"""
+    node = FileStructure.model_construct(name="main.py", type="file", children=None, content="print('ok')")
+    for i in range(depth):
+        node = FileStructure.model_construct(name=f"d{i}", type="directory", children=[node], content=None)
+    return node
+
+class TestScaffoldService:
+    """Tests pour l'export de la structure de fichiers en archive"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.root = directory(
+            "project-root",
+            directory("backend", FileStructure(name="main.py", content="app = FastAPI()\n")),
+            FileStructure(name="frontend/src/App.tsx", content="export default App;\n"),
+            FileStructure(name="../../etc/passwd", content="x"),
+            FileStructure(name="", content="ignoré"),
+            FileStructure(name="README.md")
+        )
+
+    def test_tree_is_walked_with_safe_paths(self):
+        """Test du parcours : dossier avant son contenu, chemins assainis"""
+        entries = [(entry.path, entry.is_dir) for entry in iter_scaffold(self.root)]
+        assert entries == [
+            ("project-root", True),
+            ("project-root/backend", True),
+            ("project-root/backend/main.py", False),
+            ("project-root/frontend/src/App.tsx", False),
+            ("project-root/etc/passwd", False),
+            ("project-root/README.md", False),
+        ]
+
+    def test_zip_archive_roundtrip(self):
+        """Test que l'archive ZIP produite par morceaux se relit"""
+        data = b"".join(stream_zip(self.root, mtime=1700000000))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            assert archive.read("project-root/backend/main.py") == b"app = FastAPI()\n"
+            assert archive.read("project-root/README.md") == b""
+            assert archive.getinfo("project-root/backend/").is_dir()
+
+    def test_tar_archive_roundtrip(self):
+        """Test que l'archive tar.gz produite par morceaux se relit"""
+        data = b"".join(stream_tar(self.root, mtime=1700000000))
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+            assert archive.getmember("project-root/backend").isdir()
+            member = archive.getmember("project-root/frontend/src/App.tsx")
+            assert member.mtime == 1700000000
+            assert archive.extractfile(member).read() == b"export default App;\n"
+
+    def test_deep_tree_does_not_hit_recursion_limit(self):
+        """Test qu'une arborescence plus profonde que la limite de récursion est exportée"""
+        depth = sys.getrecursionlimit() + 500
+        entries = list(iter_scaffold(deep_tree(depth)))
+        assert len(entries) == depth + 1
+        assert entries[-1].path.endswith("/d0/main.py")
+
+        data = b"".join(stream_tar(deep_tree(depth)))
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as archive:
+            assert len(archive.getmembers()) == depth + 1
+
+    def test_wide_tree_is_streamed_in_bounded_chunks(self):
+        """Test qu'une arborescence très large est envoyée en morceaux de taille bornée"""
+        files = [
+            FileStructure(name=f"file_{i}.txt", content=hashlib.sha256(str(i).encode()).hexdigest() * 4)
+            for i in range(5000)
+        ]
+        root = directory("wide", *files)
+        for stream in (stream_zip, stream_tar):
+            chunks = list(stream(root, chunk_size=16 * 1024))
+            assert len(chunks) > 5
+            assert max(len(chunk) for chunk in chunks[:-1]) < 32 * 1024
+
+    def test_archive_filename(self):
+        """Test du nom de fichier proposé au téléchargement"""
+        assert archive_filename("Boutique Bijoux / v2", "zip") == "Boutique-Bijoux-v2.zip"
+        assert archive_filename("???", "tar.gz") == "project.tar.gz"
@@ -0,0 +1,91 @@
+from unittest.mock import patch
+import semantic_cache_service
+from semantic_cache_service import SemanticCacheService, HashingVectorizer, extract_features
+from models import ProjectRequest
+from services import SchemaGeneratorService
+
+def cosine(first, second):
+    vectorizer = HashingVectorizer()
+    a, b = vectorizer.sparse(first), vectorizer.sparse(second)
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+class TestHashingVectorizer:
+    """Tests pour la vectorisation locale des descriptions"""
+
+    def test_equivalent_wordings_are_close(self):
+        """Test que des formulations équivalentes sont proches"""
+        similar = cosine("boutique en ligne de bijoux", "e-commerce bijoux artisanaux")
+        different = cosine("boutique en ligne de bijoux", "blog de recettes de cuisine végétarienne")
+
+        assert similar >= 0.8
+        assert different < 0.2
+
+    def test_features_ignore_accents_and_stopwords(self):
+        """Test de la normalisation (accents, mots vides, pluriels)"""
+        features = extract_features("Créer des Bijoux élégants")
+
+        assert "w:bijou" in features
+        assert "w:elegant" in features
+        assert "w:des" not in features
+
+class TestSemanticCacheService:
+    """Tests pour le cache sémantique des générations"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.cache = SemanticCacheService(enabled=True, threshold=0.8, max_entries=2, ttl=3600)
+        self.request = ProjectRequest(description="Boutique en ligne de bijoux artisanaux", project_type="ecommerce")
+        self.schema = SchemaGeneratorService()._generate_fallback_schema(self.request)
+
+    def test_similar_description_returns_adapted_schema(self):
+        """Test qu'une description similaire réutilise le schéma avec la nouvelle description"""
+        self.cache.store(self.request, "scope", self.schema)
+        variant = ProjectRequest(description="E-commerce de bijoux artisanaux", project_type="ecommerce")
+
+        match = self.cache.lookup(variant, "scope")
+
+        assert match is not None
+        schema, similarity = match
+        assert similarity >= 0.8
+        assert schema.description == variant.description
+        assert schema.recommended_stack == self.schema.recommended_stack
+        assert self.cache.stats["hits"] == 1
+
+    def test_dissimilar_or_other_scope_misses(self):
+        """Test qu'une description éloignée ou une autre portée ne correspond pas"""
+        self.cache.store(self.request, "scope", self.schema)
+
+        assert self.cache.lookup(ProjectRequest(description="Blog de recettes de cuisine"), "scope") is None
+        assert self.cache.lookup(self.request, "autre-scope") is None
+
+    def test_lru_eviction_by_capacity(self):
+        """Test de l'éviction de l'entrée la moins récemment utilisée"""
+        requests = [
+            ProjectRequest(description="Boutique en ligne de bijoux artisanaux"),
+            ProjectRequest(description="Blog de recettes de cuisine végétarienne"),
+            ProjectRequest(description="Application mobile de suivi sportif"),
+        ]
+        self.cache.store(requests[0], "scope", self.schema)
+        self.cache.store(requests[1], "scope", self.schema)
+        assert self.cache.lookup(requests[0], "scope") is not None
+        self.cache.store(requests[2], "scope", self.schema)
+
+        assert len(self.cache) == 2
+        assert self.cache.lookup(requests[0], "scope") is not None
+        assert self.cache.lookup(requests[1], "scope") is None
+
+    def test_expired_entry_is_ignored(self):
+        """Test que les entrées expirées ne sont pas réutilisées"""
+        cache = SemanticCacheService(enabled=True, threshold=0.8, max_entries=10, ttl=0)
+        cache.store(self.request, "scope", self.schema)
+
+        assert cache.lookup(self.request, "scope") is None
+        assert len(cache) == 0
+
+    def test_pure_python_search_without_numpy(self):
+        """Test que la recherche fonctionne sans NumPy"""
+        with patch.object(semantic_cache_service, "np", None):
+            cache = SemanticCacheService(enabled=True, threshold=0.8, max_entries=10, ttl=3600)
+            cache.store(self.request, "scope", self.schema)
+
+            assert cache.lookup(self.request, "scope") is not None
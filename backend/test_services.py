@@ -0,0 +1,343 @@
+import pytest
+import asyncio
+import json
+from unittest.mock import Mock, AsyncMock, patch
+from models import ProjectRequest
+from services import SchemaGeneratorService
+
+class TestParseAIResponse:
+    """Tests pour la validation directe de la réponse du modèle"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.service = SchemaGeneratorService()
+        self.request = ProjectRequest(
+            description="Plateforme e-commerce pour produits artisanaux",
+            project_type="ecommerce"
+        )
+
+    def test_missing_sections_use_model_defaults(self):
+        """Test que les sections absentes prennent les valeurs par défaut"""
+        schema = self.service._parse_ai_response('{"project_name": "ArtisanMarket"}', self.request)
+
+        assert schema.project_name == "ArtisanMarket"
+        assert schema.description == self.request.description
+        assert schema.project_type == "ecommerce"
+        assert schema.complexity == "medium"
+        assert schema.recommended_stack.frontend.name == "React"
+        assert schema.recommended_stack.deployment.learning_curve == "Easy"
+        assert schema.file_structure.name == "project-root"
+        assert schema.file_structure.type == "directory"
+        assert schema.features == []
+
+    def test_partial_technology_keeps_slot_defaults(self):
+        """Test qu'une technologie incomplète est complétée selon son emplacement"""
+        ai_response = json.dumps({
+            "recommended_stack": {
+                "backend": {"name": "Django", "pros": ["Batteries incluses"]},
+                "additional_tools": [{"name": "Redis"}]
+            },
+            "file_structure": {"name": "shop", "children": [{"name": "app.py", "type": "file"}]}
+        })
+
+        schema = self.service._parse_ai_response(ai_response, self.request)
+
+        backend = schema.recommended_stack.backend
+        assert backend.name == "Django"
+        assert backend.pros == ["Batteries incluses"]
+        assert backend.community_support == "Good"
+        assert schema.recommended_stack.additional_tools[0].name == "Redis"
+        assert schema.file_structure.type == "directory"
+        assert schema.file_structure.children[0].name == "app.py"
+
+    def test_technology_names_are_accepted_as_strings(self):
+        """Test que les technologies données par leur seul nom sont conservées"""
+        ai_response = json.dumps({
+            "recommended_stack": {
+                "frontend": "Next.js",
+                "backend": {"name": "Django"},
+                "additional_tools": ["Docker", "Redis", 42, {"name": "Sentry"}]
+            }
+        })
+
+        schema = self.service._parse_ai_response(ai_response, self.request)
+
+        stack = schema.recommended_stack
+        assert stack.frontend.name == "Next.js"
+        assert stack.frontend.community_support == "Excellent"
+        assert stack.backend.name == "Django"
+        assert [tool.name for tool in stack.additional_tools] == ["Docker", "Redis", "Sentry"]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("content, reason", [
+        ("Voici votre projet : {", "invalid_json"),
+        ('{"features": "pas une liste"}', "invalid_schema"),
+        ("[1, 2, 3]", "invalid_schema"),
+    ])
+    async def test_invalid_response_falls_back_with_reason(self, content, reason):
+        """Test que le repli indique si la réponse n'est pas du JSON ou ne respecte pas le schéma"""
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=content))]
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=response)
+            result = await self.service.generate(self.request)
+
+        assert result.is_fallback is True
+        assert result.fallback_reason == reason
+        assert result.schema.project_type == "ecommerce"
+
+class TestResponseRecovery:
+    """Tests pour la récupération des réponses imparfaites"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.service = SchemaGeneratorService()
+        self.request = ProjectRequest(
+            description="Plateforme e-commerce pour produits artisanaux",
+            project_type="ecommerce"
+        )
+
+    def completion(self, content):
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=content))]
+        return response
+
+    @pytest.mark.asyncio
+    async def test_fenced_response_is_recovered_without_followup(self):
+        """Test qu'une réponse entourée de markdown est utilisée sans nouvel appel"""
+        content = '```json\n{"project_name": "ArtisanMarket", "features": ["Panier"]}\n```'
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(content))
+            result = await self.service.generate(self.request)
+
+        assert result.is_fallback is False
+        assert result.schema.project_name == "ArtisanMarket"
+        assert result.schema.features == ["Panier"]
+        assert mock_config.call_openai.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_truncated_response_requests_only_missing_sections(self):
+        """Test que seules les sections manquantes sont redemandées puis fusionnées"""
+        sections = {"project_name": "ArtisanMarket", "features": ["Panier", "Paiement"]}
+        truncated = json.dumps(sections)[:-1] + ', "roadmap": {"phases": [{"name": "Pha'
+        followup = '{"roadmap": {"phases": [{"name": "MVP"}], "estimated_duration": "3 mois"}, "success_metrics": ["Ventes"]}'
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(side_effect=[self.completion(truncated), self.completion(followup)])
+            result = await self.service.generate(self.request)
+
+        assert result.is_fallback is False
+        assert result.schema.features == ["Panier", "Paiement"]
+        assert result.schema.roadmap.phases == [{"name": "MVP"}]
+        assert result.schema.success_metrics == ["Ventes"]
+        assert "roadmap" in result.recovered_sections
+        assert "features" not in result.recovered_sections
+
+        followup_prompt = mock_config.call_openai.await_args_list[1].kwargs["messages"][1]["content"]
+        assert "roadmap" in followup_prompt
+        assert "features," not in followup_prompt
+
+    @pytest.mark.asyncio
+    async def test_failed_followup_keeps_repaired_sections_and_is_not_cacheable(self):
+        """Test que les sections tronquées réparées sont utilisées si la requête complémentaire échoue"""
+        truncated = '{"project_name": "ArtisanMarket", "features": ["Panier", "Paie'
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(side_effect=[self.completion(truncated), Exception("Timeout")])
+            result = await self.service.generate(self.request)
+
+        assert result.is_fallback is False
+        assert result.schema.project_name == "ArtisanMarket"
+        assert result.schema.features == ["Panier"]
+        assert "features" in result.incomplete_sections
+        assert result.cacheable is False
+
+class TestParallelGeneration:
+    """Tests pour la génération par sections concurrentes"""
+
+    SECTIONS = {
+        "project_name": "ArtisanMarket",
+        "complexity": "medium",
+        "recommended_stack": {"frontend": {"name": "Vue"}},
+        "features": ["Panier"],
+        "architecture": {"overview": "Couches"},
+        "technical_requirements": ["Python 3.11"],
+        "file_structure": {"name": "artisan-market", "children": [{"name": "README.md"}]},
+        "roadmap": {"phases": [{"name": "MVP"}]},
+        "success_metrics": ["Ventes"],
+        "testing_strategy": {"unit": "pytest"},
+    }
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.service = SchemaGeneratorService(mode="parallel")
+        self.request = ProjectRequest(
+            description="Plateforme e-commerce pour produits artisanaux",
+            project_type="ecommerce"
+        )
+        self.prompts = []
+
+    async def fake_call(self, func, **kwargs):
+        """Répond avec les sections demandées dans le prompt, après un délai"""
+        prompt = kwargs["messages"][1]["content"]
+        self.prompts.append(prompt)
+        requested = prompt.split("déjà définis : ")[1].split(".\n")[0].split(", ")
+        await asyncio.sleep(0.05)
+        response = Mock()
+        content = json.dumps({name: self.SECTIONS[name] for name in requested if name in self.SECTIONS})
+        response.choices = [Mock(message=Mock(content=content))]
+        return response
+
+    def test_parallel_mode_uses_separate_cache_version(self):
+        """Test que les deux modes ne partagent pas leurs entrées de cache"""
+        assert self.service.prompt_version != SchemaGeneratorService(mode="single").prompt_version
+
+    @pytest.mark.asyncio
+    async def test_sections_are_generated_concurrently_and_merged(self):
+        """Test que le squelette puis les groupes concurrents sont fusionnés dans le schéma"""
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = self.fake_call
+            started = asyncio.get_running_loop().time()
+            result = await self.service.generate(self.request)
+            elapsed = asyncio.get_running_loop().time() - started
+
+        # Squelette puis 4 groupes en parallèle : ~2 délais au lieu de 5
+        assert len(self.prompts) == 1 + len(self.service.section_groups)
+        assert elapsed < 0.2
+        assert result.is_fallback is False
+        assert result.schema.project_name == "ArtisanMarket"
+        assert result.schema.recommended_stack.frontend.name == "Vue"
+        assert result.schema.file_structure.children[0].name == "README.md"
+        assert result.schema.testing_strategy == {"unit": "pytest"}
+        assert "ArtisanMarket" in self.prompts[1]
+        assert "deployment_strategy" in result.incomplete_sections
+
+    @pytest.mark.asyncio
+    async def test_stream_emits_sections_per_group(self):
+        """Test que le streaming émet les sections à mesure que les groupes se terminent"""
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = self.fake_call
+            events = [event async for event in self.service.stream_schema(self.request)]
+
+        names = [payload["name"] for event, payload in events if event == "section"]
+        assert names[0] == "project_name"
+        assert set(names) == set(self.SECTIONS)
+        assert events[-1][0] == "complete"
+
+    @pytest.mark.asyncio
+    async def test_skeleton_failure_falls_back(self):
+        """Test que l'échec du squelette utilise le schéma par défaut"""
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(side_effect=Exception("Timeout"))
+            result = await self.service.generate(self.request)
+
+        assert result.is_fallback is True
+        assert result.fallback_reason == "upstream_error"
+        assert mock_config.call_openai.await_count == 1
+
+class TestSectionRegeneration:
+    """Tests pour la régénération de sections d'un schéma existant"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.service = SchemaGeneratorService(mode="single", template_mode="off")
+        self.request = ProjectRequest(
+            description="Plateforme e-commerce pour produits artisanaux",
+            project_type="ecommerce"
+        )
+        self.schema = self.service._generate_fallback_schema(self.request)
+
+    def completion(self, content):
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=content))]
+        return response
+
+    @pytest.mark.asyncio
+    async def test_nested_section_is_merged_alone(self):
+        """Test qu'une technologie régénérée remplace seulement son emplacement"""
+        content = json.dumps({"recommended_stack.database": {"name": "MongoDB", "pros": ["Flexible"]}})
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(content))
+            result = await self.service.regenerate_sections(
+                self.request, self.schema, ["recommended_stack.database"], "Base orientée documents"
+            )
+
+        stack = result.schema.recommended_stack
+        assert result.is_fallback is False
+        assert stack.database.name == "MongoDB"
+        assert stack.database.community_support == "Excellent"
+        assert stack.frontend == self.schema.recommended_stack.frontend
+        assert result.schema.roadmap == self.schema.roadmap
+
+        kwargs = mock_config.call_openai.await_args.kwargs
+        prompt = kwargs["messages"][1]["content"]
+        assert "PostgreSQL" in prompt
+        assert "Base orientée documents" in prompt
+        assert "déjà définis : recommended_stack.database." in prompt
+        assert kwargs["max_tokens"] < self.service.route(self.request).max_tokens // 4
+
+    @pytest.mark.asyncio
+    async def test_subsection_reply_may_be_nested(self):
+        """Test qu'une sous-section renvoyée imbriquée dans sa section est fusionnée"""
+        database = {"name": "MongoDB", "description": "Base orientée documents"}
+        content = json.dumps({
+            "roadmap": {"phases": [{"name": "MVP"}]},
+            "recommended_stack": {"database": database}
+        })
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(content))
+            result = await self.service.regenerate_sections(
+                self.request, self.schema, ["roadmap", "recommended_stack.database"]
+            )
+
+        assert result.is_fallback is False
+        assert result.incomplete_sections == []
+        assert result.schema.roadmap.phases == [{"name": "MVP"}]
+        assert result.schema.recommended_stack.database.name == "MongoDB"
+        assert result.schema.recommended_stack.frontend == self.schema.recommended_stack.frontend
+
+    @pytest.mark.asyncio
+    async def test_invalid_sections_are_left_unchanged(self):
+        """Test qu'une section invalide n'est pas fusionnée et reste signalée"""
+        content = json.dumps({"roadmap": {"phases": [{"name": "MVP"}]}, "features": "pas une liste"})
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(content))
+            result = await self.service.regenerate_sections(self.request, self.schema, ["roadmap", "features"])
+
+        assert result.schema.roadmap.phases == [{"name": "MVP"}]
+        assert result.schema.features == self.schema.features
+        assert result.incomplete_sections == ["features"]
+
+    @pytest.mark.asyncio
+    async def test_failure_keeps_schema_as_fallback(self):
+        """Test qu'un échec du modèle laisse le schéma inchangé"""
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(side_effect=Exception("Timeout"))
+            result = await self.service.regenerate_sections(self.request, self.schema, ["roadmap"])
+
+        assert result.is_fallback is True
+        assert result.fallback_reason == "upstream_error"
+        assert result.schema is self.schema
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("selector", ["budget", "roadmap.inconnu", "features.items"])
+    async def test_unknown_selector_is_rejected(self, selector):
+        """Test qu'un sélecteur ne désignant pas une section lève une ValueError"""
+        with pytest.raises(ValueError):
+            await self.service.regenerate_sections(self.request, self.schema, [selector])
@@ -0,0 +1,121 @@
+import pytest
+import json
+from unittest.mock import Mock, patch
+from stream_service import IncrementalSectionParser, format_sse
+from models import ProjectRequest
+from services import SchemaGeneratorService
+
+SAMPLE = {
+    "project_name": "ArtisanMarket",
+    "complexity": 3,
+    "recommended_stack": {"frontend": {"name": "React", "pros": ["a", "b"]}, "justification": "ok {pas une accolade}"},
+    "architecture": {"overview": "Il a dit \"bonjour\"", "components": [], "data_flow": [], "security": [], "performance": []},
+    "features": ["Panier", "Paiement"],
+    "is_mvp": True
+}
+
+class TestIncrementalSectionParser:
+    """Tests pour le parseur JSON incrémental"""
+
+    def feed_all(self, text, chunk_size):
+        parser = IncrementalSectionParser()
+        sections = []
+        for i in range(0, len(text), chunk_size):
+            sections.extend(parser.feed(text[i:i + chunk_size]))
+        return sections
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 17, 10000])
+    def test_sections_are_emitted_in_order(self, chunk_size):
+        """Test que toutes les sections sont émises quel que soit le découpage"""
+        text = json.dumps(SAMPLE, ensure_ascii=False, indent=2)
+
+        sections = self.feed_all(text, chunk_size)
+
+        assert [name for name, _ in sections] == list(SAMPLE.keys())
+        assert dict(sections) == SAMPLE
+
+    def test_section_emitted_as_soon_as_complete(self):
+        """Test qu'une section est émise avant la fin du document"""
+        parser = IncrementalSectionParser()
+
+        assert parser.feed('{"architecture": {"overview": "x"') == []
+        assert parser.feed('}, "roadmap": {"phases"') == [("architecture", {"overview": "x"})]
+
+    def test_ignores_markdown_fence(self):
+        """Test que le texte avant l'objet racine est ignoré"""
+        text = "```json\n" + json.dumps({"features": ["a"]}) + "\n```"
+
+        assert self.feed_all(text, 5) == [("features", ["a"])]
+
+    def test_format_sse(self):
+        """Test du format des trames SSE"""
+        frame = format_sse("section", {"name": "features"})
+
+        assert frame == 'event: section\ndata: {"name":"features"}\n\n'
+
+class TestStreamSchema:
+    """Tests pour la génération en streaming"""
+
+    def make_chunk(self, content):
+        chunk = Mock()
+        chunk.choices = [Mock()]
+        chunk.choices[0].delta.content = content
+        chunk.usage = None
+        return chunk
+
+    @pytest.mark.asyncio
+    @patch('services.config_service')
+    async def test_stream_schema_emits_tokens_sections_and_complete(self, mock_config):
+        """Test des événements produits par stream_schema"""
+        text = json.dumps({"project_name": "Demo", "features": ["Blog"]})
+        chunks = [self.make_chunk(text[i:i + 8]) for i in range(0, len(text), 8)]
+
+        async def call_openai(func, **kwargs):
+            return chunks
+
+        async def iterate_stream(stream):
+            for chunk in stream:
+                yield chunk
+
+        mock_config.call_openai = call_openai
+        mock_config.iterate_stream = iterate_stream
+
+        request = ProjectRequest(description="Un blog de cuisine collaboratif")
+        events = [event async for event in SchemaGeneratorService().stream_schema(request)]
+
+        names = [event for event, _ in events]
+        sections = [payload["name"] for event, payload in events if event == "section"]
+        assert names.count("token") == len(chunks)
+        assert sections == ["project_name", "features"]
+        assert names[-1] == "complete"
+        result = events[-1][1]
+        assert result.is_fallback == False
+        assert result.schema.project_name == "Demo"
+
+    @pytest.mark.asyncio
+    @patch('services.config_service')
+    async def test_stream_schema_records_usage_from_final_chunk(self, mock_config):
+        """Test que l'usage renvoyé dans le dernier fragment du flux est enregistré"""
+        usage_chunk = Mock(choices=[], usage=Mock(prompt_tokens=120, completion_tokens=80))
+        chunks = [self.make_chunk(json.dumps({"project_name": "Demo"})), usage_chunk]
+        calls = []
+
+        async def call_openai(func, **kwargs):
+            calls.append(kwargs)
+            return chunks
+
+        async def iterate_stream(stream):
+            for chunk in stream:
+                yield chunk
+
+        mock_config.call_openai = call_openai
+        mock_config.iterate_stream = iterate_stream
+        service = SchemaGeneratorService()
+
+        with patch.object(service, "_record_usage") as record_usage:
+            events = [event async for event in service.stream_schema(ProjectRequest(description="Un blog de cuisine collaboratif"))]
+
+        assert calls[0]["stream_options"] == {"include_usage": True}
+        record_usage.assert_called_once()
+        assert record_usage.call_args.args[1] is usage_chunk
+        assert events[-1][1].schema.project_name == "Demo"
@@ -0,0 +1,171 @@
+import pytest
+import json
+from unittest.mock import Mock, AsyncMock, patch
+from models import ProjectRequest, ProjectType, ComplexityLevel
+from services import SchemaGeneratorService, GenerationResult
+from template_service import TemplateStore, build_bases, build_offline_base, save_bases, template_store
+
+class TestTemplateStore:
+    """Tests pour les bases précalculées par archétype"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.store = TemplateStore(path="/nonexistent/template_bases.json")
+        self.request = ProjectRequest(
+            description="Boutique en ligne de bijoux artisanaux",
+            project_type="ecommerce",
+            preferences={"complexity": "high", "stack": {"frontend": "Vue.js"}, "timeline": "3 mois"},
+            additional_requirements=["Paiement Stripe"]
+        )
+
+    def test_offline_bases_cover_every_archetype(self):
+        """Test qu'une base existe pour chaque type de projet et complexité"""
+        assert len(self.store.bases) == len(ProjectType) * len(ComplexityLevel)
+        assert self.store.version == "offline"
+        base = self.store.bases["api:low"]
+        assert base.project_type == "api"
+        assert base.complexity == "low"
+        assert base.recommended_stack.backend.name == "FastAPI"
+
+    def test_complexity_changes_the_base(self):
+        """Test que la complexité ajuste la roadmap et l'architecture"""
+        low = build_offline_base(ProjectType.SAAS, ComplexityLevel.LOW)
+        high = build_offline_base(ProjectType.SAAS, ComplexityLevel.HIGH)
+        assert len(high.roadmap.phases) > len(low.roadmap.phases)
+        assert len(high.architecture.components) > len(low.architecture.components)
+
+    def test_customize_applies_request(self):
+        """Test que la base est personnalisée avec la requête sans modifier l'original"""
+        schema = self.store.customize(self.request)
+
+        assert schema.description == self.request.description
+        assert schema.complexity == "high"
+        assert schema.recommended_stack.frontend.name == "Vue.js"
+        assert schema.recommended_stack.frontend.description
+        assert schema.estimated_duration == "3 mois"
+        assert "Paiement Stripe" in schema.features
+        assert "Paiement Stripe" not in self.store.bases["ecommerce:high"].features
+
+    def test_unspecified_archetype_uses_custom_medium(self):
+        """Test que la base par défaut est celle d'un projet personnalisé de complexité moyenne"""
+        schema = self.store.customize(ProjectRequest(description="Un outil interne de suivi"))
+        assert schema.project_type == "custom"
+        assert schema.complexity == "medium"
+
+    def test_saved_bases_are_loaded_with_version(self, tmp_path):
+        """Test que les bases enregistrées au déploiement sont rechargées avec leur version"""
+        path = str(tmp_path / "bases.json")
+        version = save_bases({"blog:low": build_offline_base(ProjectType.BLOG, ComplexityLevel.LOW)}, path)
+
+        store = TemplateStore(path=path)
+
+        assert store.version == version
+        assert list(store.bases) == ["blog:low"]
+        # Archétype absent du fichier : base hors ligne
+        assert store.get(ProjectRequest(description="Une API de paiement", project_type="api")).project_type == "api"
+
+    @pytest.mark.asyncio
+    async def test_build_bases_falls_back_offline_when_generation_fails(self):
+        """Test que les générations en échec sont remplacées par la base hors ligne"""
+        fallback = build_offline_base(ProjectType.CUSTOM, ComplexityLevel.MEDIUM)
+        generate = AsyncMock(return_value=GenerationResult(schema=fallback, is_fallback=True))
+
+        bases = await build_bases(generate)
+
+        assert generate.await_count == len(ProjectType) * len(ComplexityLevel)
+        assert bases["blog:high"].project_type == "blog"
+
+class TestTemplateWarmStart:
+    """Tests pour la génération à partir des bases précalculées"""
+
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.request = ProjectRequest(
+            description="Boutique en ligne de bijoux artisanaux",
+            project_type="ecommerce"
+        )
+
+    def completion(self, content):
+        response = Mock()
+        response.choices = [Mock(message=Mock(content=content))]
+        return response
+
+    def test_template_modes_use_separate_cache_versions(self):
+        """Test que chaque mode a sa propre version de cache"""
+        versions = {SchemaGeneratorService(template_mode=mode).prompt_version for mode in ("off", "instant", "diff")}
+        assert len(versions) == 3
+
+    @pytest.mark.asyncio
+    async def test_instant_mode_makes_no_call(self):
+        """Test que le mode instantané renvoie la base personnalisée sans appel au modèle"""
+        service = SchemaGeneratorService(template_mode="instant")
+
+        with patch("services.config_service") as mock_config:
+            mock_config.call_openai = AsyncMock()
+            result = await service.generate(self.request)
+
+        assert result.is_fallback is False
+        assert result.schema.description == self.request.description
+        assert result.schema.project_type == "ecommerce"
+        mock_config.call_openai.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_diff_mode_merges_changed_sections(self):
+        """Test que seules les sections renvoyées par le modèle remplacent la base"""
+        service = SchemaGeneratorService(template_mode="diff")
+        changes = json.dumps({"project_name": "Bijoux & Co", "features": ["Catalogue", "Personnalisation"]})
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(changes))
+            result = await service.generate(self.request)
+
+        assert result.is_fallback is False
+        assert result.schema.project_name == "Bijoux & Co"
+        assert result.schema.features == ["Catalogue", "Personnalisation"]
+        assert result.schema.roadmap.phases
+        kwargs = mock_config.call_openai.await_args.kwargs
+        assert "SCHÉMA DE BASE (ecommerce / medium)" in kwargs["messages"][1]["content"]
+        assert kwargs["max_tokens"] < service.route(self.request).max_tokens
+
+    @pytest.mark.asyncio
+    async def test_diff_mode_replaces_structured_sections(self):
+        """Test que la base est envoyée avec la forme réelle des sections et que la stack et la roadmap sont remplaçables"""
+        service = SchemaGeneratorService(template_mode="diff")
+        base = template_store.get(self.request)
+        stack = base.recommended_stack.model_dump(mode="json")
+        stack["database"] = {**stack["database"], "name": "MongoDB", "pros": ["Schéma souple"]}
+        roadmap = {"phases": [{"name": "Catalogue", "duration": "3 semaines", "tasks": ["Fiches produits"]}],
+                   "milestones": [], "estimated_duration": "3 semaines", "team_recommendations": []}
+        changes = json.dumps({"recommended_stack": stack, "roadmap": roadmap})
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(return_value=self.completion(changes))
+            result = await service.generate(self.request)
+
+        prompt = mock_config.call_openai.await_args.kwargs["messages"][1]["content"]
+        assert '"pros"' in prompt and '"phases"' in prompt and '"milestones"' in prompt
+        assert result.is_fallback is False
+        assert result.schema.recommended_stack.database.name == "MongoDB"
+        assert result.schema.recommended_stack.database.pros == ["Schéma souple"]
+        assert result.schema.recommended_stack.frontend == base.recommended_stack.frontend
+        assert result.schema.roadmap.phases == roadmap["phases"]
+        assert result.schema.features == base.features
+
+    @pytest.mark.asyncio
+    async def test_diff_failure_returns_template_as_fallback(self):
+        """Test qu'un échec du modèle renvoie la base personnalisée, non mise en cache"""
+        service = SchemaGeneratorService(template_mode="diff")
+
+        with patch("services.config_service") as mock_config:
+            mock_config.get_client.return_value = Mock()
+            mock_config.call_openai = AsyncMock(side_effect=Exception("Timeout"))
+            events = [event async for event in service.stream_schema(self.request)]
+
+        result = events[-1][1]
+        assert events[-1][0] == "complete"
+        assert result.is_fallback is True
+        assert result.fallback_reason == "upstream_error"
+        assert result.schema.project_name == "Boutique en ligne"
+        assert {payload["name"] for event, payload in events[:-1]} >= {"recommended_stack", "roadmap"}
@@ -0,0 +1,150 @@
+import pytest
+import time
+import sqlite3
+from unittest.mock import Mock, patch, AsyncMock
+from tenant_service import TenantRegistry, TenantConfig, InMemoryTenantBackend, SQLiteTenantBackend, current_tenant
+from config_service import ConfigService, OpenAIConfigRequest
+
+class TestTenantRegistry:
+    """Tests pour le registre des clients par tenant"""
+    
+    def setup_method(self):
+        """Setup pour chaque test"""
+        self.created = []
+        self.backend = InMemoryTenantBackend()
+        self.config = TenantConfig(api_key="sk-test1234567890abcdef1234567890")
+    
+    def factory(self, config):
+        client = Mock(name=f"client-{len(self.created)}")
+        self.created.append(client)
+        return client
+    
+    @pytest.mark.asyncio
+    async def test_register_and_get_client(self):
+        """Test de l'enregistrement et de la lecture d'un client"""
+        registry = TenantRegistry(self.factory, backend=self.backend)
+        client = Mock()
+        
+        await registry.register("session-a", self.config, client)
+        
+        assert registry.get_client("session-a") is client
+        assert registry.get_client("session-b") is None
+        assert await self.backend.load("session-a") == self.config
+    
+    @pytest.mark.asyncio
+    async def test_other_worker_reloads_without_revalidation(self):
+        """Test qu'un autre worker recharge la configuration partagée"""
+        first_worker = TenantRegistry(self.factory, backend=self.backend)
+        second_worker = TenantRegistry(self.factory, backend=self.backend)
+        await first_worker.register("session-a", self.config, Mock())
+        
+        client = await second_worker.load("session-a")
+        
+        assert client is self.created[0]
+        assert second_worker.get_client("session-a") is client
+    
+    @pytest.mark.asyncio
+    async def test_unknown_tenant_is_negatively_cached(self):
+        """Test que les tenants inconnus ne sollicitent pas le stockage à chaque requête"""
+        backend = Mock()
+        backend.load = AsyncMock(return_value=None)
+        registry = TenantRegistry(self.factory, backend=backend)
+        
+        assert await registry.load("inconnu") is None
+        assert await registry.load("inconnu") is None
+        
+        assert backend.load.await_count == 1
+    
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test de l'éviction du tenant le moins récemment utilisé"""
+        registry = TenantRegistry(self.factory, backend=self.backend, max_tenants=2)
+        await registry.register("a", self.config, Mock())
+        await registry.register("b", self.config, Mock())
+        registry.get_client("a")
+        await registry.register("c", self.config, Mock())
+        
+        assert registry.get_client("a") is not None
+        assert registry.get_client("b") is None
+        assert len(registry) == 2
+    
+    @pytest.mark.asyncio
+    async def test_idle_ttl(self):
+        """Test de l'expiration après inactivité"""
+        registry = TenantRegistry(self.factory, backend=self.backend, idle_ttl=0.01)
+        await registry.register("a", self.config, Mock())
+        time.sleep(0.02)
+        
+        assert registry.get_client("a") is None
+    
+    @pytest.mark.asyncio
+    async def test_memory_backend_is_bounded(self):
+        """Test que le stockage en mémoire ne conserve pas les configurations au-delà de ses limites"""
+        backend = InMemoryTenantBackend(max_entries=2, idle_ttl=3600)
+        registry = TenantRegistry(self.factory, backend=backend, max_tenants=2)
+        for tenant_id in ("a", "b", "c"):
+            await registry.register(tenant_id, self.config, Mock())
+        
+        assert await registry.load("a") is None
+        assert await backend.load("b") == self.config
+        
+        idle = InMemoryTenantBackend(idle_ttl=0.01)
+        await idle.save("a", self.config)
+        time.sleep(0.02)
+        await idle.save("b", self.config)
+        assert "a" not in idle._configs
+        assert await idle.load("b") == self.config
+        time.sleep(0.02)
+        assert await idle.load("b") is None
+    
+    @pytest.mark.asyncio
+    async def test_sqlite_backend_encrypts_api_key(self, tmp_path):
+        """Test que la clé API est chiffrée dans le stockage SQLite"""
+        pytest.importorskip("cryptography")
+        path = str(tmp_path / "tenants.db")
+        backend = SQLiteTenantBackend(path, secret="secret")
+        await backend.save("session-a", self.config)
+        
+        raw = sqlite3.connect(path).execute("SELECT api_key FROM tenant_configs").fetchone()[0]
+        loaded = await SQLiteTenantBackend(path, secret="secret").load("session-a")
+        
+        assert self.config.api_key not in raw
+        assert loaded.api_key == self.config.api_key
+        assert await SQLiteTenantBackend(path, secret="autre").load("session-a") is None
+
+class TestConfigServiceTenants:
+    """Tests de l'isolation des clients par tenant dans le service de configuration"""
+    
+    @pytest.mark.asyncio
+    @patch('config_service.AsyncOpenAI')
+    async def test_tenants_do_not_overwrite_each_other(self, mock_openai_class):
+        """Test que deux utilisateurs configurés gardent chacun leur client"""
+        service = ConfigService()
+        clients = []
+        
+        def make_client(**kwargs):
+            client = Mock()
+            client.chat.completions.create = AsyncMock(return_value=Mock(choices=[Mock()]))
+            client.organizations.list = AsyncMock(return_value=Mock(data=[]))
+            clients.append(client)
+            return client
+        
+        mock_openai_class.side_effect = make_client
+        
+        await service.validate_openai_config(OpenAIConfigRequest(api_key="sk-alice1234567890abcdef123456789"), tenant_id="alice")
+        await service.validate_openai_config(OpenAIConfigRequest(api_key="sk-bob1234567890abcdef12345678901"), tenant_id="bob")
+        
+        token = current_tenant.set("alice")
+        try:
+            assert service.get_client() is clients[0]
+        finally:
+            current_tenant.reset(token)
+        
+        token = current_tenant.set("bob")
+        try:
+            assert service.get_client() is clients[1]
+        finally:
+            current_tenant.reset(token)
+        
+        # Le client global n'est pas modifié par les configurations de tenants
+        assert service.current_client is None
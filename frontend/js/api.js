@@ -1,5 +1,18 @@
 // API Configuration
 const API_BASE_URL = 'http://localhost:8000';
+const SESSION_TOKEN_KEY = 'devplan_session_token';
+
+// Per-browser session token: the backend keeps one OpenAI client per token
+function getSessionToken() {
+    let token = localStorage.getItem(SESSION_TOKEN_KEY);
+    if (!token) {
+        token = window.crypto && window.crypto.randomUUID
+            ? window.crypto.randomUUID()
+            : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`;
+        localStorage.setItem(SESSION_TOKEN_KEY, token);
+    }
+    return token;
+}
 
 // API Service Class
 class APIService {
@@ -13,6 +26,7 @@ class APIService {
         const config = {
             headers: {
                 'Content-Type': 'application/json',
+                'X-Session-Token': getSessionToken(),
                 ...options.headers,
             },
             ...options,
@@ -53,6 +67,67 @@ class APIService {
         return this.post('/api/generate-schema', projectData);
     }
 
+    // Generate project schema with Server-Sent Events streaming
+    // handlers: { onStart, onToken, onSection(name, value), onComplete(response, meta) }
+    async generateSchemaStream(projectData, handlers = {}) {
+        const response = await fetch(`${this.baseURL}/api/generate-schema/stream`, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+                'X-Session-Token': getSessionToken(),
+            },
+            body: JSON.stringify(projectData),
+        });
+
+        if (!response.ok || !response.body) {
+            const errorData = await response.json().catch(() => ({}));
+            throw new Error(errorData.detail || `HTTP error! status: ${response.status}`);
+        }
+
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let result = null;
+
+        const dispatch = (frame) => {
+            let event = 'message';
+            const dataLines = [];
+            frame.split('\n').forEach(line => {
+                if (line.startsWith('event:')) event = line.slice(6).trim();
+                else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+            });
+            if (dataLines.length === 0) return;
+            const data = JSON.parse(dataLines.join('\n'));
+
+            if (event === 'start' && handlers.onStart) handlers.onStart(data);
+            else if (event === 'token' && handlers.onToken) handlers.onToken(data);
+            else if (event === 'section' && handlers.onSection) handlers.onSection(data.name, data.value);
+            else if (event === 'complete') {
+                result = data.response;
+                if (handlers.onComplete) handlers.onComplete(data.response, data);
+            }
+        };
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let separator;
+            while ((separator = buffer.indexOf('\n\n')) !== -1) {
+                dispatch(buffer.slice(0, separator));
+                buffer = buffer.slice(separator + 2);
+            }
+        }
+        if (buffer.trim()) dispatch(buffer);
+
+        if (!result) {
+            throw new Error('Flux de génération interrompu');
+        }
+        return result;
+    }
+
     // Get available stacks
     async getAvailableStacks() {
         return this.get('/api/stacks');
@@ -68,6 +143,11 @@ class APIService {
         return this.get('/health');
     }
 
+    // Liveness check (no upstream call)
+    async livenessCheck() {
+        return this.get('/health/live');
+    }
+
     // OpenAI Configuration
     async validateOpenAIConfig(configData) {
         return this.post('/api/config/openai', configData);
@@ -178,7 +258,7 @@ const APIUtils = {
     // Check if API is available
     async checkAPIAvailability() {
         try {
-            await api.healthCheck();
+            await api.livenessCheck();
             return true;
         } catch (error) {
             return false;
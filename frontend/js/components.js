@@ -187,6 +187,7 @@ class ResultsDisplay {
         }
 
         const schema = data.data;
+        this.partialSchema = null;
         this.container.innerHTML = `
             <div class="space-y-8">
                 ${this.renderProjectOverview(schema)}
@@ -203,6 +204,43 @@ class ResultsDisplay {
         lucide.createIcons();
     }
 
+    // Progressive rendering of a streamed top-level section
+    startProgressive() {
+        this.partialSchema = {};
+        this.container.innerHTML = '<div class="space-y-8" data-progressive></div>';
+    }
+
+    renderSection(name, value) {
+        if (!this.partialSchema) {
+            this.startProgressive();
+        }
+        this.partialSchema[name] = value;
+
+        const renderers = {
+            recommended_stack: () => this.renderRecommendedStack(value),
+            architecture: () => this.renderArchitecture(value),
+            roadmap: () => this.renderRoadmap(value),
+            file_structure: () => this.renderFileStructure(value),
+            features: () => this.renderFeatures(value),
+        };
+        if (!renderers[name]) return;
+
+        let html;
+        try {
+            html = renderers[name]();
+        } catch (error) {
+            // Section incomplete: wait for the final render
+            return;
+        }
+
+        const wrapper = this.container.querySelector('[data-progressive]');
+        const section = document.createElement('div');
+        section.dataset.section = name;
+        section.innerHTML = html;
+        wrapper.appendChild(section);
+        lucide.createIcons();
+    }
+
     renderProjectOverview(schema) {
         return `
             <div class="bg-white rounded-xl shadow-lg p-8 border border-gray-200">
@@ -226,8 +226,19 @@ class DevPlanApp {
         this.showLoadingModal();
 
         try {
-            // Call API
-            const response = await window.api.generateSchema(apiData);
+            // Call API (streaming, sections are rendered as soon as they arrive)
+            let streamStarted = false;
+            let response;
+            try {
+                response = await window.api.generateSchemaStream(apiData, {
+                    onStart: () => { streamStarted = true; },
+                    onSection: (name, value) => this.displaySection(name, value),
+                });
+            } catch (streamError) {
+                if (streamStarted) throw streamError;
+                // Streaming unavailable: fall back to the classic endpoint
+                response = await window.api.generateSchema(apiData);
+            }
             
             // Hide loading modal
             this.hideLoadingModal();
@@ -277,6 +288,26 @@ class DevPlanApp {
         }
     }
 
+    displaySection(name, value) {
+        const resultsSection = document.getElementById('results');
+        const resultsContent = document.getElementById('results-content');
+
+        if (resultsSection && resultsContent) {
+            if (!this.resultsDisplay) {
+                this.resultsDisplay = new window.ResultsDisplay(resultsContent);
+            }
+
+            // First section received: replace the spinner with the partial results
+            if (resultsSection.classList.contains('hidden') || !this.resultsDisplay.partialSchema) {
+                this.hideLoadingModal();
+                this.resultsDisplay.startProgressive();
+                resultsSection.classList.remove('hidden');
+            }
+
+            this.resultsDisplay.renderSection(name, value);
+        }
+    }
+
     displayResults(response) {
         this.currentResults = response;
         window.currentResults = response; // Make available globally for export